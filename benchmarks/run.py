@@ -0,0 +1,296 @@
+import json
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, List, Optional
+
+import click
+import pandas
+from requests import Response
+
+from cta import API, Client, ValidationPolicy, validateData
+from cta.replay import ReplayServer
+from cta.stops import STOPS_SCHEMA, Stops
+from cta.train import (
+    ARRIVALS_SCHEMA,
+    FOLLOWTHISTRAIN_SCHEMA,
+    LOCATIONS_SCHEMA,
+    Arrivals,
+    FollowThisTrain,
+    Locations,
+)
+
+FIXTURES: Path = Path(__file__).parent / "fixtures"
+
+PHASES: tuple[str, ...] = (
+    "setup",
+    "request_cold",
+    "request",
+    "decode",
+    "validate",
+    "frame",
+)
+
+CASES: dict[str, tuple[Callable[[Client], API], str, dict, dict]] = {
+    "arrivals": (
+        lambda client: Arrivals(key="bench", client=client),
+        "/api/1.0/ttarrivals.aspx?outputType=JSON&key=bench",
+        {"mapid": 40380},
+        ARRIVALS_SCHEMA,
+    ),
+    "follow": (
+        lambda client: FollowThisTrain(key="bench", client=client),
+        "/api/1.0/ttfollow.aspx?outputType=JSON&key=bench",
+        {"runnumber": 308},
+        FOLLOWTHISTRAIN_SCHEMA,
+    ),
+    "locations": (
+        lambda client: Locations(key="bench", client=client),
+        "/api/1.0/ttpositions.aspx?outputType=JSON&key=bench",
+        {"rt": ["red", "blue", "org"]},
+        LOCATIONS_SCHEMA,
+    ),
+    "stops": (
+        lambda client: Stops(client=client),
+        "/resource/8pix-ypme.json",
+        {},
+        STOPS_SCHEMA,
+    ),
+}
+
+
+def summarize(samples: List[float]) -> dict[str, float]:
+    """
+    Summarize the timings of a single phase
+
+    :param samples: The timings in seconds
+    :type samples: List[float]
+    :return: The number of samples and their min, mean, median, and 95th percentile
+    :rtype: dict[str, float]
+    """  # noqa: E501
+    ordered: List[float] = sorted(samples)
+
+    return {
+        "n": len(ordered),
+        "min": ordered[0],
+        "mean": statistics.fmean(ordered),
+        "median": statistics.median(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+    }
+
+
+def benchmark(
+    name: str,
+    url: str,
+    iterations: int,
+    client: Client,
+) -> dict[str, dict[str, float]]:
+    """
+    Time each phase of a query against a single endpoint
+
+    :param name: The name of the case in CASES to benchmark
+    :type name: str
+    :param url: The base URL of the ReplayServer
+    :type url: str
+    :param iterations: The number of queries to time
+    :type iterations: int
+    :param client: A pooled Client with validation disabled
+    :type client: Client
+    :return: A summary of the timings of each phase
+    :rtype: dict[str, dict[str, float]]
+    """
+    factory: Callable[[Client], API]
+    path: str
+    kwargs: dict
+    schema: dict
+    factory, path, kwargs, schema = CASES[name]
+
+    api: API = factory(client)
+    api.endpointBase = url + path
+
+    endpoint: str = (
+        api.buildEndpoint(**kwargs)
+        if hasattr(api, "buildEndpoint")
+        else api.endpointBase
+    )
+
+    samples: dict[str, List[float]] = {phase: [] for phase in PHASES}
+
+    start: float
+    _: int
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fresh: Client = Client()
+        samples["setup"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        fresh.get(url=endpoint).content
+        samples["request_cold"].append(time.perf_counter() - start)
+        fresh.close()
+
+        start = time.perf_counter()
+        resp: Response = client.get(url=endpoint)
+        content: bytes = resp.content
+        samples["request"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        data: Any = json.loads(content)
+        samples["decode"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        validateData(data=data, schema=schema)
+        samples["validate"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        api.parse(data=data)
+        samples["frame"].append(time.perf_counter() - start)
+
+    return {phase: summarize(samples[phase]) for phase in PHASES}
+
+
+def compare(
+    results: dict,
+    baseline: dict,
+    tolerance: float,
+) -> List[str]:
+    """
+    Find the phases whose median timing regressed against a baseline
+
+    :param results: The results of the current run
+    :type results: dict
+    :param baseline: The results of a previous run
+    :type baseline: dict
+    :param tolerance: The fraction a median may grow by before it is reported
+    :type tolerance: float
+    :return: A description of every regression
+    :rtype: List[str]
+    """
+    regressions: List[str] = []
+
+    name: str
+    phases: dict[str, dict[str, float]]
+    for name, phases in results["results"].items():
+        previousResults: dict = baseline["results"].get(name, {})
+
+        phase: str
+        summary: dict[str, float]
+        for phase, summary in phases.items():
+            previous: Optional[dict] = previousResults.get(phase)
+            if previous is None:
+                continue
+
+            if summary["median"] > previous["median"] * (1 + tolerance):
+                regressions.append(
+                    f"{name}.{phase}: {previous['median'] * 1e3:.3f} ms -> {summary['median'] * 1e3:.3f} ms"  # noqa: E501
+                )
+
+    return regressions
+
+
+@click.command()
+@click.option("--iterations", default=50, show_default=True)
+@click.option(
+    "--latency",
+    default=0.0,
+    show_default=True,
+    help="Seconds of latency the server adds to each response",
+)
+@click.option(
+    "--scale",
+    default=1,
+    show_default=True,
+    help="Times to repeat the records of each recorded response",
+)
+@click.option(
+    "--synthesize/--recorded",
+    default=False,
+    show_default=True,
+    help="Serve responses synthesized from a simulated network instead of the recorded fixtures",  # noqa: E501
+)
+@click.option(
+    "--case",
+    "cases",
+    multiple=True,
+    type=click.Choice(sorted(CASES)),
+    help="Endpoints to benchmark (default: all)",
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write the results as JSON to this file",
+)
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Fail if any median regressed against these results",
+)
+@click.option("--tolerance", default=0.25, show_default=True)
+def main(
+    iterations: int,
+    latency: float,
+    scale: int,
+    synthesize: bool,
+    cases: tuple[str, ...],
+    output: Optional[Path],
+    baseline: Optional[Path],
+    tolerance: float,
+) -> None:
+    results: dict = {
+        "meta": {
+            "python": platform.python_version(),
+            "pandas": pandas.__version__,
+            "iterations": iterations,
+            "latency": latency,
+            "scale": scale,
+            "synthesize": synthesize,
+        },
+        "results": {},
+    }
+
+    client: Client = Client(policy=ValidationPolicy(enabled=False))
+
+    with ReplayServer(
+        recordings=None if synthesize else FIXTURES,
+        latency=latency,
+        scale=scale,
+    ) as server:
+        name: str
+        for name in cases or sorted(CASES):
+            results["results"][name] = benchmark(
+                name=name,
+                url=server.url,
+                iterations=iterations,
+                client=client,
+            )
+
+            phase: str
+            for phase in PHASES:
+                summary: dict[str, float] = results["results"][name][phase]
+                click.echo(
+                    f"{name:<10} {phase:<13} median {summary['median'] * 1e3:9.3f} ms  p95 {summary['p95'] * 1e3:9.3f} ms"  # noqa: E501
+                )
+
+    client.close()
+
+    if output is not None:
+        output.write_text(json.dumps(results, indent=4))
+
+    if baseline is not None:
+        regressions: List[str] = compare(
+            results=results,
+            baseline=json.loads(baseline.read_text()),
+            tolerance=tolerance,
+        )
+
+        regression: str
+        for regression in regressions:
+            click.echo(f"REGRESSION {regression}", err=True)
+
+        if len(regressions) > 0:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,81 @@
 import ssl
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+from datetime import datetime, timedelta
+from importlib import import_module
 from ssl import SSLContext
-from typing import Protocol
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, Protocol
+from zoneinfo import ZoneInfo
 
-from jsonschema import validate
-from pandas import DataFrame
-from requests import Response, Session
-from requests.adapters import HTTPAdapter
+from cta import instrument
+from cta.cache import CacheEntry, ResponseCache
+from cta.instrument import CallRecord
+from cta.records import (
+    Record,
+    RecordBatch,
+    TypedRecord,
+    recordType,
+    toFrame,
+    toRecords,
+)
+
+if TYPE_CHECKING:
+    from jsonschema import ValidationError
+    from jsonschema.protocols import Validator
+    from requests import Response
+
+    from cta.resilience import ResiliencePolicy
+    from cta.schedule import Scheduler
+
+TIMEZONE: str = "America/Chicago"
+
+SERVICE_DAY_OFFSET: timedelta = timedelta(hours=3)
+
+OUTPUTS: tuple[str, ...] = ("frame", "records", "dicts", "typed", "batch")
+
+_LAZY_ATTRIBUTES: dict[str, str] = {
+    "SSLAdapter": "cta.http",
+    "POOL_CLASSES": "cta.http",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module: str | None = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module 'cta' has no attribute {name!r}")
+
+    return getattr(import_module(module), name)
+
+
+def responseTime(tmst: str) -> float:
+    """
+    Convert the ctatt.tmst timestamp of a Train Tracker JSON response to a UNIX timestamp
+
+    :param tmst: The timestamp, in America/Chicago local time
+    :type tmst: str
+    :return: The UNIX timestamp
+    :rtype: float
+    """  # noqa: E501
+    moment: datetime = datetime.fromisoformat(tmst)
+    return moment.replace(tzinfo=ZoneInfo(TIMEZONE)).timestamp()
+
+
+def serviceDate(queryTime: float) -> str:
+    """
+    Get the CTA service date that a UNIX timestamp falls on
+
+    Service days start at 3 AM America/Chicago time, so trains running after midnight are archived with the previous day's service.
+
+    :param queryTime: A UNIX timestamp
+    :type queryTime: float
+    :return: The service date formatted as YYYY-MM-DD
+    :rtype: str
+    """  # noqa: E501
+    local: datetime = datetime.fromtimestamp(queryTime, tz=ZoneInfo(TIMEZONE))
+    return (local - SERVICE_DAY_OFFSET).date().isoformat()
 
 
 class API(ABC):
@@ -15,15 +84,354 @@ class API(ABC):
     """  # noqa: E501
 
     @abstractmethod
-    def get(self) -> DataFrame:
+    def get(self) -> Any:
         """
         Get and validate the data at a REST API endpoint
 
-        :return: A pandas.DataFrame of the content of the REST API data
-        :rtype: DataFrame
+        :return: A pandas.DataFrame of the content of the REST API data, or the records or dicts of it depending on the output of the API class
+        :rtype: Any
+        """  # noqa: E501
+        ...
+
+    @abstractmethod
+    def parse(self, data: Any) -> Any:
         """
+        Validate the JSON response of a REST API endpoint and convert it to a pandas.DataFrame
+
+        :param data: The JSON response of the REST API endpoint
+        :type data: Any
+        :return: A pandas.DataFrame of the content of the REST API data
+        :rtype: Any
+        """  # noqa: E501
         ...
 
+    def query(
+        self,
+        endpoint: str,
+        accept: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """
+        Get and parse the data at a REST API endpoint URL, serving it from the client's ResponseCache when possible
+
+        :param endpoint: The URL to submit the HTTP GET request to
+        :type endpoint: str
+        :param accept: A check of each fetched JSON response, called before it is parsed or cached; if it returns False, the response is dropped and None is returned (if not specified, every response is parsed)
+        :type accept: Optional[Callable[[Any], bool]], optional
+        :return: A pandas.DataFrame of the content of the REST API data, or None if accept dropped the response
+        :rtype: Any
+        """  # noqa: E501
+        client: Client = getClient() if self.client is None else self.client
+
+        record: Optional[CallRecord] = instrument.begin(
+            name=type(self).__name__,
+            url=endpoint,
+        )
+        if record is None:
+            return self._query(
+                client=client,
+                endpoint=endpoint,
+                record=None,
+                accept=accept,
+            )
+
+        try:
+            value: Any = self._query(
+                client=client,
+                endpoint=endpoint,
+                record=record,
+                accept=accept,
+            )
+        except BaseException as error:
+            instrument.end(record=record, error=error)
+            raise
+
+        instrument.end(record=record, value=value)
+        return value
+
+    def _query(
+        self,
+        client: "Client",
+        endpoint: str,
+        record: Optional[CallRecord],
+        accept: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        self.stale = False
+
+        if client.cache is None:
+            data: Any = self._fetch(
+                client=client,
+                endpoint=endpoint,
+                record=record,
+            )
+            if (accept is not None) and (accept(data) is False):
+                return None
+
+            return self._parse(data=data, record=record)
+
+        key: tuple[str, bool, str] = (endpoint, self.normalize, self.output)
+
+        entry: Optional[CacheEntry] = self._lookup(
+            cache=client.cache,
+            key=key,
+            record=record,
+        )
+        if entry is None:
+            data = self._fetch(
+                client=client,
+                endpoint=endpoint,
+                record=record,
+            )
+            if (accept is not None) and (accept(data) is False):
+                return None
+
+            if self.stale:
+                return self._parse(data=data, record=record)
+
+            entry = self._store(
+                cache=client.cache,
+                key=key,
+                data=data,
+                record=record,
+            )
+
+        self.queryTime = entry.queryTime
+        return entry.result()
+
+    def _fetch(
+        self,
+        client: "Client",
+        endpoint: str,
+        record: Optional[CallRecord],
+    ) -> Any:
+        if client.resilience is None:
+            return self.fetch(client=client, endpoint=endpoint)
+
+        try:
+            data: Any = self.fetch(client=client, endpoint=endpoint)
+        except OSError:
+            data = client.resilience.lastGood(url=endpoint)
+            if data is None:
+                raise
+
+            self.stale = True
+            if record is not None:
+                record.cache = "stale"
+
+            return data
+
+        client.resilience.remember(url=endpoint, data=data)
+        return data
+
+    def _lookup(
+        self,
+        cache: ResponseCache,
+        key: tuple[str, bool, str],
+        record: Optional[CallRecord],
+    ) -> Optional[CacheEntry]:
+        entry: Optional[CacheEntry] = cache.lookup(key=key)
+
+        if (record is not None) and (entry is not None):
+            record.cache = "hit"
+
+        return entry
+
+    def _store(
+        self,
+        cache: ResponseCache,
+        key: tuple[str, bool, str],
+        data: Any,
+        record: Optional[CallRecord],
+    ) -> CacheEntry:
+        if record is None:
+            return cache.update(key=key, data=data, api=self)
+
+        revalidations: int = cache.revalidations
+        start: float = time.perf_counter()
+
+        entry: CacheEntry = cache.update(key=key, data=data, api=self)
+
+        if cache.revalidations > revalidations:
+            record.cache = "revalidated"
+        else:
+            record.cache = "miss"
+            record.add(
+                "frame",
+                time.perf_counter() - start - record.phases.get("validate", 0),
+            )
+
+        return entry
+
+    def _parse(self, data: Any, record: Optional[CallRecord]) -> Any:
+        if record is None:
+            return self.parse(data=data)
+
+        start: float = time.perf_counter()
+        value: Any = self.parse(data=data)
+        record.add(
+            "frame",
+            time.perf_counter() - start - record.phases.get("validate", 0),
+        )
+
+        return value
+
+    def fetch(self, client: "Client", endpoint: str) -> Any:
+        """
+        Get and decode the JSON data at a REST API endpoint URL
+
+        When the query is being measured, the time to connect, the time to the first byte, the time to download the body, the time to decode the JSON, the size of the body, the status code, and the number of retries are added to the current instrument.CallRecord.
+
+        :param client: The Client to submit the request with
+        :type client: Client
+        :param endpoint: The URL to submit the HTTP GET request to
+        :type endpoint: str
+        :return: The decoded JSON data
+        :rtype: Any
+        """  # noqa: E501
+        record: Optional[CallRecord] = instrument.current()
+        if record is None:
+            return self.decode(
+                resp=self.request(client=client, endpoint=endpoint),
+                endpoint=endpoint,
+            )
+
+        start: float = time.perf_counter()
+        resp: Response = self.request(client=client, endpoint=endpoint)
+        total: float = time.perf_counter() - start
+
+        elapsed: float = resp.elapsed.total_seconds()
+        record.add("ttfb", max(0, elapsed - record.phases.get("connect", 0)))
+        record.add("download", max(0, total - elapsed))
+        record.bytes += len(resp.content)
+        record.status = resp.status_code
+
+        retries: Any = getattr(resp.raw, "retries", None)
+        if retries is not None:
+            record.retries += len(retries.history)
+
+        start = time.perf_counter()
+        data: Any = self.decode(resp=resp, endpoint=endpoint)
+        record.add("decode", time.perf_counter() - start)
+
+        return data
+
+    def request(self, client: "Client", endpoint: str) -> "Response":
+        """
+        Submit the HTTP GET request of a query
+
+        :param client: The Client to submit the request with
+        :type client: Client
+        :param endpoint: The URL to submit the HTTP GET request to
+        :type endpoint: str
+        :return: A requests.Response object
+        :rtype: Response
+        """
+        return client.get(url=endpoint)
+
+    def decode(self, resp: "Response", endpoint: str) -> Any:
+        """
+        Decode the JSON body of the response to a query
+
+        :param resp: The response returned by request
+        :type resp: Response
+        :param endpoint: The URL the request was submitted to
+        :type endpoint: str
+        :return: The decoded JSON data
+        :rtype: Any
+        """
+        return resp.json()
+
+    def convert(
+        self,
+        data: List[dict],
+        record: type[Record],
+        schema: dict,
+        definition: str,
+    ) -> Any:
+        """
+        Convert the items of a JSON response to the output of the API class
+
+        Only the frame output imports pandas. The typed and batch outputs validate each item while converting it to the types hinted at by the schema, so pair them with ValidationPolicy(enabled=False) to skip the separate jsonschema pass; invalid items raise ValueError, or are skipped and counted in the policy's errors if it is not strict.
+
+        :param data: The items of the JSON response
+        :type data: List[dict]
+        :param record: The Record class of a single item
+        :type record: type[Record]
+        :param schema: JSON Schema of the response
+        :type schema: dict
+        :param definition: The name of the definition in the schema that describes a single item
+        :type definition: str
+        :return: A pandas.DataFrame (typed if normalize is set), a list of records or typed records, a RecordBatch, or the items themselves
+        :rtype: Any
+        """  # noqa: E501
+        if self.output == "frame":
+            return toFrame(
+                data=data,
+                schema=schema if self.normalize else None,
+                definition=definition,
+            )
+
+        if self.output == "records":
+            return [record.fromDict(data=item) for item in data]
+
+        if self.output == "dicts":
+            return data
+
+        if self.output in ("typed", "batch"):
+            policy: ValidationPolicy = getPolicy(client=self.client)
+            typed: type[TypedRecord] = recordType(
+                schema=schema,
+                definition=definition,
+            )
+
+            if self.output == "typed":
+                records: List[TypedRecord] = toRecords(
+                    recordType=typed,
+                    items=data,
+                    strict=policy.strict,
+                )
+                policy.errors += len(data) - len(records)
+                return records
+
+            batch: RecordBatch = RecordBatch.fromItems(
+                recordType=typed,
+                items=data,
+                strict=policy.strict,
+            )
+            policy.errors += batch.errors
+            return batch
+
+        raise ValueError(f"output must be one of {list(OUTPUTS)}")
+
+    def fetchAll(
+        self,
+        client: "Client",
+        endpoints: List[str],
+        workers: Optional[int] = None,
+    ) -> List[Any]:
+        """
+        Get and decode the JSON data at one or more REST API endpoint URLs in parallel
+
+        :param client: The Client to submit the requests with
+        :type client: Client
+        :param endpoints: The URLs to submit the HTTP GET requests to
+        :type endpoints: List[str]
+        :param workers: The maximum number of parallel requests (if not specified, one per endpoint)
+        :type workers: Optional[int], optional
+        :return: The decoded JSON data of each endpoint, in order
+        :rtype: List[Any]
+        """  # noqa: E501
+        if len(endpoints) <= 1:
+            return [self.fetch(client, url) for url in endpoints]
+
+        maxWorkers: int = workers or len(endpoints)
+        with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+            futures: List[Future] = [
+                executor.submit(copy_context().run, self.fetch, client, url)
+                for url in endpoints
+            ]
+
+            return [future.result() for future in futures]
+
 
 class API_PROTOCOL(Protocol):
     """
@@ -33,47 +441,359 @@ class API_PROTOCOL(Protocol):
 
     * queryTime: float    -> The UNIX timestamp of when a query was made
     * endpointBase: str   -> The base url of a CTA REST API endpoint
-    """
+    * client: Client      -> The Client to submit requests with
+    * normalize: bool     -> Whether or not returned DataFrames are typed
+    * output: str         -> Whether responses are returned as a frame, records, or dicts
+    """  # noqa: E501
 
     queryTime: float
     endpointBase: str
+    client: Optional["Client"]
+    normalize: bool
+    output: str
+
 
+_VALIDATORS: dict[int, tuple[dict, "Validator"]] = {}
+_VALIDATORS_LOCK: Lock = Lock()
 
-class SSLAdapter(HTTPAdapter):
+
+def getValidator(schema: dict) -> "Validator":
     """
-    The purpose of this code is to override the init_poolmanager method, which is responsible for initializing a pool of connections to a server. In this case, it's used to pass the ssl_context instance to the underlying connection pool manager.
+    Get a compiled validator for a JSON schema, compiling and caching it on first use
+
+    The schema is checked against its meta-schema only once, when the validator is first compiled.
 
-    By doing so, when creating a connection pool using this adapter, the connections will be established with SSL/TLS encryption enabled, using the provided context.
+    :param schema: JSON Schema
+    :type schema: dict
+    :return: A jsonschema validator bound to the schema
+    :rtype: Validator
     """  # noqa: E501
+    entry: tuple[dict, "Validator"] | None = _VALIDATORS.get(id(schema))
+    if (entry is not None) and (entry[0] is schema):
+        return entry[1]
+
+    from jsonschema.validators import validator_for
+
+    with _VALIDATORS_LOCK:
+        cls: type["Validator"] = validator_for(schema)
+        cls.check_schema(schema)
+
+        validator: "Validator" = cls(schema)
+        _VALIDATORS[id(schema)] = (schema, validator)
 
-    def __init__(self, ssl_context=None, **kwargs):
-        self.ssl_context = ssl_context
-        super().__init__(**kwargs)
+    return validator
 
-    def init_poolmanager(self, *args, **kwargs):
-        kwargs["ssl_context"] = self.ssl_context
-        return super().init_poolmanager(*args, **kwargs)
 
+def _truncate(data: Any, firstN: int) -> Any:
+    if isinstance(data, list):
+        return [_truncate(data=item, firstN=firstN) for item in data[:firstN]]
 
-def get(url: str) -> Response:
+    if isinstance(data, dict):
+        return {key: _truncate(data=data[key], firstN=firstN) for key in data}
+
+    return data
+
+
+class ValidationPolicy:
+    """
+    A policy that decides how much of each JSON response is validated against its JSON schema
+
+    The policy supports full validation, validating only the first N items of every array in a response, validating only every Nth response, or no validation at all. Counters of the number of responses seen, validated, skipped, and that failed validation are kept on the policy.
+    """  # noqa: E501
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        firstN: Optional[int] = None,
+        everyN: int = 1,
+        strict: bool = True,
+    ) -> None:
+        """
+        Initializes the class
+
+        :param enabled: Whether or not responses are validated at all
+        :type enabled: bool, optional
+        :param firstN: Only validate the first N items of every array in a response (if not specified, every item is validated)
+        :type firstN: Optional[int], optional
+        :param everyN: Only validate every Nth response
+        :type everyN: int, optional
+        :param strict: Raise jsonschema.ValidationError on invalid responses rather than counting the error and returning False
+        :type strict: bool, optional
+        :raises ValueError: If everyN is less than 1 or firstN is negative
+        """  # noqa: E501
+        if everyN < 1:
+            raise ValueError("everyN must be at least 1")
+
+        if (firstN is not None) and (firstN < 0):
+            raise ValueError("firstN must not be negative")
+
+        self.enabled: bool = enabled
+        self.firstN: Optional[int] = firstN
+        self.everyN: int = everyN
+        self.strict: bool = strict
+
+        self.responses: int = 0
+        self.validated: int = 0
+        self.skipped: int = 0
+        self.errors: int = 0
+        self.lastError: Optional["ValidationError"] = None
+
+    def validate(self, data: Any, schema: dict) -> bool:
+        """
+        Validate JSON data against a JSON schema according to the policy
+
+        :param data: JSON data
+        :type data: Any
+        :param schema: JSON Schema
+        :type schema: dict
+        :return: False if the JSON data does not match the JSON schema and the policy is not strict, else True
+        :rtype: bool
+        """  # noqa: E501
+        self.responses += 1
+
+        sampled: bool = (self.responses - 1) % self.everyN == 0
+        if (self.enabled is False) or (sampled is False):
+            self.skipped += 1
+            return True
+
+        if self.firstN is not None:
+            data = _truncate(data=data, firstN=self.firstN)
+
+        from jsonschema import ValidationError
+
+        self.validated += 1
+        try:
+            getValidator(schema=schema).validate(data)
+        except ValidationError as error:
+            self.errors += 1
+            self.lastError = error
+            if self.strict:
+                raise
+            return False
+
+        return True
+
+
+class Client:
+    """
+    A process-wide HTTP client that owns a single SSL context and a pooled, keep-alive requests.Session
+
+    Reusing one Client across queries means that repeated polls of the same host reuse already established TCP/TLS connections from the adapter's connection pool rather than paying for a fresh handshake on every request.
+    """  # noqa: E501
+
+    def __init__(
+        self,
+        poolConnections: int = 10,
+        poolMaxsize: int = 10,
+        maxRetries: int = 3,
+        backoffFactor: float = 0.5,
+        timeout: float | tuple[float, float] = 60,
+        policy: Optional[ValidationPolicy] = None,
+        cache: Optional[ResponseCache] = None,
+        scheduler: Optional["Scheduler"] = None,
+        backoffJitter: float = 0,
+        backoffMax: float = 120,
+        resilience: Optional["ResiliencePolicy"] = None,
+    ) -> None:
+        """
+        Initializes the class
+
+        :param poolConnections: The number of distinct host connection pools to cache
+        :type poolConnections: int, optional
+        :param poolMaxsize: The maximum number of connections to keep alive per host
+        :type poolMaxsize: int, optional
+        :param maxRetries: The number of times to retry a failed GET request
+        :type maxRetries: int, optional
+        :param backoffFactor: The exponential backoff factor (in seconds) applied between retries
+        :type backoffFactor: float, optional
+        :param timeout: The number of seconds to wait for the server to respond, or a (connect, read) tuple of seconds to wait to connect and to wait for each read
+        :type timeout: float | tuple[float, float], optional
+        :param policy: The policy used to validate responses (if not specified, every response is fully validated)
+        :type policy: Optional[ValidationPolicy], optional
+        :param cache: The cache to serve repeated queries from (if not specified, every query goes to the network)
+        :type cache: Optional[ResponseCache], optional
+        :param scheduler: The rate limiter to submit requests through, which may be shared between Clients (if not specified, requests are sent immediately)
+        :type scheduler: Optional[Scheduler], optional
+        :param backoffJitter: The maximum number of random seconds added to each backoff between retries, so that clients retrying together spread out
+        :type backoffJitter: float, optional
+        :param backoffMax: The maximum number of seconds to back off between retries
+        :type backoffMax: float, optional
+        :param resilience: The policy that sets per-endpoint timeouts, hedges slow requests, and breaks the circuit to failing endpoints (if not specified, every request uses timeout and is sent once)
+        :type resilience: Optional[ResiliencePolicy], optional
+        """  # noqa: E501
+        from requests import Session
+        from urllib3.util.retry import Retry
+
+        from cta.http import SSLAdapter
+
+        self.timeout: float | tuple[float, float] = timeout
+        if policy is None:
+            policy = ValidationPolicy()
+
+        self.policy: ValidationPolicy = policy
+        self.cache: Optional[ResponseCache] = cache
+        self.scheduler: Optional["Scheduler"] = scheduler
+        self.resilience: Optional["ResiliencePolicy"] = resilience
+
+        self.context: SSLContext = ssl.create_default_context()
+        self.context.set_ciphers("DEFAULT:@SECLEVEL=1")
+
+        retry: "Retry" = Retry(
+            total=maxRetries,
+            backoff_factor=backoffFactor,
+            backoff_jitter=backoffJitter,
+            backoff_max=backoffMax,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+        )
+
+        self.adapter: "SSLAdapter" = SSLAdapter(
+            ssl_context=self.context,
+            pool_connections=poolConnections,
+            pool_maxsize=poolMaxsize,
+            max_retries=retry,
+        )
+
+        self.session: "Session" = Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def get(
+        self,
+        url: str,
+        stream: bool = False,
+        headers: Optional[dict[str, str]] = None,
+    ) -> "Response":
+        """
+        Submit an HTTP GET request over a pooled connection
+
+        If the Client has a Scheduler, the request waits for a token and identical requests in flight share a single response; streamed requests and requests with headers are never shared. If the Client has a ResiliencePolicy, the request is sent through it with its endpoint's timeout, and may be hedged unless it is streamed.
+
+        :param url: A URL to submit the HTTP GET request to
+        :type url: str
+        :param stream: Defer downloading the response body so that it can be read incrementally from Response.raw
+        :type stream: bool, optional
+        :param headers: Headers to send in addition to the session's (e.g. conditional request headers)
+        :type headers: Optional[dict[str, str]], optional
+        :return: A requests.Response object
+        :rtype: Response
+        """  # noqa: E501
+        if self.scheduler is None:
+            return self._send(url=url, stream=stream, headers=headers)
+
+        return self.scheduler.submit(
+            url=url,
+            send=lambda: self._send(url=url, stream=stream, headers=headers),
+            coalesce=(stream is False) and not headers,
+        )
+
+    def _send(
+        self,
+        url: str,
+        stream: bool,
+        headers: Optional[dict[str, str]],
+    ) -> "Response":
+        if self.resilience is None:
+            return self.session.get(
+                url=url,
+                timeout=self.timeout,
+                stream=stream,
+                headers=headers,
+            )
+
+        timeout: tuple[float, float] = self.resilience.timeout(url=url)
+        return self.resilience.send(
+            url=url,
+            send=lambda: self.session.get(
+                url=url,
+                timeout=timeout,
+                stream=stream,
+                headers=headers,
+            ),
+            hedge=stream is False,
+        )
+
+    def close(self) -> None:
+        """
+        Close the session and release every pooled connection
+        """
+        self.session.close()
+        if self.resilience is not None:
+            self.resilience.close()
+
+
+_CLIENT: Optional[Client] = None
+_CLIENT_LOCK: Lock = Lock()
+
+
+def getClient() -> Client:
+    """
+    Get the process-wide Client, creating it on first use
+
+    :return: The shared Client instance
+    :rtype: Client
+    """
+    global _CLIENT
+
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = Client()
+
+    return _CLIENT
+
+
+def get(
+    url: str,
+    client: Optional[Client] = None,
+    stream: bool = False,
+    headers: Optional[dict[str, str]] = None,
+) -> "Response":
     """
     A generic HTTP GET request that leverages TLSv1 connections.
 
     :param url: A URL to submit the HTTP GET request to
     :type url: str
+    :param client: The Client to submit the request with (if not specified, the process-wide Client is used)
+    :type client: Optional[Client], optional
+    :param stream: Defer downloading the response body so that it can be read incrementally from Response.raw
+    :type stream: bool, optional
+    :param headers: Headers to send in addition to the session's (e.g. conditional request headers)
+    :type headers: Optional[dict[str, str]], optional
     :return: A requests.Response object
     :rtype: Response
+    """  # noqa: E501
+    if client is None:
+        client = getClient()
+
+    return client.get(url=url, stream=stream, headers=headers)
+
+
+def getPolicy(client: Optional[Client] = None) -> ValidationPolicy:
     """
-    context: SSLContext = ssl.create_default_context()
-    context.set_ciphers("DEFAULT:@SECLEVEL=1")
+    Get the validation policy of a Client
 
-    session: Session = Session()
-    session.mount("https://", SSLAdapter(ssl_context=context))
+    :param client: The Client to get the policy of (if not specified, the process-wide Client is used)
+    :type client: Optional[Client], optional
+    :return: The Client's validation policy
+    :rtype: ValidationPolicy
+    """  # noqa: E501
+    if client is None:
+        client = getClient()
 
-    return session.get(url=url, timeout=60)
+    return client.policy
 
 
-def validateData(data: dict, schema: dict) -> bool:
+def validateData(
+    data: dict,
+    schema: dict,
+    policy: Optional[ValidationPolicy] = None,
+) -> bool:
     """
     Given JSON data from a requests.Response().json() and a JSON schema object, validate that the JSON data matches the JSON schema
 
@@ -81,8 +801,20 @@ def validateData(data: dict, schema: dict) -> bool:
     :type data: dict
     :param schema: JSON Schema
     :type schema: dict
-    :return: True if the JSON data matches the JSON schema, else jsonschema.ValidationError is raised
+    :param policy: The policy to validate the JSON data with (if not specified, the JSON data is fully validated)
+    :type policy: Optional[ValidationPolicy], optional
+    :return: True if the JSON data matches the JSON schema, False if it does not and the policy is not strict, else jsonschema.ValidationError is raised
     :rtype: bool
     """  # noqa: E501
-    validate(instance=data, schema=schema)
-    return True
+    record: Optional[CallRecord] = instrument.current()
+    start: float = time.perf_counter() if record is not None else 0
+
+    try:
+        if policy is not None:
+            return policy.validate(data=data, schema=schema)
+
+        getValidator(schema=schema).validate(data)
+        return True
+    finally:
+        if record is not None:
+            record.add("validate", time.perf_counter() - start)
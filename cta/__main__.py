@@ -0,0 +1,3 @@
+from cta.cli import main
+
+main(prog_name="cta")
@@ -0,0 +1,567 @@
+import asyncio
+import json
+import ssl
+import time
+from ssl import SSLContext
+from typing import Any, List, Optional, Sequence
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from pandas import DataFrame, concat
+
+from cta import ValidationPolicy, instrument
+from cta.cache import CacheEntry, DiskCache, ResponseCache
+from cta.fleet import FleetBuffer
+from cta.instrument import CallRecord
+from cta.lookup import StopsLookup
+from cta.records import RecordBatch, recordType
+from cta.schedule import Scheduler
+from cta.stops import Stops
+from cta.train import (
+    ARRIVALS_SCHEMA,
+    FOLLOWTHISTRAIN_SCHEMA,
+    Arrivals,
+    FollowThisTrain,
+    Locations,
+)
+
+
+class AsyncClient:
+    """
+    An asyncio HTTP client that owns a single SSL context and a pooled, keep-alive ClientSession
+
+    The number of requests in flight at any one time is bounded by a semaphore so that bulk queries do not overwhelm either the connection pool or the CTA servers.
+    """  # noqa: E501
+
+    def __init__(
+        self,
+        poolMaxsize: int = 100,
+        concurrency: int = 20,
+        timeout: float = 60,
+        policy: Optional[ValidationPolicy] = None,
+        cache: Optional[ResponseCache] = None,
+        scheduler: Optional[Scheduler] = None,
+    ) -> None:
+        """
+        Initializes the class
+
+        :param poolMaxsize: The maximum number of connections to keep alive across all hosts
+        :type poolMaxsize: int, optional
+        :param concurrency: The maximum number of requests in flight at once
+        :type concurrency: int, optional
+        :param timeout: The number of seconds to wait for the server to respond
+        :type timeout: float, optional
+        :param policy: The policy used to validate responses (if not specified, every response is fully validated)
+        :type policy: Optional[ValidationPolicy], optional
+        :param cache: The cache to serve repeated queries from (if not specified, every query goes to the network)
+        :type cache: Optional[ResponseCache], optional
+        :param scheduler: The rate limiter to submit requests through, which may be shared with other clients (if not specified, requests are sent immediately)
+        :type scheduler: Optional[Scheduler], optional
+        """  # noqa: E501
+        self.poolMaxsize: int = poolMaxsize
+        if policy is None:
+            policy = ValidationPolicy()
+
+        self.policy: ValidationPolicy = policy
+        self.cache: Optional[ResponseCache] = cache
+        self.scheduler: Optional[Scheduler] = scheduler
+        self.timeout: ClientTimeout = ClientTimeout(total=timeout)
+
+        self.context: SSLContext = ssl.create_default_context()
+        self.context.set_ciphers("DEFAULT:@SECLEVEL=1")
+
+        self.semaphore: asyncio.Semaphore = asyncio.Semaphore(concurrency)
+        self.session: Optional[ClientSession] = None
+
+    async def __aenter__(self) -> "AsyncClient":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    def _getSession(self) -> ClientSession:
+        if (self.session is None) or self.session.closed:
+            connector: TCPConnector = TCPConnector(
+                limit=self.poolMaxsize,
+                ssl=self.context,
+            )
+            self.session = ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+            )
+
+        return self.session
+
+    async def get(self, url: str) -> Any:
+        """
+        Submit an HTTP GET request over a pooled connection and decode the JSON response
+
+        If the client has a Scheduler, the request waits for a token and identical requests in flight share a single response.
+
+        :param url: A URL to submit the HTTP GET request to
+        :type url: str
+        :return: The decoded JSON response
+        :rtype: Any
+        """  # noqa: E501
+        if self.scheduler is None:
+            return await self._get(url=url)
+
+        return await self.scheduler.submitAsync(
+            url=url,
+            send=lambda: self._get(url=url),
+        )
+
+    async def _get(self, url: str) -> Any:
+        record: Optional[CallRecord] = instrument.current()
+
+        async with self.semaphore:
+            if record is None:
+                async with self._getSession().get(url) as resp:
+                    resp.raise_for_status()
+                    return await resp.json(content_type=None)
+
+            start: float = time.perf_counter()
+            async with self._getSession().get(url) as resp:
+                record.add("ttfb", time.perf_counter() - start)
+                record.status = resp.status
+                resp.raise_for_status()
+
+                start = time.perf_counter()
+                body: bytes = await resp.read()
+                record.add("download", time.perf_counter() - start)
+                record.bytes += len(body)
+
+        start = time.perf_counter()
+        data: Any = json.loads(body)
+        record.add("decode", time.perf_counter() - start)
+
+        return data
+
+    async def close(self) -> None:
+        """
+        Close the session and release every pooled connection
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+class AsyncAPI:
+    """
+    A mixin that provides an asyncio counterpart of cta.API.query to the asyncio API classes
+    """  # noqa: E501
+
+    client: AsyncClient
+
+    async def query(self, endpoint: str) -> Any:
+        """
+        Get and parse the data at a REST API endpoint URL, serving it from the client's ResponseCache when possible
+
+        :param endpoint: The URL to submit the HTTP GET request to
+        :type endpoint: str
+        :return: A pandas.DataFrame of the content of the REST API data
+        :rtype: Any
+        """  # noqa: E501
+        record: Optional[CallRecord] = instrument.begin(
+            name=type(self).__name__,
+            url=endpoint,
+        )
+        if record is None:
+            return await self._queryAsync(endpoint=endpoint, record=None)
+
+        try:
+            value: Any = await self._queryAsync(
+                endpoint=endpoint,
+                record=record,
+            )
+        except BaseException as error:
+            instrument.end(record=record, error=error)
+            raise
+
+        instrument.end(record=record, value=value)
+        return value
+
+    def combine(
+        self,
+        results: List[Any],
+        schema: dict,
+        definition: str,
+    ) -> Any:
+        """
+        Concatenate the responses of concurrent queries
+
+        :param results: The parsed responses
+        :type results: List[Any]
+        :param schema: JSON Schema of the responses, to type the result when there are no responses
+        :type schema: dict
+        :param definition: The name of the definition in the schema that describes a single item
+        :type definition: str
+        :return: A single pandas.DataFrame, RecordBatch, or list of records or dicts depending on output
+        :rtype: Any
+        """  # noqa: E501
+        if (len(results) == 0) and (self.output in ("frame", "batch")):
+            empty: RecordBatch = RecordBatch(
+                recordType=recordType(schema=schema, definition=definition),
+            )
+            return empty.toFrame() if self.output == "frame" else empty
+
+        if self.output == "frame":
+            return concat(objs=results, ignore_index=True)
+
+        if self.output == "batch":
+            batch: RecordBatch = RecordBatch(recordType=results[0].recordType)
+
+            result: RecordBatch
+            for result in results:
+                batch.merge(other=result)
+
+            return batch
+
+        return [item for result in results for item in result]
+
+    async def _queryAsync(
+        self,
+        endpoint: str,
+        record: Optional[CallRecord],
+    ) -> Any:
+        if self.client.cache is None:
+            return self._parse(
+                data=await self.client.get(url=endpoint),
+                record=record,
+            )
+
+        key: tuple[str, bool, str] = (endpoint, self.normalize, self.output)
+
+        entry: Optional[CacheEntry] = self._lookup(
+            cache=self.client.cache,
+            key=key,
+            record=record,
+        )
+        if entry is None:
+            entry = self._store(
+                cache=self.client.cache,
+                key=key,
+                data=await self.client.get(url=endpoint),
+                record=record,
+            )
+
+        self.queryTime = entry.queryTime
+        return entry.result()
+
+
+class AsyncArrivals(AsyncAPI, Arrivals):
+    """
+    An asyncio counterpart of cta.train.Arrivals
+    """
+
+    def __init__(
+        self,
+        key: str,
+        client: AsyncClient,
+        normalize: bool = False,
+        output: str = "frame",
+        lookup: Optional[StopsLookup] = None,
+    ) -> None:
+        """
+        Initializes the class
+
+        :param key: Your unique API key, assigned to you after agreeing to DLA and requesting a key be generated for you
+        :type key: str
+        :param client: The AsyncClient to submit requests with
+        :type client: AsyncClient
+        :param normalize: Convert the columns of returned DataFrames to the dtypes hinted at by the JSON schema
+        :type normalize: bool, optional
+        :param output: Return responses as a frame (pandas.DataFrame), records (cta.records objects), dicts (the JSON objects as received), typed (typed records validated as they are converted), or batch (a cta.records.RecordBatch of typed columns)
+        :type output: str, optional
+        :param lookup: A stops lookup table to check mapid and stpid against before a request is made (if not specified, ids are sent as given)
+        :type lookup: Optional[StopsLookup], optional
+        """  # noqa: E501
+        super().__init__(
+            key=key,
+            normalize=normalize,
+            output=output,
+            lookup=lookup,
+        )
+        self.client: AsyncClient = client
+
+    async def get(
+        self,
+        mapid: int | None = None,
+        stpid: int | None = None,
+        max: Optional[int] = None,
+        rt: Optional[str] = None,
+    ) -> DataFrame:
+        """
+        Query the API endpoint
+
+        :param mapid: A single five-digit station code
+        :type mapid: int | None, optional
+        :param stpid: A single five-digit stop code
+        :type stpid: int | None, optional
+        :param max: The maximum number of results to return
+        :type max: Optional[int], optional
+        :param rt: A single route to filter results by
+        :type rt: Optional[str], optional
+        :return: The JSON response as a pandas.DataFrame object
+        :rtype: DataFrame
+        """
+        if (mapid is None) and (stpid is None):
+            return False
+
+        endpoint: str = self.buildEndpoint(
+            mapid=mapid,
+            stpid=stpid,
+            max=max,
+            rt=rt,
+        )
+
+        return await self.query(endpoint=endpoint)
+
+    async def gather(
+        self,
+        mapids: List[int],
+        max: Optional[int] = None,
+        rt: Optional[str] = None,
+    ) -> DataFrame:
+        """
+        Query the API endpoint for many stations concurrently
+
+        :param mapids: The five-digit station codes to get predictions for
+        :type mapids: List[int]
+        :param max: The maximum number of results to return per station
+        :type max: Optional[int], optional
+        :param rt: A single route to filter results by
+        :type rt: Optional[str], optional
+        :return: The JSON responses concatenated into a single pandas.DataFrame object
+        :rtype: DataFrame
+        """  # noqa: E501
+        dfs: List[DataFrame] = await asyncio.gather(
+            *[self.get(mapid=mapid, max=max, rt=rt) for mapid in mapids]
+        )
+
+        return self.combine(
+            results=dfs,
+            schema=ARRIVALS_SCHEMA,
+            definition="Eta",
+        )
+
+
+class AsyncFollowThisTrain(AsyncAPI, FollowThisTrain):
+    """
+    An asyncio counterpart of cta.train.FollowThisTrain
+    """
+
+    def __init__(
+        self,
+        key: str,
+        client: AsyncClient,
+        normalize: bool = False,
+        output: str = "frame",
+    ) -> None:
+        """
+        Initializes the class
+
+        :param key: Your unique API key, assigned to you after agreeing to DLA and requesting a key be generated for you
+        :type key: str
+        :param client: The AsyncClient to submit requests with
+        :type client: AsyncClient
+        :param normalize: Convert the columns of returned DataFrames to the dtypes hinted at by the JSON schema
+        :type normalize: bool, optional
+        :param output: Return responses as a frame (pandas.DataFrame), records (cta.records objects), dicts (the JSON objects as received), typed (typed records validated as they are converted), or batch (a cta.records.RecordBatch of typed columns)
+        :type output: str, optional
+        """  # noqa: E501
+        super().__init__(key=key, normalize=normalize, output=output)
+        self.client: AsyncClient = client
+
+    async def get(self, runnumber: int) -> DataFrame:
+        """
+        Query the API endpoint
+
+        :param runnumber: A single run number of a train
+        :type runnumber: int
+        :return: The JSON response as a pandas.DataFrame object
+        :rtype: DataFrame
+        """
+        endpoint: str = self.buildEndpoint(runnumber=runnumber)
+
+        return await self.query(endpoint=endpoint)
+
+    async def gather(self, runnumbers: List[int]) -> DataFrame:
+        """
+        Query the API endpoint for many trains concurrently
+
+        :param runnumbers: The run numbers of the trains to get predictions for
+        :type runnumbers: List[int]
+        :return: The JSON responses concatenated into a single pandas.DataFrame object
+        :rtype: DataFrame
+        """  # noqa: E501
+        dfs: List[DataFrame] = await asyncio.gather(
+            *[self.get(runnumber=runnumber) for runnumber in runnumbers]
+        )
+
+        return self.combine(
+            results=dfs,
+            schema=FOLLOWTHISTRAIN_SCHEMA,
+            definition="Eta",
+        )
+
+
+class AsyncLocations(AsyncAPI, Locations):
+    """
+    An asyncio counterpart of cta.train.Locations
+    """
+
+    def __init__(
+        self,
+        key: str,
+        client: AsyncClient,
+        normalize: bool = False,
+        output: str = "frame",
+    ) -> None:
+        """
+        Initializes the class
+
+        :param key: Your unique API key, assigned to you after agreeing to DLA and requesting a key be generated for you
+        :type key: str
+        :param client: The AsyncClient to submit requests with
+        :type client: AsyncClient
+        :param normalize: Convert the columns of returned DataFrames to the dtypes hinted at by the JSON schema
+        :type normalize: bool, optional
+        :param output: Return responses as a frame (pandas.DataFrame), records (cta.records objects), dicts (the JSON objects as received), typed (typed records validated as they are converted), or batch (a cta.records.RecordBatch of typed columns)
+        :type output: str, optional
+        """  # noqa: E501
+        super().__init__(key=key, normalize=normalize, output=output)
+        self.client: AsyncClient = client
+
+    async def get(self, rt: List[str]) -> dict[str, DataFrame]:
+        """
+        Query the API endpoint
+
+        :param rt: One or more routes to get train location information for
+        :type rt: List[str]
+        :return: The JSON response as a pandas.DataFrame per route, keyed on route
+        :rtype: dict[str, DataFrame]
+        """  # noqa: E501
+        endpoint: str = self.buildEndpoint(rt=rt)
+
+        return await self.query(endpoint=endpoint)
+
+    async def gather(self, rt: List[str]) -> dict[str, DataFrame]:
+        """
+        Query the API endpoint with one concurrent request per route
+
+        :param rt: One or more routes to get train location information for
+        :type rt: List[str]
+        :return: The JSON responses as a pandas.DataFrame per route, keyed on route
+        :rtype: dict[str, DataFrame]
+        """  # noqa: E501
+        dfs: dict[str, DataFrame] = {}
+
+        routes: List[dict[str, DataFrame]] = await asyncio.gather(
+            *[self.get(rt=[route]) for route in rt]
+        )
+
+        route: dict[str, DataFrame]
+        for route in routes:
+            dfs.update(route)
+
+        return dfs
+
+    async def gatherFleet(
+        self,
+        rt: List[str],
+        buffer: Optional[FleetBuffer] = None,
+    ) -> DataFrame:
+        """
+        Query the API endpoint with one concurrent request per route and convert every train to a single DataFrame with a categorical route column
+
+        Responses are not served from the client's ResponseCache.
+
+        :param rt: One or more routes to get train location information for
+        :type rt: List[str]
+        :param buffer: Fill and return a view of these preallocated buffers rather than allocating a new DataFrame (the view is overwritten by the next poll into the same buffer)
+        :type buffer: Optional[FleetBuffer], optional
+        :return: Every train as a pandas.DataFrame object
+        :rtype: DataFrame
+        """  # noqa: E501
+        record: Optional[CallRecord] = instrument.begin(
+            name=type(self).__name__,
+            url=self.buildEndpoint(rt=rt),
+        )
+
+        try:
+            urls: List[str] = [self.buildEndpoint(rt=[route]) for route in rt]
+            data: List[dict] = await asyncio.gather(
+                *[self.client.get(url=url) for url in urls]
+            )
+            df: DataFrame = self.parseFleet(data=data, buffer=buffer)
+        except BaseException as error:
+            if record is not None:
+                instrument.end(record=record, error=error)
+            raise
+
+        if record is not None:
+            instrument.end(record=record, value=df)
+
+        return df
+
+
+class AsyncStops(AsyncAPI, Stops):
+    """
+    An asyncio counterpart of cta.stops.Stops
+    """
+
+    def __init__(
+        self,
+        client: AsyncClient,
+        normalize: bool = False,
+        diskCache: Optional[DiskCache] = None,
+        output: str = "frame",
+    ) -> None:
+        """
+        Initializes the class
+
+        :param client: The AsyncClient to submit requests with
+        :type client: AsyncClient
+        :param normalize: Convert the columns of returned DataFrames to the dtypes hinted at by the JSON schema
+        :type normalize: bool, optional
+        :param diskCache: The on-disk cache to load the list of stops from (if not specified, the list is downloaded on every query)
+        :type diskCache: Optional[DiskCache], optional
+        :param output: Return responses as a frame (pandas.DataFrame), records (cta.records objects), dicts (the JSON objects as received), typed (typed records validated as they are converted), or batch (a cta.records.RecordBatch of typed columns)
+        :type output: str, optional
+        """  # noqa: E501
+        super().__init__(
+            normalize=normalize,
+            diskCache=diskCache,
+            output=output,
+        )
+        self.client: AsyncClient = client
+
+    async def get(
+        self,
+        select: Optional[Sequence[str]] = None,
+        where: Optional[str] = None,
+    ) -> DataFrame:
+        """
+        Query the API endpoint
+
+        Responses are not revalidated with conditional requests; the disk cache is reloaded from, and refreshed with, full responses.
+
+        :param select: The columns to download, sent as the $select parameter of the query (if not specified, every column is downloaded)
+        :type select: Optional[Sequence[str]], optional
+        :param where: A SoQL filter of the stops to download, sent as the $where parameter of the query
+        :type where: Optional[str], optional
+        :return: The JSON response as a pandas.DataFrame object
+        :rtype: DataFrame
+        """  # noqa: E501
+        endpoint: str = self.buildEndpoint(select=select, where=where)
+        self.select = None if select is None else tuple(select)
+
+        if self.diskCache is None:
+            return await self.query(endpoint=endpoint)
+
+        data: list | None = self.diskCache.load(key=endpoint)
+        if data is None:
+            data = await self.client.get(url=endpoint)
+            self.diskCache.store(key=endpoint, data=data)
+
+        return self.parse(data=data)
@@ -0,0 +1,722 @@
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+from pandas import (
+    DataFrame,
+    DatetimeTZDtype,
+    Series,
+    Timedelta,
+    Timestamp,
+    to_datetime,
+)
+
+from cta import TIMEZONE
+from cta.normalize import normalizeSeries
+from cta.records import Record, RecordBatch, columnTypes, toFrame
+from cta.train import ARRIVALS_SCHEMA
+
+ARRIVAL_COLUMNS: tuple[str, ...] = (
+    "staId",
+    "stpId",
+    "rn",
+    "rt",
+    "prdt",
+    "arrT",
+    "isApp",
+    "isSch",
+    "isDly",
+)
+
+# The NumPy dtype arrivalColumns returns for each column type of the schema
+EMPTY_DTYPES: dict[str, type] = {
+    "datetime": np.float64,
+    "bool": np.bool_,
+    "int32": np.int32,
+    "Int32": np.int32,
+}
+
+EPOCH: Timestamp = Timestamp(0, tz="UTC")
+SECOND: Timedelta = Timedelta(seconds=1)
+
+
+def arrivalColumns(
+    data: RecordBatch | DataFrame | Iterable[Record | dict],
+) -> dict[str, np.ndarray]:
+    """
+    Convert a snapshot of Arrivals predictions to NumPy columns
+
+    staId, stpId, and rn become int32 columns, rt an object column of route names, prdt and arrT float64 columns of seconds since the epoch, and isApp, isSch, and isDly bool columns. A queryTime column is carried over if the snapshot has one. A snapshot without predictions, which may have no columns at all, becomes empty columns of the same types.
+
+    :param data: A RecordBatch of Eta records, a DataFrame returned by Arrivals (normalized or not), or the records or JSON objects of a response
+    :type data: RecordBatch | DataFrame | Iterable[Record | dict]
+    :return: The columns, keyed on column name
+    :rtype: dict[str, np.ndarray]
+    """  # noqa: E501
+    columns: dict[str, np.ndarray] = {}
+
+    if isinstance(data, RecordBatch):
+        bits: np.ndarray = np.frombuffer(data.columns["bits"], dtype=np.uint64)
+        kinds: dict[str, str] = dict(
+            zip(data.recordType.SLOTS, data.recordType.KINDS),
+        )
+
+        column: str
+        for column in ARRIVAL_COLUMNS:
+            if column in data.recordType.FLAGS:
+                bit: int = data.recordType.FLAGS.index(column)
+                mask: np.uint64 = np.uint64(1 << bit)
+                columns[column] = (bits & mask) != 0
+            elif kinds[column] == "datetime":
+                columns[column] = np.frombuffer(
+                    data.columns[column],
+                    dtype=np.float64,
+                ).copy()
+            elif kinds[column] in ("int32", "Int32"):
+                columns[column] = np.frombuffer(
+                    data.columns[column],
+                    dtype=np.int32,
+                ).copy()
+            else:
+                columns[column] = np.array(data.columns[column], dtype=object)
+
+        return columns
+
+    if not isinstance(data, DataFrame):
+        data = toFrame(data=data, schema=ARRIVALS_SCHEMA, definition="Eta")
+
+    types: dict[str, str] = columnTypes(
+        schema=ARRIVALS_SCHEMA,
+        definition="Eta",
+    )
+
+    if len(data) == 0:
+        for column in ARRIVAL_COLUMNS:
+            columns[column] = np.empty(
+                0,
+                dtype=EMPTY_DTYPES.get(types.get(column, "object"), object),
+            )
+
+        if "queryTime" in data.columns:
+            columns["queryTime"] = np.empty(0, dtype=np.float64)
+
+        return columns
+
+    for column in ARRIVAL_COLUMNS:
+        series: Series = data[column]
+        kind: str = types.get(column, "object")
+
+        if kind == "datetime":
+            if not isinstance(series.dtype, DatetimeTZDtype):
+                series = normalizeSeries(series=series, dtype=kind)
+            columns[column] = ((series - EPOCH) / SECOND).to_numpy(
+                dtype=np.float64,
+                na_value=np.nan,
+            )
+        elif kind == "bool":
+            columns[column] = normalizeSeries(
+                series=series,
+                dtype=kind,
+            ).to_numpy(dtype=bool)
+        elif kind in ("int32", "Int32"):
+            columns[column] = normalizeSeries(
+                series=series,
+                dtype="int32",
+            ).to_numpy(dtype=np.int32)
+        else:
+            columns[column] = series.astype(str).to_numpy(dtype=object)
+
+    if "queryTime" in data.columns:
+        columns["queryTime"] = data["queryTime"].to_numpy(dtype=np.float64)
+
+    return columns
+
+
+def toDatetime(seconds: np.ndarray) -> Series:
+    """
+    Convert seconds since the epoch to timezone aware America/Chicago datetimes
+
+    :param seconds: Seconds since the epoch, NaN for missing values
+    :type seconds: np.ndarray
+    :return: The datetimes
+    :rtype: Series
+    """  # noqa: E501
+    return Series(
+        to_datetime(seconds, unit="s", utc=True).tz_convert(TIMEZONE),
+    )
+
+
+def groupStarts(keys: Sequence[np.ndarray]) -> np.ndarray:
+    """
+    Find where each run of equal keys starts in columns sorted on those keys
+
+    :param keys: Columns sorted on every key
+    :type keys: Sequence[np.ndarray]
+    :return: A mask that is True at the first row of every group
+    :rtype: np.ndarray
+    """
+    n: int = len(keys[0])
+    starts: np.ndarray = np.ones(n, dtype=bool)
+
+    key: np.ndarray
+    if n > 1:
+        starts[1:] = False
+        for key in keys:
+            starts[1:] |= key[1:] != key[:-1]
+
+    return starts
+
+
+def latestRows(keys: Sequence[np.ndarray], by: np.ndarray) -> np.ndarray:
+    """
+    Find the row with the greatest value of by in every group of rows with equal keys
+
+    Rows are sorted once on (keys, by) and the last row of every group is kept, so a run predicted several times keeps only its most recent prediction.
+
+    :param keys: The columns to group rows on
+    :type keys: Sequence[np.ndarray]
+    :param by: The column to pick the greatest row of each group by (e.g. prdt)
+    :type by: np.ndarray
+    :return: The indexes of the kept rows, sorted on keys
+    :rtype: np.ndarray
+    """  # noqa: E501
+    order: np.ndarray = np.lexsort((by,) + tuple(reversed(keys)))
+    starts: np.ndarray = groupStarts(keys=[key[order] for key in keys])
+
+    last: np.ndarray = np.empty(len(order), dtype=bool)
+    last[:-1] = starts[1:]
+    last[-1:] = True
+
+    return order[last]
+
+
+def gaps(
+    group: np.ndarray,
+    times: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sort rows on (group, times) and take the difference between consecutive times within each group
+
+    :param group: The column to group rows on (e.g. stpId)
+    :type group: np.ndarray
+    :param times: Seconds since the epoch (e.g. arrT)
+    :type times: np.ndarray
+    :return: The sort order and the gap before every row in that order, NaN for the first row of every group
+    :rtype: tuple[np.ndarray, np.ndarray]
+    """  # noqa: E501
+    order: np.ndarray = np.lexsort((times, group))
+    sortedTimes: np.ndarray = times[order]
+
+    result: np.ndarray = np.full(len(order), np.nan)
+    if len(order) > 1:
+        result[1:] = np.diff(sortedTimes)
+        result[groupStarts(keys=[group[order]])] = np.nan
+
+    return order, result
+
+
+def groupMedians(group: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    Get the median of the non-NaN values of every group in a single sort
+
+    :param group: The column to group rows on
+    :type group: np.ndarray
+    :param values: The values to take the median of
+    :type values: np.ndarray
+    :return: The median of every group, in ascending order of group, NaN for groups without values
+    :rtype: np.ndarray
+    """  # noqa: E501
+    keys: np.ndarray = np.unique(group)
+    valid: np.ndarray = ~np.isnan(values)
+
+    order: np.ndarray = np.lexsort((values[valid], group[valid]))
+    sortedGroup: np.ndarray = group[valid][order]
+    sortedValues: np.ndarray = values[valid][order]
+
+    first: np.ndarray = np.searchsorted(sortedGroup, keys, side="left")
+    last: np.ndarray = np.searchsorted(sortedGroup, keys, side="right")
+    count: np.ndarray = last - first
+
+    medians: np.ndarray = np.full(len(keys), np.nan)
+    present: np.ndarray = count > 0
+    if present.any():
+        low: np.ndarray = first[present] + (count[present] - 1) // 2
+        high: np.ndarray = first[present] + count[present] // 2
+        medians[present] = (sortedValues[low] + sortedValues[high]) / 2
+
+    return medians
+
+
+def stationHeadways(
+    data: RecordBatch | DataFrame | Iterable[Record | dict],
+    bunching: float = 120,
+) -> DataFrame:
+    """
+    Get the headway between consecutive runs at every stop of a batch of Arrivals snapshots
+
+    Only the latest prediction of each run at each stop is kept, so a run polled several times counts once, at the arrival time it was last predicted at. Headways are measured per stop (platform and direction) rather than per station.
+
+    :param data: One or more Arrivals snapshots
+    :type data: RecordBatch | DataFrame | Iterable[Record | dict]
+    :param bunching: The headway in seconds below which a run is flagged as bunched behind the run before it
+    :type bunching: float, optional
+    :return: A row per run and stop, sorted on stop and arrival time, with the headway in seconds to the previous run (NaN for the first run of a stop) and whether it is bunched
+    :rtype: DataFrame
+    """  # noqa: E501
+    columns: dict[str, np.ndarray] = arrivalColumns(data=data)
+
+    rows: np.ndarray = latestRows(
+        keys=[columns["stpId"], columns["rn"]],
+        by=columns["prdt"],
+    )
+
+    order: np.ndarray
+    headway: np.ndarray
+    order, headway = gaps(
+        group=columns["stpId"][rows],
+        times=columns["arrT"][rows],
+    )
+    rows = rows[order]
+
+    return DataFrame(
+        data={
+            "stpId": columns["stpId"][rows],
+            "staId": columns["staId"][rows],
+            "rt": columns["rt"][rows],
+            "rn": columns["rn"][rows],
+            "arrT": toDatetime(seconds=columns["arrT"][rows]),
+            "isDly": columns["isDly"][rows],
+            "headway": headway,
+            "bunched": headway < bunching,
+        }
+    )
+
+
+def delayRatios(
+    data: RecordBatch | DataFrame | Iterable[Record | dict],
+) -> DataFrame:
+    """
+    Get the share of runs of every route that are delayed, schedule based, or approaching in a batch of Arrivals snapshots
+
+    Each run counts once per route, with the flags of its latest prediction.
+
+    :param data: One or more Arrivals snapshots
+    :type data: RecordBatch | DataFrame | Iterable[Record | dict]
+    :return: A row per route with the number of runs, the number delayed, schedule based, and approaching, and delayRatio and scheduledRatio
+    :rtype: DataFrame
+    """  # noqa: E501
+    columns: dict[str, np.ndarray] = arrivalColumns(data=data)
+
+    routes: np.ndarray
+    codes: np.ndarray
+    routes, codes = np.unique(columns["rt"].astype(str), return_inverse=True)
+
+    rows: np.ndarray = latestRows(
+        keys=[codes, columns["rn"]],
+        by=columns["prdt"],
+    )
+
+    flags: tuple[str, ...] = ("isDly", "isSch", "isApp")
+
+    return _ratios(
+        routes=routes,
+        codes=codes[rows],
+        flags={flag: columns[flag][rows] for flag in flags},
+    )
+
+
+def _ratios(
+    routes: np.ndarray,
+    codes: np.ndarray,
+    flags: dict[str, np.ndarray],
+) -> DataFrame:
+    n: int = len(routes)
+
+    runs: np.ndarray = np.bincount(codes, minlength=n)
+    delayed: np.ndarray = np.bincount(
+        codes,
+        weights=flags["isDly"],
+        minlength=n,
+    ).astype(np.int64)
+    scheduled: np.ndarray = np.bincount(
+        codes,
+        weights=flags["isSch"],
+        minlength=n,
+    ).astype(np.int64)
+    approaching: np.ndarray = np.bincount(
+        codes,
+        weights=flags["isApp"],
+        minlength=n,
+    ).astype(np.int64)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return DataFrame(
+            data={
+                "runs": runs,
+                "delayed": delayed,
+                "scheduled": scheduled,
+                "approaching": approaching,
+                "delayRatio": delayed / runs,
+                "scheduledRatio": scheduled / runs,
+            },
+            index=Series(routes, name="rt"),
+        )
+
+
+class HeadwayTracker:
+    """
+    Maintain the headways of every stop and the delay ratio of every route across Arrivals polls
+
+    The latest prediction of each run at each stop is kept in small per-stop arrays sorted on arrival time. Each update sorts the new snapshot on stop once, then merges and recomputes only the stops the snapshot has predictions for, so the cost of a poll grows with the size of the snapshot rather than with the history of the day. Runs that have left a stop keep the arrival time they were last predicted at, which stands in for their actual arrival.
+
+    Delay ratios are counted per poll: every run in a snapshot adds one observation to its route, and a delayed one to the delayed count if its latest prediction has isDly set.
+    """  # noqa: E501
+
+    def __init__(
+        self,
+        bunching: float = 120,
+        window: Optional[float] = None,
+    ) -> None:
+        """
+        Initializes the class
+
+        :param bunching: The headway in seconds below which a run is flagged as bunched behind the run before it
+        :type bunching: float, optional
+        :param window: The number of seconds of arrivals to keep per stop before the latest query time (if not specified, every arrival is kept)
+        :type window: Optional[float], optional
+        """  # noqa: E501
+        self.bunching: float = bunching
+        self.window: Optional[float] = window
+
+        self.stops: dict[int, dict[str, np.ndarray]] = {}
+
+        self.routes: dict[str, int] = {}
+        self.routeNames: List[str] = []
+        self.observations: np.ndarray = np.zeros(0, dtype=np.int64)
+        self.delayed: np.ndarray = np.zeros(0, dtype=np.int64)
+        self.scheduled: np.ndarray = np.zeros(0, dtype=np.int64)
+
+        self.queryTime: float = -1
+        self.updates: int = 0
+        self.stopUpdates: int = 0
+        self.alerts: int = 0
+
+    def __len__(self) -> int:
+        return len(self.stops)
+
+    def _routeCodes(self, routes: np.ndarray) -> np.ndarray:
+        names: np.ndarray
+        inverse: np.ndarray
+        names, inverse = np.unique(routes.astype(str), return_inverse=True)
+
+        name: str
+        for name in names:
+            if name not in self.routes:
+                self.routes[name] = len(self.routeNames)
+                self.routeNames.append(name)
+
+        grown: int = len(self.routeNames) - len(self.observations)
+        if grown > 0:
+            zeros: np.ndarray = np.zeros(grown, dtype=np.int64)
+            self.observations = np.append(self.observations, zeros)
+            self.delayed = np.append(self.delayed, zeros)
+            self.scheduled = np.append(self.scheduled, zeros)
+
+        codes: np.ndarray = np.array(
+            [self.routes[name] for name in names],
+            dtype=np.int32,
+        )
+        return codes[inverse.reshape(-1)]
+
+    def _merge(
+        self,
+        stpId: int,
+        rows: dict[str, np.ndarray],
+        cutoff: float,
+    ) -> np.ndarray:
+        previous: Optional[dict[str, np.ndarray]] = self.stops.get(stpId)
+
+        merged: dict[str, np.ndarray] = rows
+        if previous is not None:
+            merged = {
+                column: np.concatenate((previous[column], rows[column]))
+                for column in rows
+            }
+
+        keep: np.ndarray = latestRows(keys=[merged["rn"]], by=merged["prdt"])
+        keep = keep[merged["arrT"][keep] >= cutoff]
+        keep = keep[np.argsort(merged["arrT"][keep], kind="stable")]
+
+        state: dict[str, np.ndarray]
+        state = {column: merged[column][keep] for column in rows}
+
+        headway: np.ndarray = np.full(len(keep), np.nan)
+        if len(keep) > 1:
+            headway[1:] = np.diff(state["arrT"])
+        state["headway"] = headway
+
+        bunched: np.ndarray = headway < self.bunching
+        self.stops[stpId] = state
+
+        if previous is None:
+            return np.flatnonzero(bunched)
+
+        before: np.ndarray = previous["headway"] < self.bunching
+        wasBunched: np.ndarray = previous["rn"][before]
+        return np.flatnonzero(bunched & ~np.isin(state["rn"], wasBunched))
+
+    def update(
+        self,
+        data: RecordBatch | DataFrame | Iterable[Record | dict],
+        queryTime: Optional[float] = None,
+    ) -> DataFrame:
+        """
+        Merge an Arrivals snapshot into the tracked stops and routes
+
+        :param data: An Arrivals snapshot, or several polled at once
+        :type data: RecordBatch | DataFrame | Iterable[Record | dict]
+        :param queryTime: The UNIX timestamp of the snapshot (if not specified, the greatest queryTime column value, or else the latest prdt, is used)
+        :type queryTime: Optional[float], optional
+        :return: A bunching alert per run that became bunched behind the run before it at a stop, with the stop, run, route, arrival time, and headway in seconds
+        :rtype: DataFrame
+        """  # noqa: E501
+        columns: dict[str, np.ndarray] = arrivalColumns(data=data)
+        n: int = len(columns["stpId"])
+
+        if queryTime is None:
+            times: np.ndarray = columns.get("queryTime", columns["prdt"])
+            queryTime = float(np.nanmax(times)) if n > 0 else self.queryTime
+
+        self.queryTime = max(self.queryTime, queryTime)
+        self.updates += 1
+
+        cutoff: float = -np.inf
+        if self.window is not None:
+            cutoff = self.queryTime - self.window
+
+        codes: np.ndarray = self._routeCodes(routes=columns["rt"])
+
+        runs: np.ndarray = latestRows(
+            keys=[codes, columns["rn"]],
+            by=columns["prdt"],
+        )
+        np.add.at(self.observations, codes[runs], 1)
+        np.add.at(self.delayed, codes[runs], columns["isDly"][runs])
+        np.add.at(self.scheduled, codes[runs], columns["isSch"][runs])
+
+        order: np.ndarray = np.argsort(columns["stpId"], kind="stable")
+        stpIds: np.ndarray = columns["stpId"][order]
+        starts: np.ndarray = np.flatnonzero(groupStarts(keys=[stpIds]))
+        ends: np.ndarray = np.append(starts[1:], n)
+
+        snapshot: dict[str, np.ndarray] = {
+            "rn": columns["rn"][order],
+            "staId": columns["staId"][order],
+            "route": codes[order],
+            "prdt": columns["prdt"][order],
+            "arrT": columns["arrT"][order],
+            "isDly": columns["isDly"][order],
+        }
+
+        alerts: List[tuple[int, np.ndarray]] = []
+
+        start: int
+        end: int
+        for start, end in zip(starts, ends):
+            stpId: int = int(stpIds[start])
+            bunched: np.ndarray = self._merge(
+                stpId=stpId,
+                rows={
+                    column: values[slice(start, end)]
+                    for column, values in snapshot.items()
+                },
+                cutoff=cutoff,
+            )
+            self.stopUpdates += 1
+
+            if len(bunched) > 0:
+                alerts.append((stpId, bunched))
+
+        self.alerts += sum(len(index) for _, index in alerts)
+
+        return self._alerts(alerts=alerts)
+
+    def _alerts(self, alerts: List[tuple[int, np.ndarray]]) -> DataFrame:
+        if len(alerts) == 0:
+            return DataFrame(
+                columns=[
+                    "stpId",
+                    "staId",
+                    "rt",
+                    "rn",
+                    "previousRn",
+                    "arrT",
+                    "headway",
+                ]
+            )
+
+        routeNames: np.ndarray = np.array(self.routeNames, dtype=object)
+
+        def gather(column: str, offset: int = 0) -> np.ndarray:
+            parts: List[np.ndarray] = []
+
+            stpId: int
+            index: np.ndarray
+            for stpId, index in alerts:
+                parts.append(self.stops[stpId][column][index - offset])
+
+            return np.concatenate(parts)
+
+        return DataFrame(
+            data={
+                "stpId": np.repeat(
+                    np.array([stpId for stpId, _ in alerts], dtype=np.int32),
+                    [len(index) for _, index in alerts],
+                ),
+                "staId": gather(column="staId"),
+                "rt": routeNames[gather(column="route")],
+                "rn": gather(column="rn"),
+                "previousRn": gather(column="rn", offset=1),
+                "arrT": toDatetime(seconds=gather(column="arrT")),
+                "headway": gather(column="headway"),
+            }
+        )
+
+    def headways(self, stpId: Optional[int] = None) -> DataFrame:
+        """
+        Get the tracked arrivals of one or every stop
+
+        :param stpId: A single five-digit stop code (if not specified, every stop is returned)
+        :type stpId: Optional[int], optional
+        :return: A row per run and stop, sorted on stop and arrival time, with the headway in seconds to the previous run and whether it is bunched
+        :rtype: DataFrame
+        """  # noqa: E501
+        columns: dict[str, np.ndarray] = self._concatenate(stpId=stpId)
+        routeNames: np.ndarray = np.array(self.routeNames, dtype=object)
+
+        return DataFrame(
+            data={
+                "stpId": columns["stpId"],
+                "staId": columns["staId"],
+                "rt": routeNames[columns["route"]],
+                "rn": columns["rn"],
+                "arrT": toDatetime(seconds=columns["arrT"]),
+                "isDly": columns["isDly"],
+                "headway": columns["headway"],
+                "bunched": columns["headway"] < self.bunching,
+            }
+        )
+
+    def _concatenate(self, stpId: Optional[int]) -> dict[str, np.ndarray]:
+        stops: List[int] = (
+            sorted(self.stops)
+            if stpId is None
+            else [stpId]
+            if stpId in self.stops
+            else []
+        )
+
+        if len(stops) == 0:
+            return {
+                "stpId": np.empty(0, dtype=np.int32),
+                "staId": np.empty(0, dtype=np.int32),
+                "route": np.empty(0, dtype=np.int32),
+                "rn": np.empty(0, dtype=np.int32),
+                "arrT": np.empty(0, dtype=np.float64),
+                "isDly": np.empty(0, dtype=bool),
+                "headway": np.empty(0, dtype=np.float64),
+            }
+
+        columns: dict[str, np.ndarray] = {
+            column: np.concatenate(
+                [self.stops[stop][column] for stop in stops],
+            )
+            for column in ("staId", "route", "rn", "arrT", "isDly", "headway")
+        }
+        columns["stpId"] = np.repeat(
+            np.array(stops, dtype=np.int32),
+            [len(self.stops[stop]["rn"]) for stop in stops],
+        )
+
+        return columns
+
+    def summary(self) -> DataFrame:
+        """
+        Summarize the headways of every tracked stop
+
+        :return: A row per stop with its station, the number of tracked arrivals, the mean, median, and minimum headway in seconds, and the number of bunched arrivals
+        :rtype: DataFrame
+        """  # noqa: E501
+        columns: dict[str, np.ndarray] = self._concatenate(stpId=None)
+
+        stops: np.ndarray
+        first: np.ndarray
+        counts: np.ndarray
+        stops, first, counts = np.unique(
+            columns["stpId"],
+            return_index=True,
+            return_counts=True,
+        )
+
+        headway: np.ndarray = columns["headway"]
+        valid: np.ndarray = ~np.isnan(headway)
+        index: np.ndarray = np.searchsorted(stops, columns["stpId"])
+
+        total: np.ndarray = np.bincount(
+            index[valid],
+            weights=headway[valid],
+            minlength=len(stops),
+        )
+        gapCount: np.ndarray = np.bincount(index[valid], minlength=len(stops))
+        minimum: np.ndarray = np.full(len(stops), np.inf)
+        np.minimum.at(minimum, index[valid], headway[valid])
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return DataFrame(
+                data={
+                    "staId": columns["staId"][first],
+                    "arrivals": counts,
+                    "meanHeadway": total / gapCount,
+                    "medianHeadway": groupMedians(
+                        group=columns["stpId"],
+                        values=headway,
+                    ),
+                    "minHeadway": np.where(gapCount > 0, minimum, np.nan),
+                    "bunched": np.bincount(
+                        index,
+                        weights=headway < self.bunching,
+                        minlength=len(stops),
+                    ).astype(np.int64),
+                },
+                index=Series(stops, name="stpId"),
+            )
+
+    def delays(self) -> DataFrame:
+        """
+        Get the delay ratio of every route across every update
+
+        :return: A row per route with the number of run observations, the number delayed and schedule based, and delayRatio and scheduledRatio
+        :rtype: DataFrame
+        """  # noqa: E501
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return DataFrame(
+                data={
+                    "observations": self.observations,
+                    "delayed": self.delayed,
+                    "scheduled": self.scheduled,
+                    "delayRatio": self.delayed / self.observations,
+                    "scheduledRatio": self.scheduled / self.observations,
+                },
+                index=Series(self.routeNames, name="rt", dtype=object),
+            )
+
+    def clear(self) -> None:
+        """
+        Forget every tracked stop and route
+        """
+        self.stops.clear()
+        self.routes.clear()
+        self.routeNames.clear()
+        self.observations = np.zeros(0, dtype=np.int64)
+        self.delayed = np.zeros(0, dtype=np.int64)
+        self.scheduled = np.zeros(0, dtype=np.int64)
+        self.queryTime = -1
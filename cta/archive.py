@@ -0,0 +1,323 @@
+from pathlib import Path
+from typing import List, Optional, Sequence
+from uuid import uuid4
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+from pandas import DataFrame
+from pyarrow import fs
+
+from cta import serviceDate
+from cta.normalize import normalizeFrame
+from cta.train import ARRIVALS_SCHEMA, FOLLOWTHISTRAIN_SCHEMA, LOCATIONS_SCHEMA
+
+SOURCES: dict[str, tuple[dict, str]] = {
+    "arrivals": (ARRIVALS_SCHEMA, "Eta"),
+    "follow": (FOLLOWTHISTRAIN_SCHEMA, "Eta"),
+    "locations": (LOCATIONS_SCHEMA, "Train"),
+}
+
+FORMATS: dict[str, str] = {"parquet": "parquet", "arrow": "ipc"}
+
+# The route names of FollowThisTrain, keyed on those of Locations requests;
+# Arrivals names routes by capitalizing them (e.g. Red, Brn, G)
+LINE_NAMES: dict[str, str] = {
+    "red": "Red Line",
+    "blue": "Blue Line",
+    "brn": "Brown Line",
+    "g": "Green Line",
+    "org": "Orange Line",
+    "p": "Purple Line",
+    "pink": "Pink Line",
+    "y": "Yellow Line",
+}
+
+PARTITIONING: ds.Partitioning = ds.partitioning(
+    schema=pa.schema(
+        [("serviceDate", pa.string()), ("route", pa.string())],
+    ),
+    flavor="hive",
+)
+
+
+def routeKey(name: str) -> str:
+    """
+    Convert the route name of any endpoint to the name Locations requests use, which partitions the archive
+
+    :param name: A route name as returned by Arrivals (e.g. Brn), FollowThisTrain (e.g. Brown Line), or requested from Locations (e.g. brn)
+    :type name: str
+    :return: The route name Locations requests use
+    :rtype: str
+    """  # noqa: E501
+    key: str
+    line: str
+    for key, line in LINE_NAMES.items():
+        if name == line:
+            return key
+
+    return name.lower()
+
+
+def toTable(df: DataFrame) -> pa.Table:
+    """
+    Convert a typed DataFrame to an Arrow table with dictionary-encoded string columns
+
+    Categorical columns are cast to dictionary<int32, string> so that every file in an archive shares the same schema regardless of how many categories each poll contained.
+
+    :param df: A typed DataFrame
+    :type df: DataFrame
+    :return: The DataFrame as an Arrow table
+    :rtype: pa.Table
+    """  # noqa: E501
+    table: pa.Table = pa.Table.from_pandas(df=df, preserve_index=False)
+
+    fields: List[pa.Field] = [
+        (
+            field.with_type(pa.dictionary(pa.int32(), pa.string()))
+            if pa.types.is_dictionary(field.type)
+            else field
+        )
+        for field in table.schema
+    ]
+
+    return table.cast(pa.schema(fields, metadata=table.schema.metadata))
+
+
+class Archive:
+    """
+    An append-only, columnar archive of polled train data partitioned by service date and route
+
+    Each poll is normalized to typed columns, tagged with the queryTime recorded by the API class, and buffered in memory. Buffers are written out as Parquet or Arrow IPC files under <directory>/<source>/serviceDate=<YYYY-MM-DD>/route=<route>/ once they reach flushRows rows, or when flush() or close() is called. Routes are named as Locations requests name them (e.g. red, brn) whatever the source, so a route partition holds the same line in every source.
+    """  # noqa: E501
+
+    def __init__(
+        self,
+        directory: Path,
+        format: str = "parquet",
+        flushRows: int = 100000,
+    ) -> None:
+        """
+        Initializes the class
+
+        :param directory: The root directory of the archive
+        :type directory: Path
+        :param format: The file format to write, either parquet or arrow
+        :type format: str, optional
+        :param flushRows: The number of buffered rows of a partition at which it is written to disk
+        :type flushRows: int, optional
+        """  # noqa: E501
+        if format not in FORMATS:
+            raise ValueError(f"format must be one of {sorted(FORMATS)}")
+
+        self.directory: Path = Path(directory)
+        self.format: str = format
+        self.flushRows: int = flushRows
+
+        self.buffers: dict[tuple[str, str, str], List[pa.Table]] = {}
+        self.bufferedRows: dict[tuple[str, str, str], int] = {}
+
+    def __enter__(self) -> "Archive":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def append(
+        self,
+        source: str,
+        df: DataFrame,
+        queryTime: float,
+        route: Optional[str] = None,
+    ) -> None:
+        """
+        Append a single poll to the archive
+
+        :param source: The endpoint the poll came from, one of arrivals, follow, or locations
+        :type source: str
+        :param df: The DataFrame returned by the API class
+        :type df: DataFrame
+        :param queryTime: The queryTime recorded by the API class for the poll
+        :type queryTime: float
+        :param route: The route every row belongs to (if not specified, rows are partitioned by their route column, such as that of Locations.getFleet, or else their rt column)
+        :type route: Optional[str], optional
+        """  # noqa: E501
+        if df.empty:
+            return
+
+        schema: dict
+        definition: str
+        schema, definition = SOURCES[source]
+
+        df = normalizeFrame(df=df.copy(), schema=schema, definition=definition)
+        df["queryTime"] = queryTime
+
+        date: str = serviceDate(queryTime=queryTime)
+
+        if route is not None:
+            self._buffer(
+                key=(source, date, routeKey(name=route)),
+                table=toTable(df=df),
+            )
+            return
+
+        by: str = "route" if "route" in df.columns else "rt"
+
+        name: str
+        group: DataFrame
+        for name, group in df.groupby(by=by, observed=True, sort=False):
+            self._buffer(
+                key=(source, date, routeKey(name=str(name))),
+                table=toTable(df=group.drop(columns="route", errors="ignore")),
+            )
+
+    def appendLocations(
+        self,
+        dfs: dict[str, DataFrame],
+        queryTime: float,
+    ) -> None:
+        """
+        Append a single poll of cta.train.Locations to the archive
+
+        :param dfs: The DataFrames returned by Locations.get, keyed on route
+        :type dfs: dict[str, DataFrame]
+        :param queryTime: The queryTime recorded by Locations for the poll
+        :type queryTime: float
+        """
+        route: str
+        df: DataFrame
+        for route, df in dfs.items():
+            self.append(
+                source="locations",
+                df=df,
+                queryTime=queryTime,
+                route=route,
+            )
+
+    def _buffer(self, key: tuple[str, str, str], table: pa.Table) -> None:
+        self.buffers.setdefault(key, []).append(table)
+        self.bufferedRows[key] = self.bufferedRows.get(key, 0) + table.num_rows
+
+        if self.bufferedRows[key] >= self.flushRows:
+            self._write(key=key)
+
+    def _write(self, key: tuple[str, str, str]) -> None:
+        tables: List[pa.Table] = self.buffers.pop(key, [])
+        self.bufferedRows.pop(key, None)
+
+        if len(tables) == 0:
+            return
+
+        table: pa.Table = pa.concat_tables(tables, promote_options="default")
+
+        source: str
+        date: str
+        route: str
+        source, date, route = key
+
+        directory: Path = (
+            self.directory / source / f"serviceDate={date}" / f"route={route}"
+        )
+        directory.mkdir(parents=True, exist_ok=True)
+
+        if self.format == "parquet":
+            pq.write_table(table, directory / f"part-{uuid4().hex}.parquet")
+        else:
+            feather.write_feather(
+                table,
+                directory / f"part-{uuid4().hex}.arrow",
+                compression="uncompressed",
+            )
+
+    def flush(self) -> None:
+        """
+        Write every buffered poll to disk
+        """
+        key: tuple[str, str, str]
+        for key in list(self.buffers):
+            self._write(key=key)
+
+    def close(self) -> None:
+        """
+        Write every buffered poll to disk and close the archive
+        """
+        self.flush()
+
+    def dataset(self, source: str) -> ds.Dataset:
+        """
+        Open the archived polls of an endpoint as an Arrow dataset
+
+        Arrow IPC files are memory-mapped rather than read into memory.
+
+        :param source: The endpoint the polls came from, one of arrivals, follow, or locations
+        :type source: str
+        :return: The archived polls as a pyarrow.dataset.Dataset
+        :rtype: ds.Dataset
+        """  # noqa: E501
+        return ds.dataset(
+            source=str(self.directory / source),
+            format=FORMATS[self.format],
+            partitioning=PARTITIONING,
+            filesystem=fs.LocalFileSystem(use_mmap=True),
+        )
+
+    def read(
+        self,
+        source: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        routes: Optional[Sequence[str]] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> DataFrame:
+        """
+        Read the archived polls of an endpoint made within a time range
+
+        Only the service date and route partitions that overlap the request are opened.
+
+        :param source: The endpoint the polls came from, one of arrivals, follow, or locations
+        :type source: str
+        :param start: The UNIX timestamp of the earliest poll to read (if not specified, reads from the start of the archive)
+        :type start: Optional[float], optional
+        :param end: The UNIX timestamp of the latest poll to read (if not specified, reads to the end of the archive)
+        :type end: Optional[float], optional
+        :param routes: The routes to read, named as any endpoint names them (if not specified, every route is read)
+        :type routes: Optional[Sequence[str]], optional
+        :param columns: The columns to read (if not specified, every column is read)
+        :type columns: Optional[Sequence[str]], optional
+        :return: The archived polls as a pandas.DataFrame object
+        :rtype: DataFrame
+        """  # noqa: E501
+        if (self.directory / source).exists() is False:
+            return DataFrame()
+
+        expression: Optional[ds.Expression] = None
+        condition: ds.Expression
+
+        conditions: List[ds.Expression] = []
+        if start is not None:
+            conditions.append(
+                ds.field("serviceDate") >= serviceDate(queryTime=start),
+            )
+            conditions.append(ds.field("queryTime") >= start)
+        if end is not None:
+            conditions.append(
+                ds.field("serviceDate") <= serviceDate(queryTime=end),
+            )
+            conditions.append(ds.field("queryTime") <= end)
+        if routes is not None:
+            keys: List[str] = [routeKey(name=name) for name in routes]
+            conditions.append(ds.field("route").isin(keys))
+
+        for condition in conditions:
+            if expression is None:
+                expression = condition
+            else:
+                expression = expression & condition
+
+        table: pa.Table = self.dataset(source=source).to_table(
+            columns=None if columns is None else list(columns),
+            filter=expression,
+        )
+
+        return table.to_pandas()
@@ -0,0 +1,333 @@
+import json
+import os
+import time
+from collections import OrderedDict
+from copy import copy
+from hashlib import sha256
+from pathlib import Path
+from threading import Lock
+from typing import Any, Hashable, Optional
+
+DEFAULT_DIRECTORY: Path = (
+    Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "cta"
+)
+
+
+def responseTimestamp(data: Any) -> Optional[str]:
+    """
+    Get the ctatt.tmst timestamp of a Train Tracker JSON response
+
+    :param data: JSON data
+    :type data: Any
+    :return: The timestamp, or None if the response does not have one
+    :rtype: Optional[str]
+    """
+    try:
+        return data["ctatt"]["tmst"]
+    except (KeyError, TypeError):
+        return None
+
+
+def _copy(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+
+    if isinstance(value, list):
+        return [copy(item) for item in value]
+
+    if hasattr(value, "copy"):
+        return value.copy()
+
+    return copy(value)
+
+
+class CacheEntry:
+    """
+    A single parsed response stored in a ResponseCache
+    """
+
+    __slots__ = ("expires", "tmst", "queryTime", "value")
+
+    def __init__(
+        self,
+        expires: float,
+        tmst: Optional[str],
+        queryTime: float,
+        value: Any,
+    ) -> None:
+        self.expires: float = expires
+        self.tmst: Optional[str] = tmst
+        self.queryTime: float = queryTime
+        self.value: Any = value
+
+    def result(self) -> Any:
+        """
+        Get a copy of the parsed response that is safe for the caller to modify
+
+        :return: A copy of the parsed response
+        :rtype: Any
+        """
+        return _copy(self.value)
+
+
+class ResponseCache:
+    """
+    An in-memory, time-to-live (TTL) and least-recently-used (LRU) cache of parsed API responses
+
+    Entries are keyed on the normalized query (the endpoint URL) so that identical queries made within the TTL are served without a network request, JSON schema validation, or DataFrame construction. When revalidation is enabled, a response fetched after an entry expires whose ctatt.tmst timestamp matches the cached entry reuses the cached result rather than being parsed again.
+    """  # noqa: E501
+
+    def __init__(
+        self,
+        maxsize: int = 256,
+        ttl: float = 30,
+        revalidate: bool = True,
+    ) -> None:
+        """
+        Initializes the class
+
+        :param maxsize: The maximum number of entries to keep before evicting the least recently used entry
+        :type maxsize: int, optional
+        :param ttl: The number of seconds an entry is served without going to the network
+        :type ttl: float, optional
+        :param revalidate: Reuse an expired entry if a freshly fetched response has the same ctatt.tmst timestamp
+        :type revalidate: bool, optional
+        """  # noqa: E501
+        self.maxsize: int = maxsize
+        self.ttl: float = ttl
+        self.revalidate: bool = revalidate
+
+        self.entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self.lock: Lock = Lock()
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.revalidations: int = 0
+        self.evictions: int = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(self, key: Hashable) -> Optional[CacheEntry]:
+        """
+        Get an unexpired entry from the cache
+
+        :param key: The normalized query
+        :type key: Hashable
+        :return: The entry, or None if there is no unexpired entry for the query
+        :rtype: Optional[CacheEntry]
+        """  # noqa: E501
+        with self.lock:
+            entry: Optional[CacheEntry] = self.entries.get(key)
+
+            if (entry is None) or (entry.expires <= time.monotonic()):
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def update(self, key: Hashable, data: Any, api: Any) -> CacheEntry:
+        """
+        Store a freshly fetched response, parsing it with the API class that requested it unless it can be revalidated against an expired entry
+
+        :param key: The normalized query
+        :type key: Hashable
+        :param data: The JSON response of the API endpoint
+        :type data: Any
+        :param api: The API class instance that made the query
+        :type api: Any
+        :return: The stored entry
+        :rtype: CacheEntry
+        """  # noqa: E501
+        tmst: Optional[str] = responseTimestamp(data=data)
+
+        with self.lock:
+            entry: Optional[CacheEntry] = self.entries.get(key)
+
+            if (
+                self.revalidate
+                and (entry is not None)
+                and (tmst is not None)
+                and (entry.tmst == tmst)
+            ):
+                entry.expires = time.monotonic() + self.ttl
+                self.entries.move_to_end(key)
+                self.revalidations += 1
+                return entry
+
+        value: Any = api.parse(data=data)
+
+        entry = CacheEntry(
+            expires=time.monotonic() + self.ttl,
+            tmst=tmst,
+            queryTime=api.queryTime,
+            value=value,
+        )
+
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+        return entry
+
+    def clear(self) -> None:
+        """
+        Remove every entry from the cache
+        """
+        with self.lock:
+            self.entries.clear()
+
+
+class DiskCache:
+    """
+    An on-disk, time-to-live (TTL) cache of raw JSON responses
+
+    This is intended for datasets that rarely change, such as the list of CTA L stops, so that they are not downloaded again every time a process starts.
+    """  # noqa: E501
+
+    def __init__(
+        self,
+        directory: Path = DEFAULT_DIRECTORY,
+        ttl: float = 86400,
+    ) -> None:
+        """
+        Initializes the class
+
+        :param directory: The directory to store responses in
+        :type directory: Path, optional
+        :param ttl: The number of seconds a stored response is served without going to the network
+        :type ttl: float, optional
+        """  # noqa: E501
+        self.directory: Path = Path(directory)
+        self.ttl: float = ttl
+
+    def path(self, key: str) -> Path:
+        """
+        Get the path of the file that a response is stored in
+
+        :param key: The normalized query
+        :type key: str
+        :return: The path of the file
+        :rtype: Path
+        """
+        return self.directory / f"{sha256(key.encode()).hexdigest()}.json"
+
+    def metaPath(self, key: str) -> Path:
+        """
+        Get the path of the file that the validators of a response are stored in
+
+        :param key: The normalized query
+        :type key: str
+        :return: The path of the file
+        :rtype: Path
+        """  # noqa: E501
+        return self.path(key=key).with_suffix(".meta.json")
+
+    def fresh(self, key: str) -> bool:
+        """
+        Check whether a stored response is within its TTL
+
+        :param key: The normalized query
+        :type key: str
+        :return: True if the response can be served without going to the network
+        :rtype: bool
+        """  # noqa: E501
+        try:
+            return time.time() - self.path(key=key).stat().st_mtime < self.ttl
+        except OSError:
+            return False
+
+    def load(self, key: str, stale: bool = False) -> Any:
+        """
+        Load an unexpired response from disk
+
+        :param key: The normalized query
+        :type key: str
+        :param stale: Load the response even if it has expired (e.g. after the server confirmed it is unchanged)
+        :type stale: bool, optional
+        :return: The JSON response, or None if there is no unexpired response for the query
+        :rtype: Any
+        """  # noqa: E501
+        path: Path = self.path(key=key)
+
+        try:
+            age: float = time.time() - path.stat().st_mtime
+            if (stale is False) and (age >= self.ttl):
+                return None
+
+            with open(path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def validators(self, key: str) -> dict[str, str]:
+        """
+        Load the ETag and Last-Modified headers a stored response was served with
+
+        :param key: The normalized query
+        :type key: str
+        :return: The headers, or an empty dict if the response or its headers were not stored
+        :rtype: dict[str, str]
+        """  # noqa: E501
+        if self.path(key=key).exists() is False:
+            return {}
+
+        try:
+            with open(self.metaPath(key=key), "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def store(
+        self,
+        key: str,
+        data: Any,
+        validators: Optional[dict[str, str]] = None,
+    ) -> None:
+        """
+        Store a response on disk
+
+        :param key: The normalized query
+        :type key: str
+        :param data: The JSON response of the API endpoint
+        :type data: Any
+        :param validators: The ETag and Last-Modified headers the response was served with, to revalidate it with once it expires
+        :type validators: Optional[dict[str, str]], optional
+        """  # noqa: E501
+        path: Path = self.path(key=key)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        temp: Path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(temp, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+
+        os.replace(temp, path)
+
+        meta: Path = self.metaPath(key=key)
+        if not validators:
+            meta.unlink(missing_ok=True)
+            return
+
+        temp = meta.with_suffix(f".{os.getpid()}.tmp")
+        with open(temp, "w", encoding="utf-8") as file:
+            json.dump(validators, file)
+
+        os.replace(temp, meta)
+
+    def touch(self, key: str) -> None:
+        """
+        Restart the TTL of a stored response, after the server confirmed it is unchanged
+
+        :param key: The normalized query
+        :type key: str
+        """  # noqa: E501
+        try:
+            os.utime(self.path(key=key))
+        except OSError:
+            pass
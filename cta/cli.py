@@ -0,0 +1,528 @@
+import json
+import signal
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import click
+
+from cta import API, Client, ValidationPolicy
+from cta.collect import FORMATS, Collector, Writer, getWriter
+
+OUTPUT_FORMATS: tuple[str, ...] = ("table", "csv", "json")
+
+
+def rebase(url: str, server: Optional[str]) -> str:
+    """
+    Replace the scheme and host of a URL with those of another server
+
+    :param url: The URL of an API endpoint
+    :type url: str
+    :param server: The base URL of the server to send requests to instead (if not specified, the URL is returned unchanged)
+    :type server: Optional[str]
+    :return: The URL on the other server
+    :rtype: str
+    """  # noqa: E501
+    if server is None:
+        return url
+
+    base: Any = urlsplit(server)
+    return urlunsplit(
+        urlsplit(url)._replace(scheme=base.scheme, netloc=base.netloc),
+    )
+
+
+def echoFrame(df: Any, format: str) -> None:
+    """
+    Print a DataFrame as a table, as CSV, or as newline-delimited JSON
+
+    :param df: The DataFrame to print
+    :type df: DataFrame
+    :param format: One of table, csv, or json
+    :type format: str
+    """
+    if format == "csv":
+        click.echo(df.to_csv(index=False), nl=False)
+    elif format == "json":
+        if len(df) > 0:
+            click.echo(
+                df.to_json(orient="records", lines=True, date_format="iso"),
+                nl=False,
+            )
+    else:
+        click.echo(df.to_string(index=False))
+
+
+def _client(ctx: click.Context, poolMaxsize: int = 10) -> Client:
+    scheduler: Any = None
+    if ctx.obj["dailyLimit"] is not None:
+        from cta.schedule import Scheduler
+
+        scheduler = Scheduler(dailyLimit=ctx.obj["dailyLimit"])
+
+    timeout: float | tuple[float, float] = ctx.obj["timeout"]
+    if ctx.obj["connectTimeout"] is not None:
+        timeout = (ctx.obj["connectTimeout"], ctx.obj["timeout"])
+
+    resilience: Any = None
+    if ctx.obj["resilient"]:
+        from cta.resilience import ResiliencePolicy
+
+        resilience = ResiliencePolicy(
+            defaultTimeout=(
+                timeout if isinstance(timeout, tuple) else (timeout, timeout)
+            ),
+            workers=2 * poolMaxsize,
+        )
+
+    return Client(
+        poolMaxsize=poolMaxsize,
+        timeout=timeout,
+        policy=ValidationPolicy(enabled=ctx.obj["validate"]),
+        scheduler=scheduler,
+        backoffJitter=1 if ctx.obj["resilient"] else 0,
+        resilience=resilience,
+    )
+
+
+def _key(ctx: click.Context) -> str:
+    if ctx.obj["key"] is None:
+        raise click.UsageError(
+            "an API key is required, pass --key or set CTA_API_KEY",
+        )
+
+    return ctx.obj["key"]
+
+
+def _configure(ctx: click.Context, api: API) -> API:
+    api.endpointBase = rebase(url=api.endpointBase, server=ctx.obj["server"])
+    return api
+
+
+@click.group()
+@click.option(
+    "--key",
+    envvar="CTA_API_KEY",
+    help="Train Tracker API key (default: $CTA_API_KEY)",
+)
+@click.option(
+    "--server",
+    help="Send requests to this base URL instead (e.g. a replay server)",
+)
+@click.option(
+    "--timeout",
+    default=60.0,
+    show_default=True,
+    help="Seconds to wait for the server to respond",
+)
+@click.option(
+    "--connect-timeout",
+    "connectTimeout",
+    type=float,
+    help="Seconds to wait to connect (default: --timeout)",
+)
+@click.option(
+    "--resilient/--no-resilient",
+    default=False,
+    show_default=True,
+    help="Hedge slow requests, jitter retries, and serve the last good response while the server is failing",  # noqa: E501
+)
+@click.option(
+    "--daily-limit",
+    "dailyLimit",
+    type=int,
+    help="Rate limit requests to this many Train Tracker transactions a day",
+)
+@click.option(
+    "--validate/--no-validate",
+    default=True,
+    show_default=True,
+    help="Validate responses against their JSON schema",
+)
+@click.option(
+    "-f",
+    "--format",
+    "format",
+    type=click.Choice(OUTPUT_FORMATS),
+    default="table",
+    show_default=True,
+    help="Output format of one-off queries",
+)
+@click.pass_context
+def main(
+    ctx: click.Context,
+    key: Optional[str],
+    server: Optional[str],
+    timeout: float,
+    connectTimeout: Optional[float],
+    resilient: bool,
+    dailyLimit: Optional[int],
+    validate: bool,
+    format: str,
+) -> None:
+    """
+    Query the CTA Train Tracker API and City of Chicago L stops dataset
+    """
+    ctx.obj = {
+        "key": key,
+        "server": server,
+        "timeout": timeout,
+        "connectTimeout": connectTimeout,
+        "resilient": resilient,
+        "dailyLimit": dailyLimit,
+        "validate": validate,
+        "format": format,
+    }
+
+
+@main.command()
+@click.option("--mapid", type=int, help="Five-digit station code")
+@click.option("--stpid", type=int, help="Five-digit stop code")
+@click.option("--max", "max", type=int, help="Maximum number of results")
+@click.option("--rt", help="Route to filter results by")
+@click.pass_context
+def arrivals(
+    ctx: click.Context,
+    mapid: Optional[int],
+    stpid: Optional[int],
+    max: Optional[int],
+    rt: Optional[str],
+) -> None:
+    """
+    Get the arrival predictions of a station or stop
+    """
+    from cta.train import Arrivals
+
+    if (mapid is None) and (stpid is None):
+        raise click.UsageError("pass --mapid or --stpid")
+
+    with _client(ctx=ctx) as client:
+        api: Arrivals = _configure(
+            ctx=ctx,
+            api=Arrivals(key=_key(ctx=ctx), client=client, normalize=True),
+        )
+        echoFrame(
+            df=api.get(mapid=mapid, stpid=stpid, max=max, rt=rt),
+            format=ctx.obj["format"],
+        )
+
+
+@main.command()
+@click.argument("runnumber", type=int)
+@click.pass_context
+def follow(ctx: click.Context, runnumber: int) -> None:
+    """
+    Get the arrival predictions of a single train
+    """
+    from cta.train import FollowThisTrain
+
+    with _client(ctx=ctx) as client:
+        api: FollowThisTrain = _configure(
+            ctx=ctx,
+            api=FollowThisTrain(
+                key=_key(ctx=ctx),
+                client=client,
+                normalize=True,
+            ),
+        )
+        echoFrame(df=api.get(runnumber=runnumber), format=ctx.obj["format"])
+
+
+@main.command()
+@click.argument("routes", nargs=-1, required=True)
+@click.pass_context
+def locations(ctx: click.Context, routes: tuple[str, ...]) -> None:
+    """
+    Get the location of every train on one or more routes
+    """
+    from pandas import concat
+
+    from cta.train import Locations
+
+    with _client(ctx=ctx) as client:
+        api: Locations = _configure(
+            ctx=ctx,
+            api=Locations(key=_key(ctx=ctx), client=client, normalize=True),
+        )
+        dfs: dict = api.get(rt=list(routes))
+
+    echoFrame(
+        df=concat(
+            [df.assign(route=route) for route, df in dfs.items()],
+            ignore_index=True,
+        ),
+        format=ctx.obj["format"],
+    )
+
+
+@main.command()
+@click.option(
+    "--select",
+    multiple=True,
+    help="Column to download (repeatable, default: every column)",
+)
+@click.option("--where", help='SoQL filter, e.g. "red = true"')
+@click.pass_context
+def stops(
+    ctx: click.Context,
+    select: tuple[str, ...],
+    where: Optional[str],
+) -> None:
+    """
+    Get the list of CTA L stops
+    """
+    from cta.stops import Stops
+
+    with _client(ctx=ctx) as client:
+        api: Stops = _configure(
+            ctx=ctx,
+            api=Stops(client=client, normalize=True),
+        )
+        echoFrame(
+            df=api.get(select=list(select) or None, where=where),
+            format=ctx.obj["format"],
+        )
+
+
+@main.command()
+@click.option(
+    "--mapid",
+    "mapids",
+    multiple=True,
+    type=int,
+    help="Station to poll with Arrivals (repeatable)",
+)
+@click.option(
+    "--route",
+    "routes",
+    multiple=True,
+    help="Route to poll with Locations (repeatable)",
+)
+@click.option(
+    "--output",
+    type=click.Path(file_okay=False, path_type=Path),
+    required=True,
+    help="Directory to write responses to",
+)
+@click.option(
+    "--output-format",
+    "outputFormat",
+    type=click.Choice(FORMATS),
+    default="ndjson",
+    show_default=True,
+)
+@click.option(
+    "--interval",
+    default=60.0,
+    show_default=True,
+    help="Seconds between the start of each poll",
+)
+@click.option(
+    "--iterations",
+    type=int,
+    help="Number of polls to make (default: until interrupted)",
+)
+@click.option(
+    "--buffer-rows",
+    "bufferRows",
+    default=10000,
+    show_default=True,
+    help="Rows to buffer in memory before writing to disk",
+)
+@click.option(
+    "--flush-interval",
+    "flushInterval",
+    default=60.0,
+    show_default=True,
+    help="Seconds between writes to disk",
+)
+@click.option(
+    "--workers",
+    default=8,
+    show_default=True,
+    help="Maximum number of parallel requests",
+)
+@click.pass_context
+def collect(
+    ctx: click.Context,
+    mapids: tuple[int, ...],
+    routes: tuple[str, ...],
+    output: Path,
+    outputFormat: str,
+    interval: float,
+    iterations: Optional[int],
+    bufferRows: int,
+    flushInterval: float,
+    workers: int,
+) -> None:
+    """
+    Poll stations and routes until interrupted and write every response to disk
+
+    Send SIGUSR1 to print throughput and latency stats as JSON to stderr. SIGINT and SIGTERM stop after the current poll and flush every buffered row.
+    """  # noqa: E501
+    from cta.train import Arrivals, Locations
+
+    if (len(mapids) == 0) and (len(routes) == 0):
+        raise click.UsageError("pass at least one --mapid or --route")
+
+    key: str = _key(ctx=ctx)
+    client: Client = _client(ctx=ctx, poolMaxsize=workers)
+    writer: Writer = getWriter(
+        directory=output,
+        format=outputFormat,
+        bufferRows=bufferRows,
+    )
+
+    collector: Collector = Collector(
+        writer=writer,
+        interval=interval,
+        arrivals=_configure(
+            ctx=ctx,
+            api=Arrivals(key=key, client=client, output="dicts"),
+        ),
+        mapids=mapids,
+        locations=_configure(
+            ctx=ctx,
+            api=Locations(key=key, client=client, output="dicts"),
+        ),
+        routes=routes,
+        flushInterval=flushInterval,
+        workers=workers,
+    )
+
+    def report(*args) -> None:
+        click.echo(json.dumps(collector.stats()), err=True)
+
+    def stop(*args) -> None:
+        collector.stop()
+
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, report)
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    try:
+        collector.run(iterations=iterations)
+    finally:
+        collector.close()
+        client.close()
+        report()
+
+
+@main.command()
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", default=8000, show_default=True)
+@click.option(
+    "--recordings",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    help="Directory of recorded responses to replay (default: synthesize)",
+)
+@click.option(
+    "--speed",
+    default=1.0,
+    show_default=True,
+    help="Simulated seconds that pass every real second",
+)
+@click.option(
+    "--latency",
+    default=0.0,
+    show_default=True,
+    help="Seconds to wait before each response",
+)
+@click.option(
+    "--jitter",
+    default=0.0,
+    show_default=True,
+    help="Maximum random seconds added to --latency",
+)
+@click.option(
+    "--tail-rate",
+    "tailRate",
+    default=0.0,
+    show_default=True,
+    help="Fraction of requests that wait an extra --tail-latency seconds",
+)
+@click.option("--tail-latency", "tailLatency", default=0.0, show_default=True)
+@click.option(
+    "--error-rate",
+    "errorRate",
+    default=0.0,
+    show_default=True,
+    help="Fraction of requests answered with --error-status",
+)
+@click.option("--error-status", "errorStatus", default=503, show_default=True)
+@click.option(
+    "--drop-rate",
+    "dropRate",
+    default=0.0,
+    show_default=True,
+    help="Fraction of requests whose connection is closed without a response",
+)
+@click.option(
+    "--rate-limit",
+    "rateLimit",
+    type=float,
+    help="Requests a second to serve before answering 429 (default: no limit)",
+)
+@click.option(
+    "--seed",
+    type=int,
+    help="Seed of the injected latency and errors",
+)
+def replay(
+    host: str,
+    port: int,
+    recordings: Optional[Path],
+    speed: float,
+    latency: float,
+    jitter: float,
+    tailRate: float,
+    tailLatency: float,
+    errorRate: float,
+    errorStatus: int,
+    dropRate: float,
+    rateLimit: Optional[float],
+    seed: Optional[int],
+) -> None:
+    """
+    Serve synthesized or recorded responses for load tests until interrupted
+
+    Point other commands at it with --server. Send SIGUSR1 to print request counters as JSON to stderr.
+    """  # noqa: E501
+    from cta.replay import ReplayServer
+
+    server: ReplayServer = ReplayServer(
+        host=host,
+        port=port,
+        recordings=recordings,
+        speed=speed,
+        latency=latency,
+        jitter=jitter,
+        tailRate=tailRate,
+        tailLatency=tailLatency,
+        errorRate=errorRate,
+        errorStatus=errorStatus,
+        dropRate=dropRate,
+        rateLimit=rateLimit,
+        seed=seed,
+    )
+
+    def report(*args) -> None:
+        click.echo(json.dumps(server.stats()), err=True)
+
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, report)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    click.echo(f"Serving on {server.url}", err=True)
+
+    try:
+        server.serve()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        report()
+
+
+if __name__ == "__main__":
+    main()
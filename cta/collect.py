@@ -0,0 +1,501 @@
+import json
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+from pathlib import Path
+from threading import Event
+from typing import Any, List, Optional, Sequence
+
+from cta import API, responseTime, serviceDate
+from cta.cache import responseTimestamp
+from cta.instrument import Histogram
+from cta.records import toFrame
+from cta.schedule import BACKGROUND, priority
+from cta.train import Arrivals, Locations
+
+FORMATS: tuple[str, ...] = ("ndjson", "parquet", "arrow")
+
+
+class Writer(ABC):
+    """
+    An abstract base class (ABC) to be inherited by all Collector output writers
+
+    Rows are buffered in memory and written out once bufferRows rows are buffered, or when flush() or close() is called.
+    """  # noqa: E501
+
+    def __init__(self, bufferRows: int = 10000) -> None:
+        """
+        Initializes the class
+
+        :param bufferRows: The number of buffered rows at which every buffer is written to disk
+        :type bufferRows: int, optional
+        """  # noqa: E501
+        self.bufferRows: int = bufferRows
+        self.buffered: int = 0
+        self.rows: int = 0
+        self.flushes: int = 0
+
+    def __enter__(self) -> "Writer":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def write(self, source: str, rows: List[dict], queryTime: float) -> None:
+        """
+        Buffer the rows of a single response, flushing every buffer if the writer is full
+
+        :param source: The endpoint the rows came from, either arrivals or locations
+        :type source: str
+        :param rows: The JSON objects of the response, tagged with their queryTime
+        :type rows: List[dict]
+        :param queryTime: The queryTime recorded by the API class for the response
+        :type queryTime: float
+        """  # noqa: E501
+        if len(rows) == 0:
+            return
+
+        self._buffer(source=source, rows=rows, queryTime=queryTime)
+        self.buffered += len(rows)
+
+        if self.buffered >= self.bufferRows:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write every buffered row to disk
+        """
+        if self.buffered == 0:
+            return
+
+        self._flush()
+        self.rows += self.buffered
+        self.buffered = 0
+        self.flushes += 1
+
+    def close(self) -> None:
+        """
+        Write every buffered row to disk and close the writer
+        """
+        self.flush()
+
+    @abstractmethod
+    def _buffer(self, source: str, rows: List[dict], queryTime: float) -> None:
+        ...
+
+    @abstractmethod
+    def _flush(self) -> None:
+        ...
+
+
+class NDJSONWriter(Writer):
+    """
+    Write rows as newline-delimited JSON to <directory>/<source>/<serviceDate>.ndjson
+
+    Rows are serialized as they are buffered, so a buffer holds compact strings rather than JSON objects, and each flush appends to one file per source and service date.
+    """  # noqa: E501
+
+    def __init__(self, directory: Path, bufferRows: int = 10000) -> None:
+        """
+        Initializes the class
+
+        :param directory: The directory to write files to
+        :type directory: Path
+        :param bufferRows: The number of buffered rows at which every buffer is written to disk
+        :type bufferRows: int, optional
+        """  # noqa: E501
+        super().__init__(bufferRows=bufferRows)
+        self.directory: Path = Path(directory)
+        self.buffers: dict[tuple[str, str], List[str]] = {}
+        self.bytes: int = 0
+
+    def _buffer(self, source: str, rows: List[dict], queryTime: float) -> None:
+        self.buffers.setdefault(
+            (source, serviceDate(queryTime=queryTime)),
+            [],
+        ).extend(json.dumps(row, separators=(",", ":")) + "\n" for row in rows)
+
+    def _flush(self) -> None:
+        source: str
+        date: str
+        lines: List[str]
+        for (source, date), lines in self.buffers.items():
+            directory: Path = self.directory / source
+            directory.mkdir(parents=True, exist_ok=True)
+
+            text: str = "".join(lines)
+            path: Path = directory / f"{date}.ndjson"
+            with open(path, "a", encoding="utf-8") as file:
+                file.write(text)
+
+            self.bytes += len(text)
+
+        self.buffers.clear()
+
+
+class ColumnarWriter(Writer):
+    """
+    Write rows as Parquet or Arrow IPC files with a cta.archive.Archive, partitioned by service date and route
+    """  # noqa: E501
+
+    def __init__(
+        self,
+        directory: Path,
+        format: str = "parquet",
+        bufferRows: int = 10000,
+    ) -> None:
+        """
+        Initializes the class
+
+        :param directory: The root directory of the archive
+        :type directory: Path
+        :param format: The file format to write, either parquet or arrow
+        :type format: str, optional
+        :param bufferRows: The number of buffered rows at which every buffer is written to disk
+        :type bufferRows: int, optional
+        """  # noqa: E501
+        try:
+            from cta.archive import Archive
+        except ImportError:  # pragma: no cover
+            raise ImportError("pyarrow is required, install cta[archive]")
+
+        super().__init__(bufferRows=bufferRows)
+        self.archive: Archive = Archive(
+            directory=directory,
+            format=format,
+            flushRows=bufferRows,
+        )
+
+    def _buffer(self, source: str, rows: List[dict], queryTime: float) -> None:
+        self.archive.append(
+            source=source,
+            df=toFrame(data=rows),
+            queryTime=queryTime,
+        )
+
+    def _flush(self) -> None:
+        self.archive.flush()
+
+
+def getWriter(directory: Path, format: str, bufferRows: int) -> Writer:
+    """
+    Create the writer of an output format
+
+    :param directory: The directory to write files to
+    :type directory: Path
+    :param format: One of ndjson, parquet, or arrow
+    :type format: str
+    :param bufferRows: The number of buffered rows at which every buffer is written to disk
+    :type bufferRows: int
+    :return: The writer
+    :rtype: Writer
+    """  # noqa: E501
+    if format not in FORMATS:
+        raise ValueError(f"format must be one of {list(FORMATS)}")
+
+    if format == "ndjson":
+        return NDJSONWriter(directory=directory, bufferRows=bufferRows)
+
+    return ColumnarWriter(
+        directory=directory,
+        format=format,
+        bufferRows=bufferRows,
+    )
+
+
+class Collector:
+    """
+    Poll a set of stations and routes on a schedule and write every response to disk
+
+    Every request is made with API.query from a single thread pool that lives as long as the Collector, so the instrumentation hooks and the ResponseCache and ResiliencePolicy of the Client apply to it. Arrivals are requested once per station and Locations once for every route. Responses are validated and tagged with their queryTime (and route, for Locations) on the thread that fetched them and handed to a Writer, which is flushed every flushInterval seconds. A response whose ctatt.tmst timestamp is not newer than the last one written for its request, such as a stale response served by a ResiliencePolicy or one served from a ResponseCache, is counted in skipped rather than written again. Request latencies are kept in a histogram for stats().
+    """  # noqa: E501
+
+    def __init__(
+        self,
+        writer: Writer,
+        interval: float,
+        arrivals: Optional[Arrivals] = None,
+        mapids: Sequence[int] = (),
+        locations: Optional[Locations] = None,
+        routes: Sequence[str] = (),
+        flushInterval: float = 60,
+        workers: int = 8,
+    ) -> None:
+        """
+        Initializes the class
+
+        :param writer: The writer to hand responses to
+        :type writer: Writer
+        :param interval: The number of seconds between the start of each poll
+        :type interval: float
+        :param arrivals: The Arrivals instance to poll stations with, whose output must be dicts
+        :type arrivals: Optional[Arrivals], optional
+        :param mapids: The five-digit station codes to poll
+        :type mapids: Sequence[int], optional
+        :param locations: The Locations instance to poll routes with, whose output must be dicts
+        :type locations: Optional[Locations], optional
+        :param routes: The routes to poll
+        :type routes: Sequence[str], optional
+        :param flushInterval: The number of seconds between flushes of the writer
+        :type flushInterval: float, optional
+        :param workers: The maximum number of parallel requests
+        :type workers: int, optional
+        """  # noqa: E501
+        api: Optional[API]
+        for api in (arrivals, locations):
+            if (api is not None) and (api.output != "dicts"):
+                raise ValueError("the output of the API classes must be dicts")
+
+        self.writer: Writer = writer
+        self.interval: float = interval
+        self.arrivals: Optional[Arrivals] = arrivals
+        self.mapids: List[int] = list(mapids)
+        self.locations: Optional[Locations] = locations
+        self.routes: List[str] = list(routes)
+        self.flushInterval: float = flushInterval
+        self.workers: int = workers
+
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.stopEvent: Event = Event()
+        self.latency: Histogram = Histogram()
+
+        self.started: float = time.monotonic()
+        self.lastFlush: float = self.started
+        self.polls: int = 0
+        self.requests: int = 0
+        self.rows: int = 0
+        self.skipped: int = 0
+        self.errors: int = 0
+        self.queryTimes: dict[str, float] = {}
+        self.lastError: Optional[BaseException] = None
+
+    def __enter__(self) -> "Collector":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _query(self, api: API, endpoint: str) -> tuple[Any, float, float]:
+        queryTimes: List[float] = []
+
+        def accept(data: Any) -> bool:
+            tmst: Optional[str] = responseTimestamp(data=data)
+            if tmst is None:
+                queryTimes.append(-1)
+                return True
+
+            queryTime: float = responseTime(tmst=tmst)
+            if queryTime <= self.queryTimes.get(endpoint, -1):
+                return False
+
+            self.queryTimes[endpoint] = queryTime
+            queryTimes.append(queryTime)
+            return True
+
+        start: float = time.perf_counter()
+        value: Any = api.query(endpoint=endpoint, accept=accept)
+        seconds: float = time.perf_counter() - start
+
+        if len(queryTimes) == 0:
+            return None, -1, seconds
+
+        return value, queryTimes[0], seconds
+
+    def _submit(self, api: API, endpoint: str) -> Future:
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers)
+
+        return self.executor.submit(
+            copy_context().run,
+            self._query,
+            api,
+            endpoint,
+        )
+
+    def _result(self, future: Future) -> tuple[Any, float]:
+        self.requests += 1
+
+        try:
+            value: Any
+            queryTime: float
+            seconds: float
+            value, queryTime, seconds = future.result()
+        except Exception as error:
+            self.errors += 1
+            self.lastError = error
+            return None, -1
+
+        self.latency.observe(value=seconds)
+
+        if value is None:
+            self.skipped += 1
+
+        return value, queryTime
+
+    def _write(self, api: API, value: Any, queryTime: float) -> int:
+        if api is self.arrivals:
+            items: List[dict] = value
+            self.writer.write(
+                source="arrivals",
+                rows=[{**item, "queryTime": queryTime} for item in items],
+                queryTime=queryTime,
+            )
+            return len(items)
+
+        trains: dict[str, List[dict]] = value
+        self.writer.write(
+            source="locations",
+            rows=[
+                {**item, "route": route, "queryTime": queryTime}
+                for route, items in trains.items()
+                for item in items
+            ],
+            queryTime=queryTime,
+        )
+        return sum(len(items) for items in trains.values())
+
+    def poll(self) -> int:
+        """
+        Poll every configured station and route once and hand the responses to the writer
+
+        Requests that fail, and responses that cannot be parsed or written, are counted in errors and skipped. Responses that are not newer than the last one written for their request are counted in skipped.
+
+        :return: The number of rows written
+        :rtype: int
+        """  # noqa: E501
+        futures: List[tuple[API, Future]] = []
+
+        if self.arrivals is not None:
+            mapid: int
+            for mapid in self.mapids:
+                futures.append(
+                    (
+                        self.arrivals,
+                        self._submit(
+                            api=self.arrivals,
+                            endpoint=self.arrivals.buildEndpoint(mapid=mapid),
+                        ),
+                    )
+                )
+
+        if (self.locations is not None) and (len(self.routes) > 0):
+            futures.append(
+                (
+                    self.locations,
+                    self._submit(
+                        api=self.locations,
+                        endpoint=self.locations.buildEndpoint(rt=self.routes),
+                    ),
+                )
+            )
+
+        rows: int = 0
+
+        api: API
+        future: Future
+        for api, future in futures:
+            value: Any
+            queryTime: float
+            value, queryTime = self._result(future=future)
+            if value is None:
+                continue
+
+            try:
+                rows += self._write(api=api, value=value, queryTime=queryTime)
+            except Exception as error:
+                self.errors += 1
+                self.lastError = error
+
+        self.polls += 1
+        self.rows += rows
+        return rows
+
+    def run(self, iterations: Optional[int] = None) -> None:
+        """
+        Poll at a fixed interval until stopped, flushing the writer every flushInterval seconds and when stopped
+
+        Requests are made at BACKGROUND priority, so a Client's Scheduler sends interactive queries ahead of them.
+
+        :param iterations: The number of polls to make before returning (if not specified, poll until stop() is called)
+        :type iterations: Optional[int], optional
+        """  # noqa: E501
+        self.stopEvent.clear()
+
+        count: int = 0
+        deadline: float = time.monotonic()
+
+        try:
+            while self.stopEvent.is_set() is False:
+                with priority(level=BACKGROUND):
+                    self.poll()
+
+                if time.monotonic() - self.lastFlush >= self.flushInterval:
+                    self.flush()
+
+                count += 1
+                if (iterations is not None) and (count >= iterations):
+                    break
+
+                deadline += self.interval
+                self.stopEvent.wait(
+                    timeout=max(0, deadline - time.monotonic()),
+                )
+        finally:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write every buffered row to disk
+        """
+        self.writer.flush()
+        self.lastFlush = time.monotonic()
+
+    def stop(self) -> None:
+        """
+        Stop a running poll loop after its current poll
+        """
+        self.stopEvent.set()
+
+    def close(self) -> None:
+        """
+        Stop the thread pool and close the writer
+        """
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+        self.writer.close()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Report the throughput and request latency of the Collector since it was created
+
+        :return: The uptime in seconds, counters of polls, requests, skipped responses, errors, rows received, written, and buffered, and flushes, rows and requests per second, and the median, 90th, and 99th percentile request latency in seconds
+        :rtype: dict[str, Any]
+        """  # noqa: E501
+        uptime: float = time.monotonic() - self.started
+
+        return {
+            "uptime": uptime,
+            "polls": self.polls,
+            "requests": self.requests,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "rows": self.rows,
+            "written": self.writer.rows,
+            "buffered": self.writer.buffered,
+            "flushes": self.writer.flushes,
+            "rowsPerSecond": self.rows / uptime if uptime > 0 else 0,
+            "requestsPerSecond": self.requests / uptime if uptime > 0 else 0,
+            "latency": {
+                "mean": (
+                    self.latency.sum / self.latency.count
+                    if self.latency.count > 0
+                    else 0
+                ),
+                "p50": self.latency.quantile(q=0.5),
+                "p90": self.latency.quantile(q=0.9),
+                "p99": self.latency.quantile(q=0.99),
+            },
+        }
@@ -0,0 +1,170 @@
+from typing import Any, List, Optional
+
+import numpy as np
+from pandas import Categorical, CategoricalDtype, DataFrame, Index
+
+from cta.records import columnTypes
+from cta.train import LOCATIONS_SCHEMA
+
+BUFFER_DTYPES: dict[str, Any] = {
+    "bool": np.bool_,
+    "int8": np.int8,
+    "int32": np.int32,
+    "float64": np.float64,
+    "datetime": "datetime64[s]",
+    "category": np.int8,
+    "object": object,
+}
+
+
+def codesDtype(categories: int) -> type:
+    """
+    Get the integer dtype pandas uses for the codes of a categorical with a given number of categories
+
+    :param categories: The number of categories
+    :type categories: int
+    :return: The smallest of int8, int16, or int32 that can hold every code
+    :rtype: type
+    """  # noqa: E501
+    if categories < 2**7:
+        return np.int8
+    if categories < 2**15:
+        return np.int16
+    return np.int32
+
+
+class FleetBuffer:
+    """
+    Preallocated, typed column buffers that Locations.getFleet fills in place on every poll
+
+    Columns are typed from the Train definition of LOCATIONS_SCHEMA, plus a categorical route column. Categorical columns are stored as integer codes into categories that persist across polls, so a destination keeps the same code for the life of the buffer. The buffers only grow, doubling whenever a poll has more trains than they can hold.
+
+    The DataFrame returned by fill is a view of the buffers and is overwritten by the next call to fill, so copy it to keep it across polls. Datetime columns hold naive America/Chicago wall-clock times.
+    """  # noqa: E501
+
+    def __init__(self, capacity: int = 1024) -> None:
+        """
+        Initializes the class
+
+        :param capacity: The number of trains to preallocate room for
+        :type capacity: int, optional
+        """
+        types: dict[str, str] = columnTypes(
+            schema=LOCATIONS_SCHEMA,
+            definition="Train",
+        )
+
+        train: dict = LOCATIONS_SCHEMA["definitions"]["Train"]
+        properties: dict = train["properties"]
+
+        self.dtypes: dict[str, str] = {"route": "category"}
+        self.dtypes.update(
+            {column: types.get(column, "object") for column in properties}
+        )
+
+        self.categories: dict[str, dict[str, int]] = {}
+
+        column: str
+        dtype: str
+        for column, dtype in self.dtypes.items():
+            if dtype == "category":
+                self.categories[column] = {}
+
+        self.capacity: int = 0
+        self.columns: dict[str, np.ndarray] = {}
+        self.reserve(capacity=capacity)
+
+    def reserve(self, capacity: int) -> None:
+        """
+        Grow the buffers to hold at least capacity trains
+
+        :param capacity: The number of trains to make room for
+        :type capacity: int
+        """
+        if capacity <= self.capacity:
+            return
+
+        column: str
+        dtype: str
+        for column, dtype in self.dtypes.items():
+            self.columns[column] = np.empty(
+                capacity,
+                dtype=BUFFER_DTYPES[dtype],
+            )
+
+        self.capacity = capacity
+
+    def _categorical(
+        self,
+        column: str,
+        values: List[str],
+        repeats: Optional[List[int]] = None,
+    ) -> Categorical:
+        categories: dict[str, int] = self.categories[column]
+        codes: List[int] = [
+            categories.setdefault(value, len(categories)) for value in values
+        ]
+
+        dtype: type = codesDtype(categories=len(categories))
+        if self.columns[column].dtype != dtype:
+            self.columns[column] = np.empty(self.capacity, dtype=dtype)
+
+        n: int = len(codes) if repeats is None else sum(repeats)
+        array: np.ndarray = self.columns[column]
+        array[:n] = codes if repeats is None else np.repeat(codes, repeats)
+
+        return Categorical.from_codes(
+            codes=array[:n],
+            dtype=CategoricalDtype(categories=Index(list(categories))),
+            validate=False,
+        )
+
+    def fill(self, routes: List[dict]) -> DataFrame:
+        """
+        Copy the trains of every route of a response into the buffers
+
+        :param routes: The routes of a Locations response
+        :type routes: List[dict]
+        :return: Every train as a pandas.DataFrame viewing the buffers
+        :rtype: DataFrame
+        """
+        trains: List[dict] = []
+
+        route: dict
+        for route in routes:
+            trains.extend(route["train"])
+
+        n: int = len(trains)
+
+        if n > self.capacity:
+            self.reserve(capacity=max(n, 2 * self.capacity))
+
+        data: dict[str, Any] = {
+            "route": self._categorical(
+                column="route",
+                values=[route["@name"] for route in routes],
+                repeats=[len(route["train"]) for route in routes],
+            )
+        }
+
+        column: str
+        dtype: str
+        for column, dtype in self.dtypes.items():
+            if column == "route":
+                continue
+
+            values: List[Any] = [train.get(column) for train in trains]
+
+            if dtype == "category":
+                data[column] = self._categorical(column=column, values=values)
+                continue
+
+            array: np.ndarray = self.columns[column]
+            if dtype == "bool":
+                array[:n] = [value == "1" for value in values]
+            else:
+                array[:n] = values
+
+            data[column] = array[:n]
+
+        return DataFrame(data=data, copy=False)
@@ -0,0 +1,70 @@
+import time
+from typing import Optional
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from cta import instrument
+from cta.instrument import CallRecord
+
+
+class TimedHTTPConnection(HTTPConnection):
+    """
+    An HTTP connection that adds the time it takes to connect to the current CallRecord
+    """  # noqa: E501
+
+    def connect(self) -> None:
+        record: Optional[CallRecord] = instrument.current()
+        if record is None:
+            return super().connect()
+
+        start: float = time.perf_counter()
+        super().connect()
+        record.add("connect", time.perf_counter() - start)
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    """
+    An HTTPS connection that adds the time it takes to connect and complete the TLS handshake to the current CallRecord
+    """  # noqa: E501
+
+    def connect(self) -> None:
+        record: Optional[CallRecord] = instrument.current()
+        if record is None:
+            return super().connect()
+
+        start: float = time.perf_counter()
+        super().connect()
+        record.add("connect", time.perf_counter() - start)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+POOL_CLASSES: dict[str, type[HTTPConnectionPool]] = {
+    "http": TimedHTTPConnectionPool,
+    "https": TimedHTTPSConnectionPool,
+}
+
+
+class SSLAdapter(HTTPAdapter):
+    """
+    The purpose of this code is to override the init_poolmanager method, which is responsible for initializing a pool of connections to a server. In this case, it's used to pass the ssl_context instance to the underlying connection pool manager.
+
+    By doing so, when creating a connection pool using this adapter, the connections will be established with SSL/TLS encryption enabled, using the provided context.
+    """  # noqa: E501
+
+    def __init__(self, ssl_context=None, **kwargs):
+        self.ssl_context = ssl_context
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["ssl_context"] = self.ssl_context
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = POOL_CLASSES
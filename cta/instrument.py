@@ -0,0 +1,476 @@
+import bisect
+from abc import ABC, abstractmethod
+from contextvars import ContextVar, Token
+from threading import Lock
+from typing import Any, List, Optional, Sequence
+
+PHASES: tuple[str, ...] = (
+    "connect",
+    "ttfb",
+    "download",
+    "decode",
+    "validate",
+    "frame",
+)
+
+BUCKETS: tuple[float, ...]
+BUCKETS = tuple(0.00005 * (2**exponent) for exponent in range(22))
+
+_HOOKS: tuple["Hook", ...] = ()
+_HOOKS_LOCK: Lock = Lock()
+_CURRENT: ContextVar[Optional["CallRecord"]] = ContextVar(
+    "cta_call_record",
+    default=None,
+)
+
+
+class CallRecord:
+    """
+    The measurements taken during a single query against an API endpoint
+
+    Phase durations are in seconds. The cache outcome is one of hit, miss, or revalidated, or None if the query was not made through a ResponseCache.
+    """  # noqa: E501
+
+    __slots__ = (
+        "name",
+        "url",
+        "phases",
+        "bytes",
+        "rows",
+        "cache",
+        "retries",
+        "status",
+        "error",
+        "token",
+    )
+
+    def __init__(self, name: str, url: str) -> None:
+        """
+        Initializes the class
+
+        :param name: The name of the API class that made the query
+        :type name: str
+        :param url: The URL of the query
+        :type url: str
+        """
+        self.name: str = name
+        self.url: str = url
+        self.phases: dict[str, float] = {}
+        self.bytes: int = 0
+        self.rows: int = 0
+        self.cache: Optional[str] = None
+        self.retries: int = 0
+        self.status: int = 0
+        self.error: Optional[BaseException] = None
+        self.token: Optional[Token] = None
+
+    def add(self, phase: str, seconds: float) -> None:
+        """
+        Add time to a phase
+
+        :param phase: The name of the phase
+        :type phase: str
+        :param seconds: The number of seconds to add
+        :type seconds: float
+        """
+        self.phases[phase] = self.phases.get(phase, 0) + seconds
+
+
+class Hook(ABC):
+    """
+    An abstract base class (ABC) to be inherited by all instrumentation hooks
+    """
+
+    @abstractmethod
+    def record(self, record: CallRecord) -> None:
+        """
+        Receive the measurements of a completed query
+
+        :param record: The measurements of the query
+        :type record: CallRecord
+        """
+        ...
+
+
+def register(hook: Hook) -> None:
+    """
+    Register a hook to receive the measurements of every query
+
+    :param hook: The hook to register
+    :type hook: Hook
+    """
+    global _HOOKS
+
+    with _HOOKS_LOCK:
+        _HOOKS = _HOOKS + (hook,)
+
+
+def unregister(hook: Hook) -> None:
+    """
+    Remove a previously registered hook
+
+    :param hook: The hook to remove
+    :type hook: Hook
+    """
+    global _HOOKS
+
+    with _HOOKS_LOCK:
+        _HOOKS = tuple(item for item in _HOOKS if item is not hook)
+
+
+def begin(name: str, url: str) -> Optional[CallRecord]:
+    """
+    Start measuring a query
+
+    :param name: The name of the API class making the query
+    :type name: str
+    :param url: The URL of the query
+    :type url: str
+    :return: A new CallRecord, or None if no hook is registered
+    :rtype: Optional[CallRecord]
+    """
+    if len(_HOOKS) == 0:
+        return None
+
+    record: CallRecord = CallRecord(name=name, url=url)
+    record.token = _CURRENT.set(record)
+    return record
+
+
+def current() -> Optional[CallRecord]:
+    """
+    Get the CallRecord of the query being made in the current thread or task
+
+    :return: The CallRecord, or None if no query is being measured
+    :rtype: Optional[CallRecord]
+    """
+    return _CURRENT.get()
+
+
+def end(
+    record: CallRecord,
+    value: Any = None,
+    error: Optional[BaseException] = None,
+) -> None:
+    """
+    Finish measuring a query and pass its measurements to every registered hook
+
+    :param record: The CallRecord returned by begin
+    :type record: CallRecord
+    :param value: The value returned by the query
+    :type value: Any, optional
+    :param error: The exception raised by the query, if any
+    :type error: Optional[BaseException], optional
+    """  # noqa: E501
+    if record.token is not None:
+        _CURRENT.reset(record.token)
+        record.token = None
+
+    record.error = error
+    record.rows = countRows(value=value)
+
+    hook: Hook
+    for hook in _HOOKS:
+        hook.record(record=record)
+
+
+def countRows(value: Any) -> int:
+    """
+    Count the rows of a value returned by a query
+
+    :param value: A DataFrame, a RecordBatch, a list of records, a dict of any of them, or any other value
+    :type value: Any
+    :return: The number of rows
+    :rtype: int
+    """  # noqa: E501
+    if isinstance(value, dict):
+        return sum(countRows(value=item) for item in value.values())
+
+    if isinstance(value, list):
+        return len(value)
+
+    if hasattr(value, "shape"):
+        return int(value.shape[0])
+
+    if hasattr(value, "recordType"):
+        return len(value)
+
+    return 0
+
+
+class Histogram:
+    """
+    A fixed-bucket histogram of durations
+
+    Buckets grow exponentially from 50 microseconds to roughly 100 seconds, so quantiles are accurate to within a factor of two.
+    """  # noqa: E501
+
+    def __init__(self, buckets: Sequence[float] = BUCKETS) -> None:
+        """
+        Initializes the class
+
+        :param buckets: The upper bound of each bucket, in ascending order
+        :type buckets: Sequence[float], optional
+        """
+        self.buckets: tuple[float, ...] = tuple(buckets)
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.count: int = 0
+        self.sum: float = 0
+
+    def observe(self, value: float) -> None:
+        """
+        Add a value to the histogram
+
+        :param value: The value to add
+        :type value: float
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile as the upper bound of the bucket that contains it
+
+        :param q: The quantile to estimate, between 0 and 1
+        :type q: float
+        :return: The estimated quantile, or 0 if the histogram is empty
+        :rtype: float
+        """
+        if self.count == 0:
+            return 0
+
+        rank: float = q * self.count
+        seen: int = 0
+
+        index: int
+        count: int
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                if index < len(self.buckets):
+                    return self.buckets[index]
+                return float("inf")
+
+        return float("inf")
+
+
+class HistogramHook(Hook):
+    """
+    A hook that keeps in-process histograms of every phase of every API class, and counters of payload bytes, rows, cache outcomes, retries, and errors
+    """  # noqa: E501
+
+    def __init__(self) -> None:
+        self.lock: Lock = Lock()
+        self.histograms: dict[tuple[str, str], Histogram] = {}
+        self.calls: dict[str, int] = {}
+        self.bytes: dict[str, int] = {}
+        self.rows: dict[str, int] = {}
+        self.retries: dict[str, int] = {}
+        self.errors: dict[str, int] = {}
+        self.cache: dict[tuple[str, str], int] = {}
+
+    def record(self, record: CallRecord) -> None:
+        name: str = record.name
+
+        with self.lock:
+            phase: str
+            seconds: float
+            for phase, seconds in record.phases.items():
+                key: tuple[str, str] = (name, phase)
+                if key not in self.histograms:
+                    self.histograms[key] = Histogram()
+                self.histograms[key].observe(value=seconds)
+
+            self.calls[name] = self.calls.get(name, 0) + 1
+            self.bytes[name] = self.bytes.get(name, 0) + record.bytes
+            self.rows[name] = self.rows.get(name, 0) + record.rows
+            self.retries[name] = self.retries.get(name, 0) + record.retries
+
+            if record.error is not None:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+            if record.cache is not None:
+                outcome: tuple[str, str] = (name, record.cache)
+                self.cache[outcome] = self.cache.get(outcome, 0) + 1
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """
+        Summarize the measurements of every API class
+
+        :return: The call, byte, row, retry, error, and cache counters and the count, mean, median, and 99th percentile of every phase, keyed on API class
+        :rtype: dict[str, dict[str, Any]]
+        """  # noqa: E501
+        summary: dict[str, dict[str, Any]] = {}
+
+        with self.lock:
+            name: str
+            for name in self.calls:
+                summary[name] = {
+                    "calls": self.calls[name],
+                    "bytes": self.bytes[name],
+                    "rows": self.rows[name],
+                    "retries": self.retries[name],
+                    "errors": self.errors.get(name, 0),
+                    "cache": {
+                        outcome: count
+                        for (api, outcome), count in self.cache.items()
+                        if api == name
+                    },
+                    "phases": {},
+                }
+
+            phase: str
+            histogram: Histogram
+            for (name, phase), histogram in self.histograms.items():
+                summary[name]["phases"][phase] = {
+                    "count": histogram.count,
+                    "mean": histogram.sum / histogram.count,
+                    "p50": histogram.quantile(q=0.5),
+                    "p99": histogram.quantile(q=0.99),
+                }
+
+        return summary
+
+
+class PrometheusHook(Hook):
+    """
+    A hook that exports measurements as Prometheus metrics
+    """
+
+    def __init__(self, registry: Any = None, namespace: str = "cta") -> None:
+        """
+        Initializes the class
+
+        :param registry: The prometheus_client.CollectorRegistry to register metrics with (if not specified, the default registry is used)
+        :type registry: Any, optional
+        :param namespace: The prefix of every metric name
+        :type namespace: str, optional
+        """  # noqa: E501
+        try:
+            import prometheus_client
+        except ImportError:  # pragma: no cover
+            raise ImportError(
+                "prometheus_client is required, install cta[prometheus]",
+            )
+
+        if registry is None:
+            registry = prometheus_client.REGISTRY
+
+        self.phases = prometheus_client.Histogram(
+            "phase_seconds",
+            "Time spent in each phase of a query",
+            ["endpoint", "phase"],
+            namespace=namespace,
+            registry=registry,
+            buckets=BUCKETS,
+        )
+        self.calls = prometheus_client.Counter(
+            "calls",
+            "Queries made",
+            ["endpoint", "cache", "error"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.bytes = prometheus_client.Counter(
+            "response_bytes",
+            "Bytes of response bodies received",
+            ["endpoint"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.rows = prometheus_client.Counter(
+            "rows",
+            "Rows returned",
+            ["endpoint"],
+            namespace=namespace,
+            registry=registry,
+        )
+        self.retries = prometheus_client.Counter(
+            "retries",
+            "Requests retried",
+            ["endpoint"],
+            namespace=namespace,
+            registry=registry,
+        )
+
+    def record(self, record: CallRecord) -> None:
+        phase: str
+        seconds: float
+        for phase, seconds in record.phases.items():
+            self.phases.labels(record.name, phase).observe(seconds)
+
+        self.calls.labels(
+            record.name,
+            record.cache or "none",
+            str(record.error is not None).lower(),
+        ).inc()
+        self.bytes.labels(record.name).inc(record.bytes)
+        self.rows.labels(record.name).inc(record.rows)
+        self.retries.labels(record.name).inc(record.retries)
+
+
+class OpenTelemetryHook(Hook):
+    """
+    A hook that exports measurements as OpenTelemetry metrics
+    """
+
+    def __init__(self, meter: Any = None) -> None:
+        """
+        Initializes the class
+
+        :param meter: The opentelemetry.metrics.Meter to create instruments with (if not specified, a meter named cta is taken from the global meter provider)
+        :type meter: Any, optional
+        """  # noqa: E501
+        try:
+            from opentelemetry import metrics
+        except ImportError:  # pragma: no cover
+            raise ImportError(
+                "opentelemetry-api is required, install cta[opentelemetry]"
+            )
+
+        if meter is None:
+            meter = metrics.get_meter("cta")
+
+        self.phases = meter.create_histogram(
+            "cta.phase.duration",
+            unit="s",
+            description="Time spent in each phase of a query",
+        )
+        self.calls = meter.create_counter(
+            "cta.calls",
+            description="Queries made",
+        )
+        self.bytes = meter.create_counter(
+            "cta.response.size",
+            unit="By",
+            description="Bytes of response bodies received",
+        )
+        self.rows = meter.create_counter(
+            "cta.rows",
+            description="Rows returned",
+        )
+        self.retries = meter.create_counter(
+            "cta.retries",
+            description="Requests retried",
+        )
+
+    def record(self, record: CallRecord) -> None:
+        attributes: dict[str, str] = {"endpoint": record.name}
+
+        phase: str
+        seconds: float
+        for phase, seconds in record.phases.items():
+            self.phases.record(seconds, {**attributes, "phase": phase})
+
+        self.calls.add(
+            1,
+            {
+                **attributes,
+                "cache": record.cache or "none",
+                "error": str(record.error is not None).lower(),
+            },
+        )
+        self.bytes.add(record.bytes, attributes)
+        self.rows.add(record.rows, attributes)
+        self.retries.add(record.retries, attributes)
@@ -0,0 +1,655 @@
+import json
+import mmap
+import os
+import time
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+from pandas import Categorical, DataFrame, Series, to_numeric
+from pandas.arrays import BooleanArray, IntegerArray
+
+from cta.cache import DEFAULT_DIRECTORY
+from cta.spatial import LINE_FLAGS
+from cta.stops import Stops
+
+FORMAT_VERSION: int = 1
+
+MAGIC: bytes = b"CTALKUP\x00"
+HEADER_OFFSET: int = len(MAGIC) + 4
+
+DEFAULT_PATH: Path = DEFAULT_DIRECTORY / "stops.lookup"
+
+STOP_ATTRIBUTES: tuple[str, ...] = (
+    "map_id",
+    "direction_id",
+    "stop_name",
+    "station_name",
+    "station_descriptive_name",
+    "ada",
+    "lines",
+    "latitude",
+    "longitude",
+)
+
+STATION_ATTRIBUTES: tuple[str, ...] = (
+    "station_name",
+    "station_descriptive_name",
+    "ada",
+    "lines",
+    "latitude",
+    "longitude",
+)
+
+_STRING_ATTRIBUTES: frozenset[str] = frozenset(
+    {"direction_id", "stop_name", "station_name", "station_descriptive_name"}
+)
+
+
+def lineNames(mask: int) -> tuple[str, ...]:
+    """
+    Unpack a bitmask of line flags
+
+    :param mask: A bitmask as returned by cta.spatial.lineMask
+    :type mask: int
+    :return: The names of the line flags that are set
+    :rtype: tuple[str, ...]
+    """
+    lines: List[str] = []
+
+    bit: int
+    line: str
+    for bit, line in enumerate(LINE_FLAGS):
+        if int(mask) & (1 << bit):
+            lines.append(line)
+
+    return tuple(lines)
+
+
+def datasetHash(data: List[dict]) -> str:
+    """
+    Hash the Stops dataset a lookup table is built from
+
+    :param data: The JSON response of the Stops API endpoint
+    :type data: List[dict]
+    :return: The SHA-256 hex digest of the dataset, independent of key order
+    :rtype: str
+    """
+    return sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+def _align(size: int) -> int:
+    return -(-size // 8) * 8
+
+
+def _denseIndex(ids: np.ndarray) -> tuple[int, np.ndarray]:
+    if len(ids) == 0:
+        return 0, np.zeros(0, dtype=np.int32)
+
+    base: int = int(ids.min())
+    index: np.ndarray = np.full(int(ids.max()) - base + 1, -1, dtype=np.int32)
+    index[ids - base] = np.arange(len(ids), dtype=np.int32)
+
+    return base, index
+
+
+class StopsLookup:
+    """
+    A persistent, memory-mapped lookup table of CTA L stops and stations, keyed on stop id (stpId) and station id (mapid, staId)
+
+    The table is built once from the Stops dataset and saved to a single file: a JSON header holding the format version, a hash of the dataset, and a string table, followed by aligned numpy arrays. Loading the file maps it into memory rather than reading and parsing it. Ids are resolved through dense arrays indexed by id, so a lookup is a single array access whether it is for one id or a whole column of a DataFrame.
+
+    Station attributes are derived from the stops of the station: a station is ADA accessible and served by a line if any of its stops is, and is located at the mean of their coordinates.
+
+    The file stays mapped until close() is called or the lookup table is used as a context manager and exits; arrays taken from it must not be used afterwards.
+    """  # noqa: E501
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_PATH,
+        data: Optional[List[dict]] = None,
+    ) -> None:
+        """
+        Initializes the class
+
+        :param path: The file written by StopsLookup.build
+        :type path: Path, optional
+        :param data: The Stops dataset the file must have been built from (if not specified, the dataset is not checked)
+        :type data: Optional[List[dict]], optional
+        :raises ValueError: If the file is not a lookup table of this format version, or was built from a dataset other than data
+        """  # noqa: E501
+        self.path: Path = Path(path)
+
+        with open(self.path, "rb") as file:
+            self._mmap: mmap.mmap = mmap.mmap(
+                file.fileno(),
+                0,
+                access=mmap.ACCESS_READ,
+            )
+
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a stops lookup file")
+
+        headerSize: int = int.from_bytes(
+            self._mmap[slice(len(MAGIC), HEADER_OFFSET)],
+            "little",
+        )
+        self.header: dict = json.loads(
+            self._mmap[slice(HEADER_OFFSET, HEADER_OFFSET + headerSize)]
+        )
+
+        if self.header["version"] != FORMAT_VERSION:
+            self.close()
+            raise ValueError(
+                f"{self.path} has format version {self.header['version']}, expected {FORMAT_VERSION}"  # noqa: E501
+            )
+
+        dataset: Optional[str] = None if data is None else datasetHash(data)
+        if (dataset is not None) and (dataset != self.header["dataset"]):
+            self.close()
+            raise ValueError(
+                f"{self.path} was built from another version of the dataset"
+            )
+
+        self.dataset: str = self.header["dataset"]
+        self.built: float = self.header["built"]
+        self.strings: List[str] = self.header["strings"]
+        self.stopBase: int = self.header["stopBase"]
+        self.stationBase: int = self.header["stationBase"]
+
+        start: int = _align(size=HEADER_OFFSET + headerSize)
+
+        self.arrays: dict[str, np.ndarray] = {
+            name: np.frombuffer(
+                self._mmap,
+                dtype=np.dtype(dtype),
+                count=count,
+                offset=start + offset,
+            )
+            for name, (dtype, offset, count) in self.header["arrays"].items()
+        }
+
+        self.stopIndex: np.ndarray = self.arrays["stopIndex"]
+        self.stationIndex: np.ndarray = self.arrays["stationIndex"]
+
+    def __enter__(self) -> "StopsLookup":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Unmap the file
+
+        :raises BufferError: If arrays taken from the lookup table are still referenced elsewhere
+        """  # noqa: E501
+        self.arrays = {}
+        self.stopIndex = np.empty(0, dtype=np.int32)
+        self.stationIndex = np.empty(0, dtype=np.int32)
+        self._mmap.close()
+
+    @classmethod
+    def build(
+        cls,
+        data: List[dict],
+        path: Path = DEFAULT_PATH,
+    ) -> "StopsLookup":
+        """
+        Build a lookup table from the Stops dataset and save it to disk
+
+        :param data: The JSON response of the Stops API endpoint, as returned by Stops(output="dicts").get
+        :type data: List[dict]
+        :param path: The file to save the lookup table to
+        :type path: Path, optional
+        :return: The saved lookup table, loaded from disk
+        :rtype: StopsLookup
+        """  # noqa: E501
+        path = Path(path)
+
+        stops: List[dict] = sorted(data, key=lambda stop: int(stop["stop_id"]))
+
+        strings: dict[str, int] = {}
+
+        def code(value: Any) -> int:
+            return strings.setdefault(str(value), len(strings))
+
+        lines: np.ndarray = np.array(
+            [
+                sum(
+                    1 << bit
+                    for bit, line in enumerate(LINE_FLAGS)
+                    if stop.get(line) is True
+                )
+                for stop in stops
+            ],
+            dtype=np.uint16,
+        )
+        latitude: np.ndarray = np.array(
+            [float(stop["location"]["latitude"]) for stop in stops],
+            dtype=np.float64,
+        )
+        longitude: np.ndarray = np.array(
+            [float(stop["location"]["longitude"]) for stop in stops],
+            dtype=np.float64,
+        )
+
+        arrays: dict[str, np.ndarray] = {
+            "stop_id": np.array(
+                [int(stop["stop_id"]) for stop in stops], dtype=np.int32
+            ),
+            "map_id": np.array(
+                [int(stop["map_id"]) for stop in stops],
+                dtype=np.int32,
+            ),
+            "ada": np.array(
+                [stop.get("ada") is True for stop in stops], dtype=np.bool_
+            ),
+            "lines": lines,
+            "latitude": latitude,
+            "longitude": longitude,
+        }
+
+        attribute: str
+        for attribute in sorted(_STRING_ATTRIBUTES):
+            arrays[attribute] = np.array(
+                [code(value=stop[attribute]) for stop in stops],
+                dtype=np.int32,
+            )
+
+        stationIds: np.ndarray
+        first: np.ndarray
+        inverse: np.ndarray
+        stationIds, first, inverse = np.unique(
+            arrays["map_id"],
+            return_index=True,
+            return_inverse=True,
+        )
+        counts: np.ndarray = np.bincount(inverse, minlength=len(stationIds))
+
+        stationLines: np.ndarray = np.zeros(len(stationIds), dtype=np.uint16)
+        np.bitwise_or.at(stationLines, inverse, lines)
+
+        stationAda: np.ndarray = np.zeros(len(stationIds), dtype=np.bool_)
+        np.logical_or.at(stationAda, inverse, arrays["ada"])
+
+        descriptive: np.ndarray = arrays["station_descriptive_name"][first]
+
+        arrays.update(
+            {
+                "station_id": stationIds.astype(np.int32),
+                "station_station_name": arrays["station_name"][first],
+                "station_station_descriptive_name": descriptive,
+                "station_ada": stationAda,
+                "station_lines": stationLines,
+                "station_latitude": np.bincount(
+                    inverse,
+                    weights=latitude,
+                    minlength=len(stationIds),
+                )
+                / np.maximum(counts, 1),
+                "station_longitude": np.bincount(
+                    inverse,
+                    weights=longitude,
+                    minlength=len(stationIds),
+                )
+                / np.maximum(counts, 1),
+            }
+        )
+
+        stopBase: int
+        stationBase: int
+        stopBase, arrays["stopIndex"] = _denseIndex(ids=arrays["stop_id"])
+        stationBase, arrays["stationIndex"] = _denseIndex(
+            ids=arrays["station_id"],
+        )
+
+        layout: dict[str, tuple[str, int, int]] = {}
+        offset: int = 0
+
+        name: str
+        array: np.ndarray
+        for name, array in arrays.items():
+            layout[name] = (array.dtype.str, offset, len(array))
+            offset = _align(size=offset + array.nbytes)
+
+        header: bytes = json.dumps(
+            {
+                "version": FORMAT_VERSION,
+                "dataset": datasetHash(data=data),
+                "built": time.time(),
+                "strings": list(strings),
+                "stopBase": stopBase,
+                "stationBase": stationBase,
+                "arrays": layout,
+            }
+        ).encode()
+        start: int = _align(size=HEADER_OFFSET + len(header))
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        temp: Path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(temp, "wb") as file:
+            file.write(MAGIC)
+            file.write(len(header).to_bytes(4, "little"))
+            file.write(header)
+
+            for name, array in arrays.items():
+                file.seek(start + layout[name][1])
+                file.write(np.ascontiguousarray(array).tobytes())
+
+        os.replace(temp, path)
+
+        return cls(path=path)
+
+    @classmethod
+    def fromStops(
+        cls,
+        stops: Optional[Stops] = None,
+        path: Path = DEFAULT_PATH,
+        maxAge: Optional[float] = None,
+        data: Optional[List[dict]] = None,
+    ) -> "StopsLookup":
+        """
+        Load a lookup table from disk, building it from the Stops API endpoint if it does not exist, is of another format version, was built from a dataset other than data, or is too old
+
+        :param stops: The Stops instance to download the dataset with (if not specified, Stops() is used)
+        :type stops: Optional[Stops], optional
+        :param path: The file to load the lookup table from and save it to
+        :type path: Path, optional
+        :param maxAge: The number of seconds after which the lookup table is rebuilt (if not specified, it is never rebuilt)
+        :type maxAge: Optional[float], optional
+        :param data: The current Stops dataset, as returned by Stops(output="dicts").get, which the lookup table is checked against and rebuilt from rather than downloading it again (if not specified, the dataset is not checked)
+        :type data: Optional[List[dict]], optional
+        :return: The lookup table
+        :rtype: StopsLookup
+        """  # noqa: E501
+        try:
+            lookup: StopsLookup = cls(path=path, data=data)
+            if (maxAge is None) or (time.time() - lookup.built < maxAge):
+                return lookup
+
+            lookup.close()
+        except (OSError, ValueError, KeyError):
+            pass
+
+        if data is not None:
+            return cls.build(data=data, path=path)
+
+        if stops is None:
+            stops = Stops()
+
+        output: str = stops.output
+        stops.output = "dicts"
+        try:
+            data: List[dict] = stops.get()
+        finally:
+            stops.output = output
+
+        return cls.build(data=data, path=path)
+
+    def __len__(self) -> int:
+        return len(self.arrays["stop_id"])
+
+    def stopRow(self, stpId: Any) -> int:
+        """
+        Get the row of a stop
+
+        :param stpId: A five-digit stop id
+        :type stpId: Any
+        :return: The row of the stop, or -1 if there is no such stop
+        :rtype: int
+        """
+        return self._row(value=stpId, base=self.stopBase, index=self.stopIndex)
+
+    def stationRow(self, mapId: Any) -> int:
+        """
+        Get the row of a station
+
+        :param mapId: A five-digit station id
+        :type mapId: Any
+        :return: The row of the station, or -1 if there is no such station
+        :rtype: int
+        """
+        return self._row(
+            value=mapId,
+            base=self.stationBase,
+            index=self.stationIndex,
+        )
+
+    def _row(self, value: Any, base: int, index: np.ndarray) -> int:
+        try:
+            offset: int = int(value) - base
+        except (TypeError, ValueError):
+            return -1
+
+        if (offset < 0) or (offset >= len(index)):
+            return -1
+
+        return int(index[offset])
+
+    def stop(self, stpId: Any) -> Optional[dict[str, Any]]:
+        """
+        Get the attributes of a stop
+
+        :param stpId: A five-digit stop id
+        :type stpId: Any
+        :return: The attributes in STOP_ATTRIBUTES, with lines as a tuple of line flag names, or None if there is no such stop
+        :rtype: Optional[dict[str, Any]]
+        """  # noqa: E501
+        row: int = self.stopRow(stpId=stpId)
+        if row < 0:
+            return None
+
+        return self._attributes(row=row, prefix="", names=STOP_ATTRIBUTES)
+
+    def station(self, mapId: Any) -> Optional[dict[str, Any]]:
+        """
+        Get the attributes of a station
+
+        :param mapId: A five-digit station id
+        :type mapId: Any
+        :return: The attributes in STATION_ATTRIBUTES, with lines as a tuple of line flag names, or None if there is no such station
+        :rtype: Optional[dict[str, Any]]
+        """  # noqa: E501
+        row: int = self.stationRow(mapId=mapId)
+        if row < 0:
+            return None
+
+        return self._attributes(
+            row=row,
+            prefix="station_",
+            names=STATION_ATTRIBUTES,
+        )
+
+    def _attributes(
+        self,
+        row: int,
+        prefix: str,
+        names: Sequence[str],
+    ) -> dict[str, Any]:
+        attributes: dict[str, Any] = {}
+
+        name: str
+        for name in names:
+            value: Any = self.arrays[prefix + name][row].item()
+
+            if name in _STRING_ATTRIBUTES:
+                value = self.strings[value]
+            elif name == "lines":
+                value = lineNames(mask=value)
+
+            attributes[name] = value
+
+        return attributes
+
+    def validate(self, mapid: Any = None, stpid: Any = None) -> None:
+        """
+        Check that the ids passed to cta.train.Arrivals exist before a request is made
+
+        Empty and None ids are not checked.
+
+        :param mapid: A five-digit station id
+        :type mapid: Any, optional
+        :param stpid: A five-digit stop id
+        :type stpid: Any, optional
+        :raises ValueError: If either id does not exist, or the stop is not part of the station
+        """  # noqa: E501
+        stationRow: int = -1
+        if (mapid != "") and (mapid is not None):
+            stationRow = self.stationRow(mapId=mapid)
+            if stationRow < 0:
+                raise ValueError(f"unknown mapid {mapid!r}")
+
+        if (stpid != "") and (stpid is not None):
+            stopRow: int = self.stopRow(stpId=stpid)
+            if stopRow < 0:
+                raise ValueError(f"unknown stpid {stpid!r}")
+
+            mapId: int = self.arrays["map_id"][stopRow]
+            stationIds: np.ndarray = self.arrays["station_id"]
+            if (stationRow >= 0) and (mapId != stationIds[stationRow]):
+                raise ValueError(
+                    f"stpid {stpid!r} is not a stop of mapid {mapid!r}",
+                )
+
+    def stopRows(self, ids: Series | np.ndarray) -> np.ndarray:
+        """
+        Get the rows of many stops at once
+
+        :param ids: Stop ids, as strings or numbers
+        :type ids: Series | np.ndarray
+        :return: The row of each stop, or -1 where there is no such stop
+        :rtype: np.ndarray
+        """
+        return self._rows(ids=ids, base=self.stopBase, index=self.stopIndex)
+
+    def stationRows(self, ids: Series | np.ndarray) -> np.ndarray:
+        """
+        Get the rows of many stations at once
+
+        :param ids: Station ids, as strings or numbers
+        :type ids: Series | np.ndarray
+        :return: The row of each station, or -1 where there is no such station
+        :rtype: np.ndarray
+        """  # noqa: E501
+        return self._rows(
+            ids=ids,
+            base=self.stationBase,
+            index=self.stationIndex,
+        )
+
+    def _rows(
+        self,
+        ids: Series | np.ndarray,
+        base: int,
+        index: np.ndarray,
+    ) -> np.ndarray:
+        offsets: np.ndarray = (
+            np.asarray(
+                to_numeric(Series(ids, copy=False), errors="coerce"),
+                dtype=np.float64,
+            )
+            - base
+        )
+
+        found: np.ndarray = (offsets >= 0) & (offsets < len(index))
+
+        rows: np.ndarray = np.full(len(offsets), -1, dtype=np.int32)
+        rows[found] = index[offsets[found].astype(np.int64)]
+
+        return rows
+
+    def joinStops(
+        self,
+        df: DataFrame,
+        column: str = "stpId",
+        attributes: Sequence[str] = STOP_ATTRIBUTES,
+        prefix: str = "",
+    ) -> DataFrame:
+        """
+        Add the attributes of the stop of every row to a DataFrame in a single vectorized pass
+
+        :param df: A DataFrame with a column of stop ids, such as one returned by cta.train.Arrivals
+        :type df: DataFrame
+        :param column: The column of stop ids
+        :type column: str, optional
+        :param attributes: The attributes in STOP_ATTRIBUTES to add
+        :type attributes: Sequence[str], optional
+        :param prefix: A prefix for the names of the added columns
+        :type prefix: str, optional
+        :return: A copy of the DataFrame with a column per attribute, null where the stop does not exist; lines is a uint16 bitmask of cta.spatial.LINE_FLAGS
+        :rtype: DataFrame
+        """  # noqa: E501
+        return self._join(
+            df=df,
+            rows=self.stopRows(ids=df[column]),
+            arrayPrefix="",
+            attributes=attributes,
+            prefix=prefix,
+        )
+
+    def joinStations(
+        self,
+        df: DataFrame,
+        column: str = "staId",
+        attributes: Sequence[str] = STATION_ATTRIBUTES,
+        prefix: str = "",
+    ) -> DataFrame:
+        """
+        Add the attributes of the station of every row to a DataFrame in a single vectorized pass
+
+        :param df: A DataFrame with a column of station ids, such as one returned by cta.train.Arrivals
+        :type df: DataFrame
+        :param column: The column of station ids
+        :type column: str, optional
+        :param attributes: The attributes in STATION_ATTRIBUTES to add
+        :type attributes: Sequence[str], optional
+        :param prefix: A prefix for the names of the added columns
+        :type prefix: str, optional
+        :return: A copy of the DataFrame with a column per attribute, null where the station does not exist; lines is a uint16 bitmask of cta.spatial.LINE_FLAGS
+        :rtype: DataFrame
+        """  # noqa: E501
+        return self._join(
+            df=df,
+            rows=self.stationRows(ids=df[column]),
+            arrayPrefix="station_",
+            attributes=attributes,
+            prefix=prefix,
+        )
+
+    def _join(
+        self,
+        df: DataFrame,
+        rows: np.ndarray,
+        arrayPrefix: str,
+        attributes: Sequence[str],
+        prefix: str,
+    ) -> DataFrame:
+        missing: np.ndarray = rows < 0
+        columns: dict[str, Any] = {}
+
+        name: str
+        for name in attributes:
+            values: np.ndarray = self.arrays[arrayPrefix + name][rows]
+
+            if name in _STRING_ATTRIBUTES:
+                columns[prefix + name] = Categorical.from_codes(
+                    np.where(missing, -1, values),
+                    categories=self.strings,
+                    validate=False,
+                )
+            elif name == "ada":
+                columns[prefix + name] = BooleanArray(values, missing)
+            elif name == "map_id":
+                columns[prefix + name] = IntegerArray(values, missing)
+            elif name == "lines":
+                columns[prefix + name] = np.where(missing, 0, values).astype(
+                    np.uint16,
+                )
+            else:
+                columns[prefix + name] = np.where(missing, np.nan, values)
+
+        return df.assign(**columns)
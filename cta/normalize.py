@@ -0,0 +1,73 @@
+from pandas import DataFrame, DatetimeTZDtype, Series, to_datetime, to_numeric
+
+from cta import TIMEZONE
+from cta.records import columnTypes
+
+
+def normalizeSeries(series: Series, dtype: str) -> Series:
+    """
+    Convert a column of JSON strings to a typed column in a single vectorized pass
+
+    :param series: A column of a DataFrame built from a JSON response
+    :type series: Series
+    :param dtype: One of bool, int8, int32, Int32, float64, datetime, or category
+    :type dtype: str
+    :return: The converted column
+    :rtype: Series
+    """  # noqa: E501
+    if dtype == "datetime":
+        if isinstance(series.dtype, DatetimeTZDtype):
+            return series
+        return to_datetime(series, format="ISO8601").dt.tz_localize(
+            TIMEZONE,
+            ambiguous="NaT",
+            nonexistent="shift_forward",
+        )
+
+    if dtype == "bool":
+        if series.dtype == bool:
+            return series
+        return to_numeric(series).astype("int8").astype(bool)
+
+    if dtype in ("int8", "int32"):
+        return to_numeric(series).astype(dtype)
+
+    if dtype == "Int32":
+        return to_numeric(series, errors="coerce").astype("Int32")
+
+    if dtype == "float64":
+        return to_numeric(series, errors="coerce").astype("float64")
+
+    if dtype == "category":
+        return series.astype("category")
+
+    return series
+
+
+def normalizeFrame(df: DataFrame, schema: dict, definition: str) -> DataFrame:
+    """
+    Convert every column of a DataFrame built from a JSON response to the dtype hinted at by its JSON schema
+
+    Integer formatted strings become int32 (or nullable Int32), flags become bool, coordinates become float64, date-time formatted strings become timezone aware America/Chicago datetimes, and route, destination, and station names become categoricals.
+
+    :param df: A DataFrame built from a JSON response
+    :type df: DataFrame
+    :param schema: JSON Schema of the response
+    :type schema: dict
+    :param definition: The name of the definition in the schema that describes a single row
+    :type definition: str
+    :return: The DataFrame with typed columns
+    :rtype: DataFrame
+    """  # noqa: E501
+    column: str
+    dtype: str
+    for column, dtype in columnTypes(
+        schema=schema,
+        definition=definition,
+    ).items():
+        if column not in df.columns:
+            continue
+
+        df[column] = normalizeSeries(series=df[column], dtype=dtype)
+
+    return df
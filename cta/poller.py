@@ -0,0 +1,397 @@
+import time
+from threading import Event
+from typing import Any, Callable, Hashable, List, Optional, Sequence
+
+from pandas import DataFrame, Index
+
+from cta import responseTime
+from cta.cache import responseTimestamp
+from cta.schedule import BACKGROUND, priority
+from cta.train import Arrivals, Locations
+
+ARRIVALS_KEYS: tuple[str, ...] = ("rn", "stpId")
+LOCATIONS_KEYS: tuple[str, ...] = ("rn",)
+COMPARE_COLUMNS: tuple[str, ...] = ("arrT", "lat", "lon", "heading")
+
+
+class Delta:
+    """
+    The changes between two consecutive snapshots of a single polled station or route
+
+    Rows are keyed on the train's run number (rn). New trains are in added, trains whose arrival time or position changed are in changed, and trains that are no longer present are in removed.
+    """  # noqa: E501
+
+    __slots__ = (
+        "source",
+        "target",
+        "queryTime",
+        "added",
+        "changed",
+        "removed",
+    )
+
+    def __init__(
+        self,
+        source: str,
+        target: Hashable,
+        queryTime: float,
+        added: DataFrame,
+        changed: DataFrame,
+        removed: DataFrame,
+    ) -> None:
+        """
+        Initializes the class
+
+        :param source: The name of the endpoint the snapshot came from (either arrivals or locations)
+        :type source: str
+        :param target: The station map ID or route that was polled
+        :type target: Hashable
+        :param queryTime: The UNIX timestamp of the newer snapshot
+        :type queryTime: float
+        :param added: Trains present in the newer snapshot but not the older one
+        :type added: DataFrame
+        :param changed: Trains present in both snapshots whose compared columns differ, as they are in the newer snapshot
+        :type changed: DataFrame
+        :param removed: Trains present in the older snapshot but not the newer one, as they were in the older snapshot
+        :type removed: DataFrame
+        """  # noqa: E501
+        self.source: str = source
+        self.target: Hashable = target
+        self.queryTime: float = queryTime
+        self.added: DataFrame = added
+        self.changed: DataFrame = changed
+        self.removed: DataFrame = removed
+
+    def __repr__(self) -> str:
+        return f"Delta(source={self.source!r}, target={self.target!r}, added={len(self.added)}, changed={len(self.changed)}, removed={len(self.removed)})"  # noqa: E501
+
+    @property
+    def empty(self) -> bool:
+        """
+        Whether or not nothing changed between the two snapshots
+
+        :return: True if no train was added, changed, or removed
+        :rtype: bool
+        """
+        return self.added.empty and self.changed.empty and self.removed.empty
+
+
+def diffFrames(
+    previous: DataFrame,
+    current: DataFrame,
+    keys: Sequence[str],
+    compare: Sequence[str] = COMPARE_COLUMNS,
+) -> tuple[DataFrame, DataFrame, DataFrame]:
+    """
+    Compute the rows added, changed, and removed between two snapshots in a single vectorized pass
+
+    :param previous: The older snapshot
+    :type previous: DataFrame
+    :param current: The newer snapshot
+    :type current: DataFrame
+    :param keys: The columns that identify a train
+    :type keys: Sequence[str]
+    :param compare: The columns that are compared to decide whether a train changed
+    :type compare: Sequence[str], optional
+    :return: The added, changed, and removed rows
+    :rtype: tuple[DataFrame, DataFrame, DataFrame]
+    """  # noqa: E501
+    if current.empty:
+        return current, current, previous
+
+    if previous.empty:
+        return current, previous, previous
+
+    keys = list(keys)
+
+    prev: DataFrame = previous.drop_duplicates(subset=keys, keep="last")
+    prev = prev.set_index(keys=keys, drop=False)
+    cur: DataFrame = current.drop_duplicates(subset=keys, keep="last")
+    cur = cur.set_index(keys=keys, drop=False)
+
+    added: DataFrame = cur.loc[cur.index.difference(prev.index)]
+    removed: DataFrame = prev.loc[prev.index.difference(cur.index)]
+
+    common: Index = cur.index.intersection(prev.index)
+    columns: List[str] = [
+        column
+        for column in compare
+        if (column in cur.columns) and (column in prev.columns)
+    ]
+
+    curCommon: DataFrame = cur.loc[common, columns]
+    prevCommon: DataFrame = prev.loc[common, columns]
+    bothMissing: DataFrame = curCommon.isna() & prevCommon.isna()
+    same: DataFrame = (curCommon == prevCommon) | bothMissing
+    changed: DataFrame = cur.loc[common[~same.all(axis=1).to_numpy()]]
+
+    return (
+        added.reset_index(drop=True),
+        changed.reset_index(drop=True),
+        removed.reset_index(drop=True),
+    )
+
+
+class Poller:
+    """
+    Poll a set of stations and routes at a fixed interval and emit only what changed between polls
+
+    A poll of a station or route whose ctatt.tmst timestamp (the queryTime of the API class) has not changed since the previous poll is skipped as soon as the response is decoded, without being validated, converted to a DataFrame, or compared. Every subscriber receives the same Delta objects, so snapshots are only compared once no matter how many subscribers there are.
+    """  # noqa: E501
+
+    def __init__(
+        self,
+        interval: float,
+        arrivals: Optional[Arrivals] = None,
+        mapids: Sequence[int] = (),
+        locations: Optional[Locations] = None,
+        routes: Sequence[str] = (),
+        compare: Sequence[str] = COMPARE_COLUMNS,
+    ) -> None:
+        """
+        Initializes the class
+
+        :param interval: The number of seconds between the start of each poll
+        :type interval: float
+        :param arrivals: The Arrivals instance to poll stations with
+        :type arrivals: Optional[Arrivals], optional
+        :param mapids: The five-digit station codes to poll
+        :type mapids: Sequence[int], optional
+        :param locations: The Locations instance to poll routes with
+        :type locations: Optional[Locations], optional
+        :param routes: The routes to poll
+        :type routes: Sequence[str], optional
+        :param compare: The columns that are compared to decide whether a train changed
+        :type compare: Sequence[str], optional
+        """  # noqa: E501
+        self.interval: float = interval
+        self.arrivals: Optional[Arrivals] = arrivals
+        self.mapids: List[int] = list(mapids)
+        self.locations: Optional[Locations] = locations
+        self.routes: List[str] = list(routes)
+        self.compare: tuple[str, ...] = tuple(compare)
+
+        self.snapshots: dict[
+            tuple[str, Hashable],
+            tuple[float, DataFrame],
+        ] = {}
+        self.subscribers: List[Callable[[Delta], None]] = []
+        self.stopEvent: Event = Event()
+
+        self.polls: int = 0
+        self.skipped: int = 0
+
+    def subscribe(self, callback: Callable[[Delta], None]) -> None:
+        """
+        Register a callback that is called with every non-empty Delta
+
+        :param callback: The callback to register
+        :type callback: Callable[[Delta], None]
+        """
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[Delta], None]) -> None:
+        """
+        Remove a previously registered callback
+
+        :param callback: The callback to remove
+        :type callback: Callable[[Delta], None]
+        """
+        self.subscribers.remove(callback)
+
+    def update(
+        self,
+        source: str,
+        target: Hashable,
+        queryTime: float,
+        df: DataFrame,
+        keys: Sequence[str],
+    ) -> Optional[Delta]:
+        """
+        Compare a new snapshot of a station or route against the previous one and store it
+
+        :param source: The name of the endpoint the snapshot came from
+        :type source: str
+        :param target: The station map ID or route that was polled
+        :type target: Hashable
+        :param queryTime: The UNIX timestamp of the snapshot
+        :type queryTime: float
+        :param df: The snapshot
+        :type df: DataFrame
+        :param keys: The columns that identify a train
+        :type keys: Sequence[str]
+        :return: The changes since the previous snapshot, or None if the snapshot is not newer than the previous one
+        :rtype: Optional[Delta]
+        """  # noqa: E501
+        self.polls += 1
+
+        previous: tuple[float, DataFrame] | None = self.snapshots.get(
+            (source, target),
+        )
+        if self.unchanged(source=source, target=target, queryTime=queryTime):
+            self.skipped += 1
+            return None
+
+        self.snapshots[(source, target)] = (queryTime, df)
+
+        added: DataFrame
+        changed: DataFrame
+        removed: DataFrame
+        added, changed, removed = diffFrames(
+            previous=DataFrame() if previous is None else previous[1],
+            current=df,
+            keys=keys,
+            compare=self.compare,
+        )
+
+        return Delta(
+            source=source,
+            target=target,
+            queryTime=queryTime,
+            added=added,
+            changed=changed,
+            removed=removed,
+        )
+
+    def unchanged(
+        self,
+        source: str,
+        target: Hashable,
+        queryTime: float,
+    ) -> bool:
+        """
+        Check whether a snapshot of a station or route is not newer than the previous one
+
+        :param source: The name of the endpoint the snapshot came from
+        :type source: str
+        :param target: The station map ID or route that was polled
+        :type target: Hashable
+        :param queryTime: The UNIX timestamp of the snapshot
+        :type queryTime: float
+        :return: True if a snapshot at least as new has already been stored
+        :rtype: bool
+        """  # noqa: E501
+        previous: tuple[float, DataFrame] | None = self.snapshots.get(
+            (source, target),
+        )
+        return (previous is not None) and (previous[0] >= queryTime)
+
+    def _accept(
+        self,
+        source: str,
+        targets: Sequence[Hashable],
+    ) -> Callable[[Any], bool]:
+        def accept(data: Any) -> bool:
+            tmst: Optional[str] = responseTimestamp(data=data)
+            if tmst is None:
+                return True
+
+            queryTime: float = responseTime(tmst=tmst)
+
+            target: Hashable
+            for target in targets:
+                stored: bool = self.unchanged(
+                    source=source,
+                    target=target,
+                    queryTime=queryTime,
+                )
+                if stored is False:
+                    return True
+
+            return False
+
+        return accept
+
+    def poll(self) -> List[Delta]:
+        """
+        Poll every configured station and route once and notify subscribers of what changed
+
+        :return: The non-empty changes since the previous poll
+        :rtype: List[Delta]
+        """  # noqa: E501
+        deltas: List[Delta] = []
+        delta: Optional[Delta]
+
+        if self.arrivals is not None:
+            mapid: int
+            for mapid in self.mapids:
+                df: Optional[DataFrame] = self.arrivals.query(
+                    endpoint=self.arrivals.buildEndpoint(mapid=mapid),
+                    accept=self._accept(source="arrivals", targets=[mapid]),
+                )
+                if df is None:
+                    self.polls += 1
+                    self.skipped += 1
+                    continue
+
+                delta = self.update(
+                    source="arrivals",
+                    target=mapid,
+                    queryTime=self.arrivals.queryTime,
+                    df=df,
+                    keys=ARRIVALS_KEYS,
+                )
+                if (delta is not None) and (delta.empty is False):
+                    deltas.append(delta)
+
+        if (self.locations is not None) and (len(self.routes) > 0):
+            dfs: Optional[dict[str, DataFrame]] = self.locations.query(
+                endpoint=self.locations.buildEndpoint(rt=self.routes),
+                accept=self._accept(source="locations", targets=self.routes),
+            )
+
+            routes: List[str] = self.routes
+            if dfs is None:
+                self.polls += len(routes)
+                self.skipped += len(routes)
+                routes = []
+
+            route: str
+            for route in routes:
+                delta = self.update(
+                    source="locations",
+                    target=route,
+                    queryTime=self.locations.queryTime,
+                    df=dfs.get(route, DataFrame()),
+                    keys=LOCATIONS_KEYS,
+                )
+                if (delta is not None) and (delta.empty is False):
+                    deltas.append(delta)
+
+        callback: Callable[[Delta], None]
+        for delta in deltas:
+            for callback in self.subscribers:
+                callback(delta)
+
+        return deltas
+
+    def run(self, iterations: Optional[int] = None) -> None:
+        """
+        Poll at a fixed interval until stopped
+
+        Requests are made at BACKGROUND priority, so a Client's Scheduler sends interactive queries ahead of them.
+
+        :param iterations: The number of polls to make before returning (if not specified, poll until stop() is called)
+        :type iterations: Optional[int], optional
+        """  # noqa: E501
+        self.stopEvent.clear()
+
+        count: int = 0
+        deadline: float = time.monotonic()
+
+        while self.stopEvent.is_set() is False:
+            with priority(level=BACKGROUND):
+                self.poll()
+
+            count += 1
+            if (iterations is not None) and (count >= iterations):
+                break
+
+            deadline += self.interval
+            self.stopEvent.wait(timeout=max(0, deadline - time.monotonic()))
+
+    def stop(self) -> None:
+        """
+        Stop a running poll loop after its current poll
+        """
+        self.stopEvent.set()
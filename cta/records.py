@@ -0,0 +1,867 @@
+import sys
+from array import array
+from datetime import datetime, tzinfo
+from threading import Lock
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+)
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+
+BOOLEAN_COLUMNS: frozenset[str] = frozenset(
+    {"isApp", "isSch", "isDly", "isFlt"},
+)
+INT8_COLUMNS: frozenset[str] = frozenset({"trDr"})
+FLOAT_COLUMNS: frozenset[str] = frozenset({"lat", "lon"})
+CATEGORICAL_COLUMNS: frozenset[str] = frozenset(
+    {"rt", "destNm", "staNm", "stpDe", "nextStaNm"}
+)
+
+_COLUMN_TYPES: dict[tuple[int, str], tuple[dict, dict[str, str]]] = {}
+_COLUMN_TYPES_LOCK: Lock = Lock()
+
+
+def columnTypes(schema: dict, definition: str) -> dict[str, str]:
+    """
+    Derive the dtype of each column of a JSON schema definition from its type and format hints
+
+    The result is cached per schema and definition.
+
+    :param schema: JSON Schema
+    :type schema: dict
+    :param definition: The name of the definition in the schema that describes a single record
+    :type definition: str
+    :return: A mapping of column names to one of bool, int8, int32, Int32, float64, datetime, or category
+    :rtype: dict[str, str]
+    """  # noqa: E501
+    key: tuple[int, str] = (id(schema), definition)
+
+    entry: tuple[dict, dict[str, str]] | None = _COLUMN_TYPES.get(key)
+    if (entry is not None) and (entry[0] is schema):
+        return entry[1]
+
+    types: dict[str, str] = {}
+
+    properties: dict = schema["definitions"][definition]["properties"]
+
+    column: str
+    prop: dict
+    for column, prop in properties.items():
+        propType: str | list = prop.get("type", "")
+        propFormat: str | None = prop.get("format")
+        nullable: bool = isinstance(propType, list) and ("null" in propType)
+
+        if column in BOOLEAN_COLUMNS:
+            types[column] = "bool"
+        elif propFormat == "integer":
+            if column in INT8_COLUMNS:
+                types[column] = "int8"
+            else:
+                types[column] = "Int32" if nullable else "int32"
+        elif propFormat == "date-time":
+            types[column] = "datetime"
+        elif column in FLOAT_COLUMNS:
+            types[column] = "float64"
+        elif column in CATEGORICAL_COLUMNS:
+            types[column] = "category"
+        elif propType == "boolean":
+            types[column] = "bool"
+
+    with _COLUMN_TYPES_LOCK:
+        _COLUMN_TYPES[key] = (schema, types)
+
+    return types
+
+
+INT32_NULL: int = -(2**31)
+NAN: float = float("nan")
+
+ARRAY_TYPECODES: dict[str, str] = {
+    "int8": "b",
+    "int32": "i",
+    "Int32": "i",
+    "float64": "d",
+    "datetime": "d",
+    "bits": "Q",
+}
+
+JSON_TYPES: dict[str, type | tuple[type, ...]] = {
+    "string": str,
+    "boolean": bool,
+    "null": type(None),
+    "object": dict,
+    "array": list,
+    "number": (int, float),
+    "integer": int,
+}
+
+_RECORD_TYPES: dict[tuple[int, str], tuple[dict, type["TypedRecord"]]] = {}
+_RECORD_TYPES_LOCK: Lock = Lock()
+
+
+class Record:
+    """
+    A lightweight record of a single item of an API response
+
+    Records are plain __slots__ objects, so building them does not import pandas and costs far less memory than a dict. Attributes are named after the keys of the JSON response and hold the values exactly as they were received; keys missing from the response are None.
+    """  # noqa: E501
+
+    __slots__ = ()
+
+    def __init__(self, **fields: Any) -> None:
+        """
+        Initializes the class
+
+        :param fields: The value of each attribute, keyed on attribute name
+        :type fields: Any
+        """
+        name: str
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def fromDict(cls, data: dict) -> "Record":
+        """
+        Build a record from a single JSON object of an API response
+
+        :param data: The JSON object
+        :type data: dict
+        :return: The JSON object as a record
+        :rtype: Record
+        """
+        record: Record = cls.__new__(cls)
+
+        name: str
+        for name in cls.__slots__:
+            setattr(record, name, data.get(name))
+
+        return record
+
+    def toDict(self) -> dict:
+        """
+        Convert the record back to a JSON object
+
+        :return: The record as a dict
+        :rtype: dict
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def fields(cls) -> tuple[str, ...]:
+        """
+        Get the names of the fields of the record, in order
+
+        :return: The field names
+        :rtype: tuple[str, ...]
+        """
+        return cls.__slots__
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+
+        return self.toDict() == other.toDict()
+
+    def __repr__(self) -> str:
+        fields: str = ", ".join(
+            f"{name}={value!r}" for name, value in self.toDict().items()
+        )
+        return f"{type(self).__name__}({fields})"
+
+
+class Eta(Record):
+    """
+    A single arrival prediction returned by cta.train.Arrivals or cta.train.FollowThisTrain
+
+    Predictions returned by FollowThisTrain do not have a lat, lon, or heading, which are None.
+    """  # noqa: E501
+
+    __slots__ = (
+        "staId",
+        "stpId",
+        "staNm",
+        "stpDe",
+        "rn",
+        "rt",
+        "destSt",
+        "destNm",
+        "trDr",
+        "prdt",
+        "arrT",
+        "isApp",
+        "isSch",
+        "isDly",
+        "isFlt",
+        "flags",
+        "lat",
+        "lon",
+        "heading",
+    )
+
+
+class Train(Record):
+    """
+    A single in-service train returned by cta.train.Locations
+    """
+
+    __slots__ = (
+        "rn",
+        "destSt",
+        "destNm",
+        "trDr",
+        "nextStaId",
+        "nextStpId",
+        "nextStaNm",
+        "prdt",
+        "arrT",
+        "isApp",
+        "isDly",
+        "flags",
+        "lat",
+        "lon",
+        "heading",
+    )
+
+
+class LStop(Record):
+    """
+    A single stop returned by cta.stops.Stops
+    """
+
+    __slots__ = (
+        "stop_id",
+        "direction_id",
+        "stop_name",
+        "station_name",
+        "station_descriptive_name",
+        "map_id",
+        "ada",
+        "red",
+        "blue",
+        "g",
+        "brn",
+        "p",
+        "pexp",
+        "y",
+        "pnk",
+        "o",
+        "location",
+    )
+
+
+class TypedRecord(Record):
+    """
+    A record whose fields are converted to the types hinted at by a JSON schema definition
+
+    Subclasses are generated from a schema by recordType. Integer formatted strings become ints, coordinates become floats, date-time formatted strings become timezone aware America/Chicago datetimes, and route, destination, and station names become interned strs. Flags are packed as the bits of a single int and read back as bools. Each value is checked against the definition as it is converted, so a response needs no separate jsonschema pass; invalid values raise ValueError.
+    """  # noqa: E501
+
+    __slots__ = ()
+
+    FIELDS: tuple[str, ...] = ()
+    SLOTS: tuple[str, ...] = ()
+    KINDS: tuple[str, ...] = ()
+    FLAGS: tuple[str, ...] = ()
+    NAMES: frozenset[str] = frozenset()
+    CLOSED: bool = False
+    CONVERTERS: tuple[tuple[str, Callable[[Any], Any], bool, int], ...] = ()
+    ZONE: Optional[tzinfo] = None
+
+    def __init__(self, **fields: Any) -> None:
+        """
+        Initializes the class
+
+        :param fields: The already converted value of each field, keyed on field name
+        :type fields: Any
+        """  # noqa: E501
+        self.bits: int = 0
+
+        name: str
+        for name in self.FIELDS:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def convert(cls, data: dict) -> tuple:
+        """
+        Validate and convert a single JSON object of an API response in one pass
+
+        :param data: The JSON object
+        :type data: dict
+        :return: The converted value of every slot, in the order of SLOTS
+        :rtype: tuple
+        """  # noqa: E501
+        if cls.CLOSED and not (data.keys() <= cls.NAMES):
+            raise ValueError(
+                f"{cls.__name__} has unexpected fields {sorted(data.keys() - cls.NAMES)}"  # noqa: E501
+            )
+
+        values: List[Any] = []
+        bits: int = 0
+
+        name: str
+        convert: Callable[[Any], Any]
+        required: bool
+        mask: int
+        for name, convert, required, mask in cls.CONVERTERS:
+            value: Any
+            if name in data:
+                value = convert(data[name])
+            elif required:
+                raise ValueError(f"{cls.__name__}.{name} is required")
+            else:
+                value = None
+
+            if mask == 0:
+                values.append(value)
+            elif value:
+                bits |= mask
+
+        values.append(bits)
+        return tuple(values)
+
+    @classmethod
+    def fromDict(cls, data: dict) -> "TypedRecord":
+        """
+        Validate and convert a single JSON object of an API response to a record
+
+        :param data: The JSON object
+        :type data: dict
+        :return: The JSON object as a typed record
+        :rtype: TypedRecord
+        """  # noqa: E501
+        record: TypedRecord = cls.__new__(cls)
+
+        name: str
+        value: Any
+        for name, value in zip(cls.SLOTS, cls.convert(data=data)):
+            setattr(record, name, value)
+
+        return record
+
+    def toDict(self) -> dict:
+        """
+        Convert the record to a dict of its typed values
+
+        :return: The record as a dict
+        :rtype: dict
+        """
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    @classmethod
+    def fields(cls) -> tuple[str, ...]:
+        return cls.FIELDS
+
+
+def _flagProperty(mask: int) -> property:
+    def getter(self: TypedRecord) -> bool:
+        return (self.bits & mask) != 0
+
+    def setter(self: TypedRecord, value: Any) -> None:
+        self.bits = (self.bits | mask) if value else (self.bits & ~mask)
+
+    return property(getter, setter)
+
+
+def _flag(value: Any) -> bool:
+    if (value is True) or (value == "1"):
+        return True
+    if (value is False) or (value == "0"):
+        return False
+    raise ValueError(value)
+
+
+def _converter(
+    definition: str,
+    name: str,
+    prop: dict,
+    kind: str,
+    zone: tzinfo,
+) -> Callable[[Any], Any]:
+    jsonTypes: List[str] = prop.get("type", [])
+    if isinstance(jsonTypes, str):
+        jsonTypes = [jsonTypes]
+
+    allowed: tuple[type, ...] = tuple(
+        pythonType
+        for jsonType in jsonTypes
+        for pythonType in (
+            JSON_TYPES[jsonType]
+            if isinstance(JSON_TYPES[jsonType], tuple)
+            else (JSON_TYPES[jsonType],)
+        )
+    ) or (object,)
+    nullable: bool = type(None) in allowed
+    enum: Optional[frozenset] = None
+    if "enum" in prop:
+        enum = frozenset(prop["enum"])
+
+    cast: Callable[[Any], Any]
+    if kind in ("int8", "int32", "Int32"):
+        cast = int
+    elif kind == "float64":
+        cast = float
+    elif kind == "datetime":
+
+        def cast(value: str) -> datetime:
+            timestamp: datetime = datetime.fromisoformat(value)
+            if timestamp.tzinfo is None:
+                return timestamp.replace(tzinfo=zone)
+            return timestamp.astimezone(zone)
+
+    elif kind == "bool":
+        cast = _flag
+    elif kind == "category":
+        cast = sys.intern
+    else:
+
+        def cast(value: Any) -> Any:
+            return value
+
+    def convert(value: Any) -> Any:
+        if value is None:
+            if nullable:
+                return None
+            raise ValueError(f"{definition}.{name} must not be null")
+
+        if not isinstance(value, allowed):
+            raise ValueError(
+                f"{definition}.{name} must be {'/'.join(jsonTypes)}, not {value!r}"  # noqa: E501
+            )
+
+        if (enum is not None) and (value not in enum):
+            raise ValueError(f"{definition}.{name} is not allowed: {value!r}")
+
+        try:
+            return cast(value)
+        except (TypeError, ValueError):
+            raise ValueError(
+                f"{definition}.{name} is not a valid {kind}: {value!r}"
+            ) from None
+
+    return convert
+
+
+def recordType(schema: dict, definition: str) -> type[TypedRecord]:
+    """
+    Generate a TypedRecord class from a definition of a JSON schema
+
+    Fields are typed by columnTypes, except that integer fields which are not required are nullable Int32 fields. Flags are stored as the bits of a single bits slot, every other field in a slot of its own. The result is cached per schema and definition.
+
+    :param schema: JSON Schema
+    :type schema: dict
+    :param definition: The name of the definition in the schema that describes a single record
+    :type definition: str
+    :return: A TypedRecord subclass named after the definition
+    :rtype: type[TypedRecord]
+    """  # noqa: E501
+    key: tuple[int, str] = (id(schema), definition)
+
+    entry: tuple[dict, type[TypedRecord]] | None = _RECORD_TYPES.get(key)
+    if (entry is not None) and (entry[0] is schema):
+        return entry[1]
+
+    from zoneinfo import ZoneInfo
+
+    from cta import TIMEZONE
+
+    zone: tzinfo = ZoneInfo(TIMEZONE)
+    types: dict[str, str] = columnTypes(schema=schema, definition=definition)
+    body: dict = schema["definitions"][definition]
+    required: set[str] = set(body.get("required", ()))
+
+    namespace: dict[str, Any] = {}
+    fields: List[str] = []
+    slots: List[str] = []
+    kinds: List[str] = []
+    flags: List[str] = []
+    converters: List[tuple[str, Callable[[Any], Any], bool, int]] = []
+
+    name: str
+    prop: dict
+    for name, prop in body["properties"].items():
+        if "$ref" in prop:
+            prop = schema["definitions"][prop["$ref"].rsplit("/", 1)[-1]]
+
+        kind: str = types.get(name, "object")
+        if (kind in ("int8", "int32")) and (name not in required):
+            kind = "Int32"
+
+        mask: int = 0
+        if kind == "bool":
+            mask = 1 << len(flags)
+            flags.append(name)
+            namespace[name] = _flagProperty(mask=mask)
+        else:
+            slots.append(name)
+            kinds.append(kind)
+
+        fields.append(name)
+        converters.append(
+            (
+                name,
+                _converter(
+                    definition=definition,
+                    name=name,
+                    prop=prop,
+                    kind=kind,
+                    zone=zone,
+                ),
+                name in required,
+                mask,
+            )
+        )
+
+    slots.append("bits")
+    kinds.append("bits")
+
+    namespace.update(
+        {
+            "__slots__": tuple(slots),
+            "__module__": __name__,
+            "__doc__": f"A typed {definition} generated from its JSON schema definition",  # noqa: E501
+            "FIELDS": tuple(fields),
+            "SLOTS": tuple(slots),
+            "KINDS": tuple(kinds),
+            "FLAGS": tuple(flags),
+            "NAMES": frozenset(fields),
+            "CLOSED": body.get("additionalProperties") is False,
+            "CONVERTERS": tuple(converters),
+            "ZONE": zone,
+        }
+    )
+
+    cls: type[TypedRecord] = type(definition, (TypedRecord,), namespace)
+
+    with _RECORD_TYPES_LOCK:
+        _RECORD_TYPES[key] = (schema, cls)
+
+    return cls
+
+
+def toRecords(
+    recordType: type[TypedRecord],
+    items: Iterable[dict],
+    strict: bool = True,
+) -> List[TypedRecord]:
+    """
+    Validate and convert the JSON objects of an API response to typed records
+
+    :param recordType: The TypedRecord class of a single item, as returned by recordType
+    :type recordType: type[TypedRecord]
+    :param items: The JSON objects
+    :type items: Iterable[dict]
+    :param strict: Raise ValueError on the first invalid item rather than skipping it
+    :type strict: bool, optional
+    :return: The valid items as typed records
+    :rtype: List[TypedRecord]
+    """  # noqa: E501
+    records: List[TypedRecord] = []
+
+    item: dict
+    for item in items:
+        try:
+            records.append(recordType.fromDict(data=item))
+        except ValueError:
+            if strict:
+                raise
+
+    return records
+
+
+def _encoder(kind: str) -> Optional[Callable[[Any], Any]]:
+    if kind == "Int32":
+        return lambda value: INT32_NULL if value is None else value
+    if kind == "float64":
+        return lambda value: NAN if value is None else value
+    if kind == "datetime":
+        return lambda value: NAN if value is None else value.timestamp()
+    return None
+
+
+def _decoder(kind: str, zone: tzinfo) -> Optional[Callable[[Any], Any]]:
+    if kind == "Int32":
+        return lambda value: None if value == INT32_NULL else value
+    if kind == "float64":
+        return lambda value: None if value != value else value
+    if kind == "datetime":
+        return lambda value: (
+            None if value != value else datetime.fromtimestamp(value, zone)
+        )
+    return None
+
+
+class RecordBatch:
+    """
+    A struct-of-arrays container of typed records
+
+    Every field is stored in a column of its own rather than in an object per record. Integer, float, and datetime (as seconds since the epoch) fields are packed into array.array columns, flags stay packed as bits, and strings are kept in lists of interned strs, so a batch costs a fraction of the memory of the JSON objects it was built from and converts to a DataFrame without a per-value pass. Null integers are stored as INT32_NULL and null floats and datetimes as NaN.
+    """  # noqa: E501
+
+    def __init__(self, recordType: type[TypedRecord]) -> None:
+        """
+        Initializes the class
+
+        :param recordType: The TypedRecord class of a single item, as returned by recordType
+        :type recordType: type[TypedRecord]
+        """  # noqa: E501
+        self.recordType: type[TypedRecord] = recordType
+        self.columns: dict[str, array | list] = {}
+
+        slot: str
+        kind: str
+        for slot, kind in zip(recordType.SLOTS, recordType.KINDS):
+            if kind in ARRAY_TYPECODES:
+                self.columns[slot] = array(ARRAY_TYPECODES[kind])
+            else:
+                self.columns[slot] = []
+
+        self.errors: int = 0
+
+        self._appenders: tuple[
+            tuple[Callable[[Any], None], Optional[Callable[[Any], Any]]],
+            ...,
+        ] = tuple(
+            (self.columns[slot].append, _encoder(kind=kind))
+            for slot, kind in zip(recordType.SLOTS, recordType.KINDS)
+        )
+        zone: Optional[tzinfo] = recordType.ZONE
+        self._decoders: tuple[Optional[Callable[[Any], Any]], ...] = tuple(
+            _decoder(kind=kind, zone=zone) for kind in recordType.KINDS
+        )
+
+    @classmethod
+    def fromItems(
+        cls,
+        recordType: type[TypedRecord],
+        items: Iterable[dict],
+        strict: bool = True,
+    ) -> "RecordBatch":
+        """
+        Validate and convert the JSON objects of an API response to a batch in one pass
+
+        :param recordType: The TypedRecord class of a single item, as returned by recordType
+        :type recordType: type[TypedRecord]
+        :param items: The JSON objects
+        :type items: Iterable[dict]
+        :param strict: Raise ValueError on the first invalid item rather than skipping it and counting it in errors
+        :type strict: bool, optional
+        :return: The valid items as a batch
+        :rtype: RecordBatch
+        """  # noqa: E501
+        batch: RecordBatch = cls(recordType=recordType)
+        batch.extend(items=items, strict=strict)
+        return batch
+
+    def append(self, data: dict) -> None:
+        """
+        Validate, convert, and append a single JSON object of an API response
+
+        The batch is left unchanged if the object is invalid.
+
+        :param data: The JSON object
+        :type data: dict
+        """
+        values: tuple = self.recordType.convert(data=data)
+
+        append: Callable[[Any], None]
+        encode: Optional[Callable[[Any], Any]]
+        value: Any
+        for (append, encode), value in zip(self._appenders, values):
+            append(value if encode is None else encode(value))
+
+    def extend(self, items: Iterable[dict], strict: bool = True) -> None:
+        """
+        Validate, convert, and append the JSON objects of an API response
+
+        :param items: The JSON objects
+        :type items: Iterable[dict]
+        :param strict: Raise ValueError on the first invalid item rather than skipping it and counting it in errors
+        :type strict: bool, optional
+        """  # noqa: E501
+        item: dict
+        for item in items:
+            try:
+                self.append(data=item)
+            except ValueError:
+                self.errors += 1
+                if strict:
+                    raise
+
+    def merge(self, other: "RecordBatch") -> None:
+        """
+        Append every record of another batch of the same record type
+
+        :param other: The batch to append
+        :type other: RecordBatch
+        """
+        if other.recordType is not self.recordType:
+            raise ValueError(
+                f"cannot merge a batch of {other.recordType.__name__} into a batch of {self.recordType.__name__}"  # noqa: E501
+            )
+
+        slot: str
+        for slot in self.recordType.SLOTS:
+            self.columns[slot].extend(other.columns[slot])
+
+        self.errors += other.errors
+
+    def copy(self) -> "RecordBatch":
+        """
+        Copy the batch
+
+        :return: A batch with copies of every column
+        :rtype: RecordBatch
+        """
+        batch: RecordBatch = RecordBatch(recordType=self.recordType)
+        batch.merge(other=self)
+        return batch
+
+    def column(self, name: str) -> List[Any]:
+        """
+        Get the typed values of a single field
+
+        :param name: The name of the field
+        :type name: str
+        :return: The value of the field of every record
+        :rtype: List[Any]
+        """
+        if name in self.recordType.FLAGS:
+            mask: int = 1 << self.recordType.FLAGS.index(name)
+            return [(bits & mask) != 0 for bits in self.columns["bits"]]
+
+        decode: Optional[Callable[[Any], Any]] = self._decoders[
+            self.recordType.SLOTS.index(name)
+        ]
+        if decode is None:
+            return list(self.columns[name])
+
+        return [decode(value) for value in self.columns[name]]
+
+    def toFrame(self) -> "DataFrame":
+        """
+        Convert the batch to a typed DataFrame, importing pandas on first use
+
+        Numeric columns are copied out of their arrays in bulk rather than converted value by value.
+
+        :return: The batch as a pandas.DataFrame object with the dtypes of normalizeFrame
+        :rtype: DataFrame
+        """  # noqa: E501
+        import numpy as np
+        from pandas import Categorical, DataFrame, to_datetime
+        from pandas.arrays import IntegerArray
+
+        from cta import TIMEZONE
+
+        kinds: dict[str, str] = dict(
+            zip(self.recordType.SLOTS, self.recordType.KINDS),
+        )
+        bits: np.ndarray = np.frombuffer(
+            self.columns["bits"],
+            dtype=np.uint64,
+        ).copy()
+
+        data: dict[str, Any] = {}
+
+        name: str
+        for name in self.recordType.FIELDS:
+            if name in self.recordType.FLAGS:
+                bit: int = self.recordType.FLAGS.index(name)
+                mask: np.uint64 = np.uint64(1 << bit)
+                data[name] = (bits & mask) != 0
+                continue
+
+            kind: str = kinds[name]
+            column: array | list = self.columns[name]
+
+            if kind in ("int8", "int32", "float64"):
+                data[name] = np.frombuffer(column, dtype=kind).copy()
+            elif kind == "Int32":
+                values: np.ndarray = np.frombuffer(
+                    column,
+                    dtype=np.int32,
+                ).copy()
+                data[name] = IntegerArray(values, values == INT32_NULL)
+            elif kind == "datetime":
+                data[name] = to_datetime(
+                    np.frombuffer(column, dtype=np.float64),
+                    unit="s",
+                    utc=True,
+                ).tz_convert(TIMEZONE)
+            elif kind == "category":
+                data[name] = Categorical(column)
+            else:
+                data[name] = column
+
+        return DataFrame(data=data)
+
+    def __len__(self) -> int:
+        return len(self.columns["bits"])
+
+    def __getitem__(self, index: int) -> TypedRecord:
+        record: TypedRecord = self.recordType.__new__(self.recordType)
+
+        slot: str
+        decode: Optional[Callable[[Any], Any]]
+        for slot, decode in zip(self.recordType.SLOTS, self._decoders):
+            value: Any = self.columns[slot][index]
+            setattr(record, slot, value if decode is None else decode(value))
+
+        return record
+
+    def __iter__(self) -> Iterator[TypedRecord]:
+        index: int
+        for index in range(len(self)):
+            yield self[index]
+
+    def __repr__(self) -> str:
+        return f"RecordBatch({self.recordType.__name__}, {len(self)} records)"
+
+
+def toFrame(
+    data: Iterable[Record | dict] | RecordBatch,
+    schema: Optional[dict] = None,
+    definition: Optional[str] = None,
+) -> "DataFrame":
+    """
+    Convert records or JSON objects to a DataFrame, importing pandas on first use
+
+    :param data: Records, a RecordBatch, or the JSON objects of an API response
+    :type data: Iterable[Record | dict] | RecordBatch
+    :param schema: JSON Schema of the response, to convert the columns to the dtypes it hints at (if not specified, columns are left as received)
+    :type schema: Optional[dict], optional
+    :param definition: The name of the definition in the schema that describes a single row
+    :type definition: Optional[str], optional
+    :return: The records as a pandas.DataFrame object
+    :rtype: DataFrame
+    """  # noqa: E501
+    from pandas import DataFrame
+
+    if isinstance(data, RecordBatch):
+        return data.toFrame()
+
+    items: List[Record | dict] = list(data)
+
+    df: DataFrame
+    if (len(items) > 0) and isinstance(items[0], Record):
+        df = DataFrame(
+            data={
+                name: [getattr(item, name) for item in items]
+                for name in type(items[0]).fields()
+            }
+        )
+    else:
+        df = DataFrame.from_records(data=items)
+
+    if schema is not None:
+        from cta.normalize import normalizeFrame
+
+        df = normalizeFrame(df=df, schema=schema, definition=definition)
+
+    return df
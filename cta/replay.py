@@ -0,0 +1,1088 @@
+import gzip
+import json
+import math
+import random
+import ssl
+import time
+import zlib
+from datetime import datetime
+from hashlib import sha256
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Lock, Thread
+from typing import Any, Callable, List, Optional
+from urllib.parse import parse_qs, urlparse
+from zoneinfo import ZoneInfo
+
+from cta import TIMEZONE
+
+ARRIVALS_PATH: str = "/api/1.0/ttarrivals.aspx"
+FOLLOW_PATH: str = "/api/1.0/ttfollow.aspx"
+LOCATIONS_PATH: str = "/api/1.0/ttpositions.aspx"
+STOPS_PATH: str = "/resource/8pix-ypme.json"
+
+ENDPOINTS: dict[str, str] = {
+    ARRIVALS_PATH: "ttarrivals.json",
+    FOLLOW_PATH: "ttfollow.json",
+    LOCATIONS_PATH: "ttpositions.json",
+    STOPS_PATH: "8pix-ypme.json",
+}
+
+# Locations route name: (Arrivals route name, Stops line column, destination
+# of trDr 1, destination of trDr 5, compass bearing of trDr 1 in degrees)
+LINES: dict[str, tuple[str, str, str, str, int]] = {
+    "red": ("Red", "red", "Howard", "95th/Dan Ryan", 0),
+    "blue": ("Blue", "blue", "O'Hare", "Forest Park", 300),
+    "org": ("Org", "o", "UIC-Halsted", "UIC-Halsted", 45),
+}
+
+# The only route FOLLOWTHISTRAIN_SCHEMA admits
+FOLLOW_LINE: tuple[str, str, str, str, int] = (
+    "Pink Line",
+    "pnk",
+    "Loop",
+    "54th/Cermak",
+    90,
+)
+
+ORIGIN: tuple[float, float] = (41.8786, -87.6298)
+TMST_FORMAT: str = "%Y-%m-%dT%H:%M:%S"
+
+
+def scalePayload(data: Any, scale: int) -> Any:
+    """
+    Grow a recorded response by repeating its records
+
+    :param data: A recorded JSON response
+    :type data: Any
+    :param scale: The number of times to repeat each list of records
+    :type scale: int
+    :return: The scaled JSON response
+    :rtype: Any
+    """
+    if isinstance(data, list):
+        return data * scale
+
+    ctatt: dict = data["ctatt"]
+
+    if "eta" in ctatt:
+        ctatt["eta"] = ctatt["eta"] * scale
+
+    route: dict
+    for route in ctatt.get("route", []):
+        route["train"] = route["train"] * scale
+
+    return data
+
+
+def parseWhere(where: str) -> Callable[[dict], bool]:
+    """
+    Parse the subset of a SoQL $where filter the replay server understands: column = value comparisons joined by AND
+
+    :param where: A SoQL filter (e.g. "red = true AND ada = true")
+    :type where: str
+    :return: A function that tests whether a stop matches the filter
+    :rtype: Callable[[dict], bool]
+    :raises ValueError: If the filter is not column = value comparisons joined by AND
+    """  # noqa: E501
+    clauses: List[tuple[str, Any]] = []
+
+    clause: str
+    for clause in where.replace(" and ", " AND ").split(" AND "):
+        column: str
+        sep: str
+        value: str
+        column, sep, value = (part.strip() for part in clause.partition("="))
+        if (sep != "=") or (column == "") or (value == ""):
+            raise ValueError(f"unsupported $where clause: {clause!r}")
+
+        if value.lower() in ("true", "false"):
+            clauses.append((column, value.lower() == "true"))
+        else:
+            clauses.append((column, value.strip("'")))
+
+    return lambda stop: all(
+        (
+            stop.get(column) == value
+            if isinstance(value, bool)
+            else str(stop.get(column)) == value
+        )
+        for column, value in clauses
+    )
+
+
+def selectColumns(rows: List[dict], select: str) -> List[dict]:
+    """
+    Apply a SoQL $select to rows, keeping only the listed columns
+
+    :param rows: The rows to select from
+    :type rows: List[dict]
+    :param select: A comma separated list of columns (e.g. "stop_id,ada")
+    :type select: str
+    :return: The rows, with only the listed columns they have
+    :rtype: List[dict]
+    """
+    columns: List[str] = [column.strip() for column in select.split(",")]
+    selected: List[dict] = []
+
+    row: dict
+    for row in rows:
+        values: dict = {}
+
+        column: str
+        for column in columns:
+            if column in row:
+                values[column] = row[column]
+
+        selected.append(values)
+
+    return selected
+
+
+class Network:
+    """
+    A synthesized L network whose trains run back and forth along straight lines at a constant speed
+
+    Each line has stationsPerLine stations segmentSeconds apart and trainsPerDirection evenly spaced trains in each direction. Run numbers are 100 per line (101 and up on the first line). Every response it builds is valid against the schemas of the API classes.
+    """  # noqa: E501
+
+    def __init__(
+        self,
+        stationsPerLine: int = 20,
+        segmentSeconds: float = 120,
+        trainsPerDirection: int = 6,
+        delayRate: float = 0.05,
+        horizon: float = 1800,
+    ) -> None:
+        """
+        Initializes the class
+
+        :param stationsPerLine: The number of stations on each line
+        :type stationsPerLine: int, optional
+        :param segmentSeconds: The number of seconds a train takes between stations
+        :type segmentSeconds: float, optional
+        :param trainsPerDirection: The number of trains running in each direction of each line
+        :type trainsPerDirection: int, optional
+        :param delayRate: The fraction of trains reported as delayed at any time
+        :type delayRate: float, optional
+        :param horizon: The number of seconds ahead that arrivals are predicted
+        :type horizon: float, optional
+        """  # noqa: E501
+        self.stationsPerLine: int = stationsPerLine
+        self.segmentSeconds: float = segmentSeconds
+        self.trainsPerDirection: int = trainsPerDirection
+        self.delayRate: float = delayRate
+        self.horizon: float = horizon
+
+        self.lines: dict[str, tuple[str, str, str, str, int]] = {
+            **LINES,
+            "pink": FOLLOW_LINE,
+        }
+
+        self.stations: dict[str, List[dict]] = {}
+        self.byMapid: dict[int, tuple[str, int]] = {}
+        self.byStpid: dict[int, tuple[str, int, str]] = {}
+
+        index: int = 0
+
+        name: str
+        line: tuple[str, str, str, str, int]
+        for name, line in self.lines.items():
+            bearing: float = math.radians(line[4])
+            stations: List[dict] = []
+
+            k: int
+            for k in range(stationsPerLine):
+                offset: float = 0.02 * (k - stationsPerLine / 2)
+                station: dict = {
+                    "staId": 40000 + 10 * index,
+                    "stpIds": {"1": 30000 + 2 * index, "5": 30001 + 2 * index},
+                    "staNm": f"Station {index}",
+                    "lat": ORIGIN[0] + offset * math.cos(bearing),
+                    "lon": ORIGIN[1] + offset * math.sin(bearing),
+                }
+                stations.append(station)
+
+                self.byMapid[station["staId"]] = (name, k)
+                self.byStpid[station["stpIds"]["1"]] = (name, k, "1")
+                self.byStpid[station["stpIds"]["5"]] = (name, k, "5")
+                index += 1
+
+            self.stations[name] = stations
+
+    def runs(self, name: str) -> List[tuple[int, str, int]]:
+        """
+        Get every run of a line
+
+        :param name: The Locations route name of the line
+        :type name: str
+        :return: The run number, direction (trDr), and index of each train within its direction
+        :rtype: List[tuple[int, str, int]]
+        """  # noqa: E501
+        base: int = 100 * (list(self.lines).index(name) + 1)
+
+        return [
+            (base + 1 + 2 * j + (0 if trDr == "1" else 1), trDr, j)
+            for j in range(self.trainsPerDirection)
+            for trDr in ("1", "5")
+        ]
+
+    def position(self, trDr: str, j: int, now: float) -> float:
+        """
+        Get how far along its line a train is
+
+        :param trDr: The direction of the train
+        :type trDr: str
+        :param j: The index of the train within its direction
+        :type j: int
+        :param now: The simulated UNIX time
+        :type now: float
+        :return: The fractional index of the station the train is at, counted from the first station of the line
+        :rtype: float
+        """  # noqa: E501
+        span: int = self.stationsPerLine - 1
+        phase: float = (
+            now / self.segmentSeconds + j * span / self.trainsPerDirection
+        ) % span
+        return phase if trDr == "1" else span - phase
+
+    def secondsTo(self, trDr: str, position: float, k: int) -> float:
+        """
+        Get the number of seconds until a train reaches a station
+
+        :param trDr: The direction of the train
+        :type trDr: str
+        :param position: The position of the train from Network.position
+        :type position: float
+        :param k: The index of the station on the line
+        :type k: int
+        :return: The number of seconds until the train arrives
+        :rtype: float
+        """
+        span: int = self.stationsPerLine - 1
+        distance: float = (k - position) if trDr == "1" else (position - k)
+        return (distance % span) * self.segmentSeconds
+
+    def delayed(self, rn: int, now: float) -> bool:
+        """
+        Check whether a run is delayed, which changes every ten simulated minutes
+
+        :param rn: The run number
+        :type rn: int
+        :param now: The simulated UNIX time
+        :type now: float
+        :return: True if the run is delayed
+        :rtype: bool
+        """  # noqa: E501
+        draw: int = zlib.crc32(f"{rn}:{int(now // 600)}".encode())
+        return draw / 0xFFFFFFFF < self.delayRate
+
+    def coordinates(
+        self,
+        name: str,
+        trDr: str,
+        position: float,
+    ) -> tuple[float, float, int]:
+        """
+        Get the latitude, longitude, and heading of a train
+
+        :param name: The Locations route name of the line
+        :type name: str
+        :param trDr: The direction of the train
+        :type trDr: str
+        :param position: The position of the train from Network.position
+        :type position: float
+        :return: The latitude, longitude, and heading in degrees
+        :rtype: tuple[float, float, int]
+        """
+        stations: List[dict] = self.stations[name]
+        k: int = min(int(position), self.stationsPerLine - 2)
+        fraction: float = position - k
+
+        lat: float = stations[k]["lat"] + fraction * (
+            stations[k + 1]["lat"] - stations[k]["lat"]
+        )
+        lon: float = stations[k]["lon"] + fraction * (
+            stations[k + 1]["lon"] - stations[k]["lon"]
+        )
+        bearing: int = self.lines[name][4] + (0 if trDr == "1" else 180)
+        heading: int = bearing % 360
+
+        return lat, lon, heading
+
+    def arrivals(
+        self,
+        now: float,
+        mapid: Optional[int],
+        stpid: Optional[int],
+        max: Optional[int],
+        rt: Optional[str],
+    ) -> List[dict]:
+        """
+        Build the eta list of a ttarrivals.aspx response
+
+        :param now: The simulated UNIX time
+        :type now: float
+        :param mapid: The station to predict arrivals at
+        :type mapid: Optional[int]
+        :param stpid: The stop to predict arrivals at
+        :type stpid: Optional[int]
+        :param max: The maximum number of predictions
+        :type max: Optional[int]
+        :param rt: The route to filter predictions by
+        :type rt: Optional[str]
+        :return: The predictions, soonest first
+        :rtype: List[dict]
+        """
+        located: Optional[tuple] = self.byMapid.get(mapid)
+        if stpid is not None:
+            located = self.byStpid.get(stpid)
+        if located is None:
+            return []
+
+        name: str = located[0]
+        k: int = located[1]
+        line: tuple[str, str, str, str, int] = self.lines[name]
+        if (rt is not None) and (rt.lower() not in (name, line[0].lower())):
+            return []
+
+        station: dict = self.stations[name][k]
+        tmst: str = formatTime(now)
+        etas: List[tuple[float, dict]] = []
+
+        rn: int
+        trDr: str
+        j: int
+        for rn, trDr, j in self.runs(name=name):
+            if (len(located) == 3) and (located[2] != trDr):
+                continue
+
+            position: float = self.position(trDr=trDr, j=j, now=now)
+            seconds: float = self.secondsTo(trDr=trDr, position=position, k=k)
+            if seconds > self.horizon:
+                continue
+
+            lat: float
+            lon: float
+            heading: int
+            lat, lon, heading = self.coordinates(
+                name=name,
+                trDr=trDr,
+                position=position,
+            )
+            destNm: str = line[2] if trDr == "1" else line[3]
+
+            etas.append(
+                (
+                    seconds,
+                    {
+                        "staId": str(station["staId"]),
+                        "stpId": str(station["stpIds"][trDr]),
+                        "staNm": station["staNm"],
+                        "stpDe": f"Service toward {destNm}",
+                        "rn": str(rn),
+                        "rt": line[0],
+                        "destSt": str(self.terminal(name=name, trDr=trDr)),
+                        "destNm": destNm,
+                        "trDr": trDr,
+                        "prdt": tmst,
+                        "arrT": formatTime(now + seconds),
+                        "isApp": "1" if seconds <= 60 else "0",
+                        "isSch": "0",
+                        "isDly": "1" if self.delayed(rn=rn, now=now) else "0",
+                        "isFlt": "0",
+                        "flags": None,
+                        "lat": f"{lat:.5f}",
+                        "lon": f"{lon:.5f}",
+                        "heading": str(heading),
+                    },
+                )
+            )
+
+        etas.sort(key=lambda pair: pair[0])
+        return [eta for _, eta in etas][slice(0, max)]
+
+    def terminal(self, name: str, trDr: str) -> int:
+        """
+        Get the stop a train terminates at
+
+        :param name: The Locations route name of the line
+        :type name: str
+        :param trDr: The direction of the train
+        :type trDr: str
+        :return: The stop id of the last station in the train's direction
+        :rtype: int
+        """
+        stations: List[dict] = self.stations[name]
+        return (stations[-1] if trDr == "1" else stations[0])["stpIds"][trDr]
+
+    def locations(self, now: float, rt: List[str]) -> List[dict]:
+        """
+        Build the route list of a ttpositions.aspx response
+
+        :param now: The simulated UNIX time
+        :type now: float
+        :param rt: The routes to locate trains on
+        :type rt: List[str]
+        :return: A route object per requested route, with no trains if the route is not simulated
+        :rtype: List[dict]
+        """  # noqa: E501
+        tmst: str = formatTime(now)
+        routes: List[dict] = []
+
+        name: str
+        for name in rt:
+            trains: List[dict] = []
+
+            if name in LINES:
+                line: tuple[str, str, str, str, int] = self.lines[name]
+
+                rn: int
+                trDr: str
+                j: int
+                for rn, trDr, j in self.runs(name=name):
+                    position: float = self.position(trDr=trDr, j=j, now=now)
+                    k: int = (
+                        min(int(position) + 1, self.stationsPerLine - 1)
+                        if trDr == "1"
+                        else max(math.ceil(position) - 1, 0)
+                    )
+                    seconds: float = self.secondsTo(
+                        trDr=trDr,
+                        position=position,
+                        k=k,
+                    )
+                    station: dict = self.stations[name][k]
+
+                    lat: float
+                    lon: float
+                    heading: int
+                    lat, lon, heading = self.coordinates(
+                        name=name,
+                        trDr=trDr,
+                        position=position,
+                    )
+
+                    isDly: str = "1" if self.delayed(rn=rn, now=now) else "0"
+
+                    trains.append(
+                        {
+                            "rn": str(rn),
+                            "destSt": str(self.terminal(name=name, trDr=trDr)),
+                            "destNm": line[2] if trDr == "1" else line[3],
+                            "trDr": trDr,
+                            "nextStaId": str(station["staId"]),
+                            "nextStpId": str(station["stpIds"][trDr]),
+                            "nextStaNm": station["staNm"],
+                            "prdt": tmst,
+                            "arrT": formatTime(now + seconds),
+                            "isApp": "1" if seconds <= 60 else "0",
+                            "isDly": isDly,
+                            "flags": None,
+                            "lat": f"{lat:.5f}",
+                            "lon": f"{lon:.5f}",
+                            "heading": str(heading),
+                        }
+                    )
+
+            routes.append({"@name": name, "train": trains})
+
+        return routes
+
+    def follow(self, now: float, runnumber: int) -> dict:
+        """
+        Build the ctatt object of a ttfollow.aspx response
+
+        Every run number is followed along the Pink Line, the only route FOLLOWTHISTRAIN_SCHEMA admits: odd run numbers toward the Loop and even run numbers toward 54th/Cermak.
+
+        :param now: The simulated UNIX time
+        :type now: float
+        :param runnumber: The run number to follow
+        :type runnumber: int
+        :return: The position of the train and its next ten predicted arrivals
+        :rtype: dict
+        """  # noqa: E501
+        trDr: str = "1" if runnumber % 2 == 1 else "5"
+        j: int = (runnumber // 2) % self.trainsPerDirection
+        position: float = self.position(trDr=trDr, j=j, now=now)
+
+        lat: float
+        lon: float
+        heading: int
+        lat, lon, heading = self.coordinates(
+            name="pink",
+            trDr=trDr,
+            position=position,
+        )
+
+        stations: List[dict] = self.stations["pink"]
+        order: List[int] = (
+            list(range(math.ceil(position), self.stationsPerLine))
+            if trDr == "1"
+            else list(range(int(position), -1, -1))
+        )
+        tmst: str = formatTime(now)
+        destNm: str = FOLLOW_LINE[2] if trDr == "1" else FOLLOW_LINE[3]
+        isDly: str = "1" if self.delayed(rn=runnumber, now=now) else "0"
+
+        return {
+            "tmst": tmst,
+            "errCd": "0",
+            "errNm": None,
+            "position": {
+                "lat": f"{lat:.5f}",
+                "lon": f"{lon:.5f}",
+                "heading": str(heading),
+            },
+            "eta": [
+                {
+                    "staId": str(stations[k]["staId"]),
+                    "stpId": str(stations[k]["stpIds"][trDr]),
+                    "staNm": stations[k]["staNm"],
+                    "stpDe": f"Service toward {destNm}",
+                    "rn": str(runnumber),
+                    "rt": FOLLOW_LINE[0],
+                    "destSt": str(self.terminal(name="pink", trDr=trDr)),
+                    "destNm": destNm,
+                    "trDr": trDr,
+                    "prdt": tmst,
+                    "arrT": formatTime(
+                        now + self.secondsTo(trDr=trDr, position=position, k=k)
+                    ),
+                    "isApp": "1" if abs(k - position) < 0.5 else "0",
+                    "isSch": "0",
+                    "isDly": isDly,
+                    "isFlt": "0",
+                    "flags": None,
+                }
+                for k in order[slice(0, 10)]
+            ],
+        }
+
+    def stops(self) -> List[dict]:
+        """
+        Build the rows of the 8pix-ypme.json dataset
+
+        :return: Two stops (one per direction) for every station
+        :rtype: List[dict]
+        """
+        rows: List[dict] = []
+
+        name: str
+        line: tuple[str, str, str, str, int]
+        for name, line in self.lines.items():
+            station: dict
+            for station in self.stations[name]:
+                trDr: str
+                for trDr in ("1", "5"):
+                    destNm: str = line[2] if trDr == "1" else line[3]
+                    row: dict = {
+                        "stop_id": str(station["stpIds"][trDr]),
+                        "direction_id": "N" if trDr == "1" else "S",
+                        "stop_name": f"{station['staNm']} ({destNm}-bound)",
+                        "station_name": station["staNm"],
+                        "station_descriptive_name": f"{station['staNm']} ({line[0].split()[0]} Line)",  # noqa: E501
+                        "map_id": str(station["staId"]),
+                        "ada": station["staId"] % 20 == 0,
+                    }
+                    row.update(
+                        {
+                            column: column == line[1]
+                            for column in (
+                                "red",
+                                "blue",
+                                "g",
+                                "brn",
+                                "p",
+                                "pexp",
+                                "y",
+                                "pnk",
+                                "o",
+                            )
+                        }
+                    )
+                    row["location"] = {
+                        "latitude": f"{station['lat']:.6f}",
+                        "longitude": f"{station['lon']:.6f}",
+                        "human_address": json.dumps(
+                            {"address": "", "city": "", "state": "", "zip": ""}
+                        ),
+                    }
+                    rows.append(row)
+
+        return rows
+
+
+def formatTime(timestamp: float) -> str:
+    """
+    Format a UNIX timestamp the way Train Tracker does, as Chicago local time
+
+    :param timestamp: A UNIX timestamp
+    :type timestamp: float
+    :return: The timestamp as YYYY-MM-DDTHH:MM:SS
+    :rtype: str
+    """
+    return datetime.fromtimestamp(timestamp, tz=ZoneInfo(TIMEZONE)).strftime(
+        TMST_FORMAT
+    )
+
+
+class ReplayServer:
+    """
+    A local stand-in for the CTA Train Tracker and City of Chicago data portal servers for benchmarks and load tests
+
+    By default responses are synthesized from a simulated Network and honour the query parameters of each endpoint. If recordings is given, the recorded responses in it are replayed instead, ignoring query parameters: a file per endpoint (e.g. ttarrivals.json) is replayed as is, and a directory per endpoint (e.g. ttarrivals/) replays its files in name order, frameInterval simulated seconds apart.
+
+    The simulated clock runs speed times faster than real time, so consumers can poll at 10 to 100 times the real rate and still see new data. Requests beyond rateLimit a second are answered with 429 Too Many Requests; every other request waits latency seconds, plus up to jitter seconds, plus tailLatency seconds for tailRate of requests, and then errorRate of requests are answered with errorStatus and dropRate have their connection closed without a response. Every setting can be changed while the server is running.
+
+    Responses carry an ETag, are answered with 304 Not Modified when it matches If-None-Match, and are gzip compressed when the client accepts it. Point an API class at the server by replacing the scheme and host of its endpointBase with ReplayServer.url.
+    """  # noqa: E501
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        recordings: Optional[str | Path] = None,
+        network: Optional[Network] = None,
+        speed: float = 1,
+        start: Optional[float] = None,
+        frameInterval: float = 30,
+        scale: int = 1,
+        latency: float = 0,
+        jitter: float = 0,
+        tailRate: float = 0,
+        tailLatency: float = 0,
+        errorRate: float = 0,
+        errorStatus: int = 503,
+        dropRate: float = 0,
+        rateLimit: Optional[float] = None,
+        seed: Optional[int] = None,
+        certfile: Optional[str] = None,
+        keyfile: Optional[str] = None,
+    ) -> None:
+        """
+        Initializes the class
+
+        :param host: The address to listen on
+        :type host: str, optional
+        :param port: The port to listen on (if 0, a free port is chosen)
+        :type port: int, optional
+        :param recordings: A directory of recorded responses to replay (if not specified, responses are synthesized)
+        :type recordings: Optional[str | Path], optional
+        :param network: The network to synthesize responses from (if not specified, a Network with the default settings is used)
+        :type network: Optional[Network], optional
+        :param speed: The number of simulated seconds that pass every real second
+        :type speed: float, optional
+        :param start: The simulated UNIX time when the server starts (if not specified, the current time)
+        :type start: Optional[float], optional
+        :param frameInterval: The number of simulated seconds between recorded frames
+        :type frameInterval: float, optional
+        :param scale: The number of times to repeat the records of each recorded response
+        :type scale: int, optional
+        :param latency: The number of seconds to wait before sending each response
+        :type latency: float, optional
+        :param jitter: The maximum number of random seconds added to latency
+        :type jitter: float, optional
+        :param tailRate: The fraction of requests that wait an extra tailLatency seconds
+        :type tailRate: float, optional
+        :param tailLatency: The number of seconds slow requests wait
+        :type tailLatency: float, optional
+        :param errorRate: The fraction of requests answered with errorStatus
+        :type errorRate: float, optional
+        :param errorStatus: The HTTP status code of injected errors
+        :type errorStatus: int, optional
+        :param dropRate: The fraction of requests whose connection is closed without a response
+        :type dropRate: float, optional
+        :param rateLimit: The maximum number of requests a second to serve, in bursts of up to rateLimit requests but at least one (if not specified, requests are not limited)
+        :type rateLimit: Optional[float], optional
+        :param seed: The seed of the random number generator that injects latency and errors
+        :type seed: Optional[int], optional
+        :param certfile: A PEM certificate to serve HTTPS with (if not specified, HTTP is served)
+        :type certfile: Optional[str], optional
+        :param keyfile: The private key of the certificate
+        :type keyfile: Optional[str], optional
+        """  # noqa: E501
+        self.network: Network = Network() if network is None else network
+        self.speed: float = speed
+        self.frameInterval: float = frameInterval
+        self.latency: float = latency
+        self.jitter: float = jitter
+        self.tailRate: float = tailRate
+        self.tailLatency: float = tailLatency
+        self.errorRate: float = errorRate
+        self.errorStatus: int = errorStatus
+        self.dropRate: float = dropRate
+        self.rateLimit: Optional[float] = rateLimit
+
+        self.lock: Lock = Lock()
+        self.random: random.Random = random.Random(seed)
+        self.epoch: float = time.time() if start is None else start
+        self.started: float = time.perf_counter()
+        self.tokens: float = 0 if rateLimit is None else max(1, rateLimit)
+        self.refilled: float = self.started
+
+        self.frames: dict[str, List[tuple[bytes, bytes, str]]] = {}
+        if recordings is not None:
+            self.load(directory=Path(recordings), scale=scale)
+
+        self.stopsBody: tuple[bytes, bytes, str] = encode(
+            body=json.dumps(self.network.stops()).encode()
+        )
+
+        self.requests: int = 0
+        self.served: int = 0
+        self.notModified: int = 0
+        self.throttled: int = 0
+        self.errors: int = 0
+        self.dropped: int = 0
+
+        self.server: ThreadingHTTPServer = ThreadingHTTPServer(
+            (host, port),
+            self._handler(),
+        )
+        self.server.daemon_threads = True
+
+        self.scheme: str = "http"
+        if certfile is not None:
+            context: ssl.SSLContext = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(certfile=certfile, keyfile=keyfile)
+            self.server.socket = context.wrap_socket(
+                self.server.socket,
+                server_side=True,
+            )
+            self.scheme = "https"
+
+        self.thread: Optional[Thread] = None
+
+    def __enter__(self) -> "ReplayServer":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        """
+        The base URL of the server
+
+        :return: The scheme, host, and port of the server
+        :rtype: str
+        """
+        host: str
+        port: int
+        host, port = self.server.server_address[:2]
+        return f"{self.scheme}://{host}:{port}"
+
+    def load(self, directory: Path, scale: int = 1) -> None:
+        """
+        Load recorded responses to replay
+
+        :param directory: A directory with a file (e.g. ttarrivals.json) or a directory of files (e.g. ttarrivals/) per endpoint
+        :type directory: Path
+        :param scale: The number of times to repeat the records of each recorded response
+        :type scale: int, optional
+        """  # noqa: E501
+        path: str
+        fixture: str
+        for path, fixture in ENDPOINTS.items():
+            files: List[Path] = (
+                sorted((directory / Path(fixture).stem).glob("*.json"))
+                if (directory / Path(fixture).stem).is_dir()
+                else [directory / fixture]
+            )
+
+            frames: List[tuple[bytes, bytes, str]] = []
+
+            file: Path
+            for file in files:
+                if file.exists() is False:
+                    continue
+
+                with open(file, "r", encoding="utf-8") as handle:
+                    data: Any = scalePayload(
+                        data=json.load(handle),
+                        scale=scale,
+                    )
+                frames.append(encode(body=json.dumps(data).encode()))
+
+            if len(frames) > 0:
+                self.frames[path] = frames
+
+    def now(self) -> float:
+        """
+        Get the simulated time
+
+        :return: The simulated UNIX time
+        :rtype: float
+        """
+        return self.epoch + (time.perf_counter() - self.started) * self.speed
+
+    def respond(
+        self,
+        path: str,
+        query: str,
+    ) -> Optional[tuple[bytes, bytes, str]]:
+        """
+        Build the body of the response to a query
+
+        :param path: The path of the query
+        :type path: str
+        :param query: The query string of the query
+        :type query: str
+        :return: The body, compressed body, and ETag from encode, or None if the path is not an endpoint
+        :rtype: Optional[tuple[bytes, bytes, str]]
+        :raises ValueError: If a Stops $where filter cannot be parsed
+        """  # noqa: E501
+        if path in self.frames:
+            frames: List[tuple[bytes, bytes, str]] = self.frames[path]
+            frame: int = int((self.now() - self.epoch) / self.frameInterval)
+            index: int = frame % len(frames)
+            return frames[index]
+
+        params: dict[str, List[str]] = parse_qs(query)
+        now: float = self.now()
+
+        def param(name: str) -> Optional[str]:
+            return params[name][0] if name in params else None
+
+        def integer(name: str) -> Optional[int]:
+            value: Optional[str] = param(name)
+            return None if value is None else int(value)
+
+        data: Any
+        if path == ARRIVALS_PATH:
+            data = {
+                "ctatt": {
+                    "tmst": formatTime(now),
+                    "errCd": "0",
+                    "errNm": None,
+                    "eta": self.network.arrivals(
+                        now=now,
+                        mapid=integer("mapid"),
+                        stpid=integer("stpid"),
+                        max=integer("max"),
+                        rt=param("rt"),
+                    ),
+                }
+            }
+        elif path == LOCATIONS_PATH:
+            data = {
+                "ctatt": {
+                    "tmst": formatTime(now),
+                    "errCd": "0",
+                    "errNm": None,
+                    "route": self.network.locations(
+                        now=now,
+                        rt=[
+                            name.strip().lower()
+                            for value in params.get("rt", [])
+                            for name in value.split(",")
+                            if name.strip() != ""
+                        ],
+                    ),
+                }
+            }
+        elif path == FOLLOW_PATH:
+            data = {
+                "ctatt": self.network.follow(
+                    now=now,
+                    runnumber=integer("runnumber") or 0,
+                )
+            }
+        elif path == STOPS_PATH:
+            if ("$select" not in params) and ("$where" not in params):
+                return self.stopsBody
+
+            rows: List[dict] = self.network.stops()
+            if "$where" in params:
+                rows = list(filter(parseWhere(param("$where")), rows))
+            if "$select" in params:
+                rows = selectColumns(rows=rows, select=param("$select"))
+            data = rows
+        else:
+            return None
+
+        return encode(body=json.dumps(data).encode(), compress=False)
+
+    def admit(self) -> bool:
+        """
+        Take a token from the rate limit's bucket
+
+        :return: True if the request may be served
+        :rtype: bool
+        """
+        with self.lock:
+            self.requests += 1
+
+            if self.rateLimit is None:
+                return True
+
+            now: float = time.perf_counter()
+            self.tokens = min(
+                max(1, self.rateLimit),
+                self.tokens + (now - self.refilled) * self.rateLimit,
+            )
+            self.refilled = now
+
+            if self.tokens < 1:
+                self.throttled += 1
+                return False
+
+            self.tokens -= 1
+            return True
+
+    def inject(self) -> tuple[float, Optional[str]]:
+        """
+        Draw the latency and injected failure of a request
+
+        :return: The number of seconds to wait, and "error", "drop", or None
+        :rtype: tuple[float, Optional[str]]
+        """
+        with self.lock:
+            delay: float = self.latency
+            if self.jitter > 0:
+                delay += self.random.uniform(0, self.jitter)
+            if self.random.random() < self.tailRate:
+                delay += self.tailLatency
+
+            draw: float = self.random.random()
+            if draw < self.dropRate:
+                self.dropped += 1
+                return delay, "drop"
+            if draw < self.dropRate + self.errorRate:
+                self.errors += 1
+                return delay, "error"
+
+            return delay, None
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Report the request counters and simulated time
+
+        :return: The number of requests received, served, answered with 304 Not Modified, throttled, answered with an injected error, and dropped, and the simulated time
+        :rtype: dict[str, Any]
+        """  # noqa: E501
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "served": self.served,
+                "notModified": self.notModified,
+                "throttled": self.throttled,
+                "errors": self.errors,
+                "dropped": self.dropped,
+                "time": formatTime(self.now()),
+            }
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        replay: ReplayServer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version: str = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                if replay.admit() is False:
+                    self.send_response(429)
+                    self.send_header("Retry-After", "1")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                delay: float
+                failure: Optional[str]
+                delay, failure = replay.inject()
+                if delay > 0:
+                    time.sleep(delay)
+
+                if failure == "drop":
+                    self.close_connection = True
+                    return
+
+                if failure == "error":
+                    self.send_error(replay.errorStatus)
+                    return
+
+                url: Any = urlparse(self.path)
+                response: Optional[tuple[bytes, bytes, str]]
+                try:
+                    response = replay.respond(path=url.path, query=url.query)
+                except ValueError as error:
+                    self.send_error(400, explain=str(error))
+                    return
+
+                if response is None:
+                    self.send_error(404)
+                    return
+
+                body: bytes
+                compressed: bytes
+                etag: str
+                body, compressed, etag = response
+
+                with replay.lock:
+                    replay.served += 1
+
+                if self.headers.get("If-None-Match") == etag:
+                    with replay.lock:
+                        replay.notModified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("ETag", etag)
+                if "gzip" in self.headers.get("Accept-Encoding", ""):
+                    body = compressed or gzip.compress(body, compresslevel=1)
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+    def start(self) -> None:
+        """
+        Serve requests on a background thread
+        """
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def serve(self) -> None:
+        """
+        Serve requests on the calling thread until interrupted
+        """
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+
+    def stop(self) -> None:
+        """
+        Stop serving requests and close the listening socket
+        """
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def encode(body: bytes, compress: bool = True) -> tuple[bytes, bytes, str]:
+    """
+    Prepare a response body to be served
+
+    :param body: The JSON body
+    :type body: bytes
+    :param compress: Compress the body ahead of time
+    :type compress: bool, optional
+    :return: The body, its gzip compressed form (empty if not compress), and its ETag
+    :rtype: tuple[bytes, bytes, str]
+    """  # noqa: E501
+    return (
+        body,
+        gzip.compress(body) if compress else b"",
+        '"' + sha256(body).hexdigest()[:32] + '"',
+    )
@@ -0,0 +1,457 @@
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextvars import copy_context
+from threading import Lock
+from typing import Any, Callable, Optional
+from urllib.parse import urlsplit
+
+CLOSED: str = "closed"
+OPEN: str = "open"
+HALF_OPEN: str = "half-open"
+
+DEFAULT_TIMEOUT: tuple[float, float] = (3.05, 10)
+
+
+class CircuitOpen(ConnectionError):
+    """
+    Raised instead of sending a request to an endpoint whose circuit breaker is open
+    """  # noqa: E501
+
+
+def endpointKey(url: str) -> str:
+    """
+    Get the endpoint a URL belongs to, ignoring its query
+
+    :param url: A URL
+    :type url: str
+    :return: The host and path of the URL
+    :rtype: str
+    """
+    parts: Any = urlsplit(url)
+    return f"{parts.netloc}{parts.path}"
+
+
+class CircuitBreaker:
+    """
+    Track the failures of a single endpoint and stop sending it requests while it is failing
+
+    After failureThreshold consecutive failures the breaker opens, and requests fail immediately with CircuitOpen for resetTimeout seconds. The breaker then lets a single trial request through (half-open): if it succeeds the breaker closes, otherwise it opens again.
+    """  # noqa: E501
+
+    def __init__(
+        self,
+        failureThreshold: int = 5,
+        resetTimeout: float = 30,
+    ) -> None:
+        """
+        Initializes the class
+
+        :param failureThreshold: The number of consecutive failures that open the breaker
+        :type failureThreshold: int, optional
+        :param resetTimeout: The number of seconds the breaker stays open before a trial request is let through
+        :type resetTimeout: float, optional
+        """  # noqa: E501
+        self.failureThreshold: int = failureThreshold
+        self.resetTimeout: float = resetTimeout
+
+        self.lock: Lock = Lock()
+        self.state: str = CLOSED
+        self.failures: int = 0
+        self.openedAt: float = 0
+        self.trial: bool = False
+
+        self.opened: int = 0
+        self.rejected: int = 0
+
+    def allow(self) -> bool:
+        """
+        Check whether a request may be sent, claiming the trial request if the breaker is half-open
+
+        :return: True if the request may be sent
+        :rtype: bool
+        """  # noqa: E501
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+
+            if (self.state == OPEN) and (
+                time.monotonic() - self.openedAt >= self.resetTimeout
+            ):
+                self.state = HALF_OPEN
+                self.trial = False
+
+            if (self.state == HALF_OPEN) and (self.trial is False):
+                self.trial = True
+                return True
+
+            self.rejected += 1
+            return False
+
+    def success(self) -> None:
+        """
+        Record a successful request, closing the breaker
+        """
+        with self.lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.trial = False
+
+    def failure(self) -> None:
+        """
+        Record a failed request, opening the breaker if it was half-open or has failed failureThreshold times in a row
+        """  # noqa: E501
+        with self.lock:
+            self.failures += 1
+
+            tripped: bool = self.failures >= self.failureThreshold
+            if (self.state == HALF_OPEN) or tripped:
+                if self.state != OPEN:
+                    self.opened += 1
+                self.state = OPEN
+                self.openedAt = time.monotonic()
+                self.trial = False
+
+
+class ResiliencePolicy:
+    """
+    Bound the latency of requests to slow or failing endpoints
+
+    Requests are sent with a separate connect and read timeout per endpoint. The latencies of the last window requests to each endpoint are tracked, and a request that has not completed after the hedgeQuantile latency of its endpoint is hedged: a second, identical request is sent and whichever response arrives first is used. At most hedgeRatio of requests are hedged, so a degraded endpoint is not sent twice the traffic. Every endpoint has a CircuitBreaker, and 5xx responses and failed requests count as failures.
+
+    When a query fails, or its endpoint's breaker is open, API classes serve the last good response to the same URL instead and set their stale attribute, if serveStale is set.
+    """  # noqa: E501
+
+    def __init__(
+        self,
+        timeouts: Optional[dict[str, tuple[float, float]]] = None,
+        defaultTimeout: tuple[float, float] = DEFAULT_TIMEOUT,
+        hedgeQuantile: Optional[float] = 0.95,
+        hedgeRatio: float = 0.05,
+        minHedgeDelay: float = 0.05,
+        window: int = 200,
+        minSamples: int = 20,
+        failureThreshold: int = 5,
+        resetTimeout: float = 30,
+        serveStale: bool = True,
+        workers: int = 16,
+    ) -> None:
+        """
+        Initializes the class
+
+        :param timeouts: The (connect, read) timeout in seconds of each endpoint, keyed on the end of its path (e.g. ttarrivals.aspx) or on its host
+        :type timeouts: Optional[dict[str, tuple[float, float]]], optional
+        :param defaultTimeout: The (connect, read) timeout in seconds of endpoints without one of their own
+        :type defaultTimeout: tuple[float, float], optional
+        :param hedgeQuantile: The quantile of an endpoint's recent latencies after which a request is hedged (if None, requests are never hedged)
+        :type hedgeQuantile: Optional[float], optional
+        :param hedgeRatio: The maximum fraction of requests that may be hedged
+        :type hedgeRatio: float, optional
+        :param minHedgeDelay: The minimum number of seconds to wait before hedging a request
+        :type minHedgeDelay: float, optional
+        :param window: The number of recent latencies kept per endpoint
+        :type window: int, optional
+        :param minSamples: The number of latencies an endpoint needs before its requests are hedged
+        :type minSamples: int, optional
+        :param failureThreshold: The number of consecutive failures that open an endpoint's circuit breaker
+        :type failureThreshold: int, optional
+        :param resetTimeout: The number of seconds a circuit breaker stays open before a trial request is let through
+        :type resetTimeout: float, optional
+        :param serveStale: Serve the last good response of a URL when a query to it fails
+        :type serveStale: bool, optional
+        :param workers: The maximum number of requests, hedges included, in flight at once
+        :type workers: int, optional
+        """  # noqa: E501
+        self.timeouts: dict[str, tuple[float, float]] = dict(timeouts or {})
+        self.defaultTimeout: tuple[float, float] = defaultTimeout
+        self.hedgeQuantile: Optional[float] = hedgeQuantile
+        self.hedgeRatio: float = hedgeRatio
+        self.minHedgeDelay: float = minHedgeDelay
+        self.window: int = window
+        self.minSamples: int = minSamples
+        self.failureThreshold: int = failureThreshold
+        self.resetTimeout: float = resetTimeout
+        self.serveStale: bool = serveStale
+        self.workers: int = workers
+
+        self.lock: Lock = Lock()
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.latencies: dict[str, deque[float]] = {}
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self.snapshots: dict[str, Any] = {}
+
+        self.requests: int = 0
+        self.hedged: int = 0
+        self.hedgeWins: int = 0
+        self.failures: int = 0
+        self.staleServed: int = 0
+
+    def timeout(self, url: str) -> tuple[float, float]:
+        """
+        Get the (connect, read) timeout of the endpoint of a URL
+
+        :param url: The URL of a request
+        :type url: str
+        :return: The connect and read timeouts in seconds
+        :rtype: tuple[float, float]
+        """
+        parts: Any = urlsplit(url)
+
+        key: str
+        value: tuple[float, float]
+        for key, value in self.timeouts.items():
+            if parts.path.endswith(key) or (parts.hostname == key):
+                return value
+
+        return self.defaultTimeout
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        """
+        Get the circuit breaker of the endpoint of a URL
+
+        :param url: The URL of a request
+        :type url: str
+        :return: The endpoint's circuit breaker
+        :rtype: CircuitBreaker
+        """
+        key: str = endpointKey(url=url)
+
+        with self.lock:
+            if key not in self.breakers:
+                self.breakers[key] = CircuitBreaker(
+                    failureThreshold=self.failureThreshold,
+                    resetTimeout=self.resetTimeout,
+                )
+            return self.breakers[key]
+
+    def hedgeDelay(self, url: str) -> Optional[float]:
+        """
+        Get the number of seconds after which a request to the endpoint of a URL is hedged
+
+        :param url: The URL of a request
+        :type url: str
+        :return: The delay, or None if the request should not be hedged
+        :rtype: Optional[float]
+        """  # noqa: E501
+        if self.hedgeQuantile is None:
+            return None
+
+        with self.lock:
+            if self.hedged >= self.hedgeRatio * max(self.requests, 1):
+                return None
+
+            latencies: Optional[deque[float]] = self.latencies.get(
+                endpointKey(url=url),
+            )
+            if (latencies is None) or (len(latencies) < self.minSamples):
+                return None
+
+            ordered: list[float] = sorted(latencies)
+
+        index: int = min(
+            len(ordered) - 1,
+            int(self.hedgeQuantile * len(ordered)),
+        )
+        return max(self.minHedgeDelay, ordered[index])
+
+    def observe(self, url: str, seconds: float) -> None:
+        """
+        Add the latency of a completed request to its endpoint's window
+
+        :param url: The URL of the request
+        :type url: str
+        :param seconds: The latency of the request
+        :type seconds: float
+        """
+        key: str = endpointKey(url=url)
+
+        with self.lock:
+            if key not in self.latencies:
+                self.latencies[key] = deque(maxlen=self.window)
+            self.latencies[key].append(seconds)
+
+    def send(
+        self,
+        url: str,
+        send: Callable[[], Any],
+        hedge: bool = True,
+    ) -> Any:
+        """
+        Send a request through the endpoint's circuit breaker, hedging it if it is slow
+
+        :param url: The URL of the request
+        :type url: str
+        :param send: A function that sends the request and returns its response
+        :type send: Callable[[], Any]
+        :param hedge: Allow the request to be hedged (disable for requests that must only be sent once, such as streams)
+        :type hedge: bool, optional
+        :return: The response
+        :rtype: Any
+        :raises CircuitOpen: If the endpoint's circuit breaker is open
+        """  # noqa: E501
+        breaker: CircuitBreaker = self.breaker(url=url)
+        if breaker.allow() is False:
+            raise CircuitOpen(
+                f"circuit breaker of {endpointKey(url=url)} is open",
+            )
+
+        with self.lock:
+            self.requests += 1
+
+        delay: Optional[float] = self.hedgeDelay(url=url) if hedge else None
+
+        try:
+            resp: Any = (
+                self._timed(url=url, send=send)
+                if delay is None
+                else self._hedged(url=url, send=send, delay=delay)
+            )
+        except Exception:
+            breaker.failure()
+            with self.lock:
+                self.failures += 1
+            raise
+
+        if getattr(resp, "status_code", 200) >= 500:
+            breaker.failure()
+            with self.lock:
+                self.failures += 1
+        else:
+            breaker.success()
+
+        return resp
+
+    def _timed(self, url: str, send: Callable[[], Any]) -> Any:
+        start: float = time.perf_counter()
+        resp: Any = send()
+        self.observe(url=url, seconds=time.perf_counter() - start)
+        return resp
+
+    def _hedged(
+        self,
+        url: str,
+        send: Callable[[], Any],
+        delay: float,
+    ) -> Any:
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers)
+            executor: ThreadPoolExecutor = self.executor
+
+        primary: Future = executor.submit(
+            copy_context().run,
+            self._timed,
+            url,
+            send,
+        )
+
+        done: set[Future]
+        done, _ = wait([primary], timeout=delay)
+        if primary in done:
+            return primary.result()
+
+        with self.lock:
+            self.hedged += 1
+
+        hedge: Future = executor.submit(
+            copy_context().run,
+            self._timed,
+            url,
+            send,
+        )
+
+        pending: set[Future] = {primary, hedge}
+        error: Optional[BaseException] = None
+
+        while len(pending) > 0:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+            future: Future
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+
+                if future is hedge:
+                    with self.lock:
+                        self.hedgeWins += 1
+
+                other: Future
+                for other in pending:
+                    other.add_done_callback(_close)
+
+                return future.result()
+
+        raise error
+
+    def remember(self, url: str, data: Any) -> None:
+        """
+        Keep the decoded response of a successful query to serve if a later query to the same URL fails
+
+        :param url: The URL of the query
+        :type url: str
+        :param data: The decoded JSON response
+        :type data: Any
+        """  # noqa: E501
+        if self.serveStale:
+            self.snapshots[url] = data
+
+    def lastGood(self, url: str) -> Any:
+        """
+        Get the last good decoded response to a URL
+
+        :param url: The URL of the query
+        :type url: str
+        :return: The decoded JSON response, or None if there is none or serveStale is not set
+        :rtype: Any
+        """  # noqa: E501
+        if self.serveStale is False:
+            return None
+
+        data: Any = self.snapshots.get(url)
+        if data is not None:
+            with self.lock:
+                self.staleServed += 1
+
+        return data
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Report the hedging, failure, and circuit breaker counters
+
+        :return: Counters of requests, hedges, hedges that won, failures, and stale responses served, and the state of every endpoint's circuit breaker
+        :rtype: dict[str, Any]
+        """  # noqa: E501
+        with self.lock:
+            breakers: dict[str, CircuitBreaker] = self.breakers
+            return {
+                "requests": self.requests,
+                "hedged": self.hedged,
+                "hedgeWins": self.hedgeWins,
+                "failures": self.failures,
+                "staleServed": self.staleServed,
+                "breakers": {key: breakers[key].state for key in breakers},
+            }
+
+    def close(self) -> None:
+        """
+        Stop the thread pool that sends hedged requests
+        """
+        with self.lock:
+            executor: Optional[ThreadPoolExecutor] = self.executor
+            self.executor = None
+
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+def _close(future: Future) -> None:
+    if future.exception() is None:
+        resp: Any = future.result()
+        if hasattr(resp, "close"):
+            resp.close()
@@ -0,0 +1,371 @@
+import asyncio
+import heapq
+import itertools
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime
+from threading import Condition
+from typing import Any, Awaitable, Callable, Iterator, List, Optional
+from urllib.parse import urlsplit
+from zoneinfo import ZoneInfo
+
+from cta import TIMEZONE
+
+INTERACTIVE: int = 0
+BACKGROUND: int = 10
+
+DEFAULT_DAILY_LIMIT: int = 100000
+
+QUOTA_HOSTS: tuple[str, ...] = ("lapi.transitchicago.com",)
+
+_PRIORITY: ContextVar[int] = ContextVar("cta_priority", default=INTERACTIVE)
+
+
+class BudgetExhausted(RuntimeError):
+    """
+    Raised when a request would exceed the daily transaction limit of the API key, or would dip into the budget reserved for interactive requests
+    """  # noqa: E501
+
+
+def currentPriority() -> int:
+    """
+    Get the priority of requests made in the current thread or task
+
+    :return: The priority, lower is more urgent
+    :rtype: int
+    """
+    return _PRIORITY.get()
+
+
+@contextmanager
+def priority(level: int) -> Iterator[None]:
+    """
+    Make every request in the block at a given priority
+
+    The priority is carried into the threads of API.fetchAll and into asyncio tasks created in the block.
+
+    :param level: The priority, lower is more urgent (e.g. INTERACTIVE or BACKGROUND)
+    :type level: int
+    """  # noqa: E501
+    token: Any = _PRIORITY.set(level)
+    try:
+        yield
+    finally:
+        _PRIORITY.reset(token)
+
+
+class Scheduler:
+    """
+    A rate limiter shared by every request to the Train Tracker API, sized to the daily transaction limit of the API key
+
+    Requests to hosts in hosts take a token from a bucket that refills at dailyLimit per day and holds at most burst tokens, and are counted against dailyLimit until midnight in Chicago. When no token is available, requests wait in priority order, so an interactive query jumps ahead of queued background polls. Background requests are refused once fewer than reserve transactions are left for the day.
+
+    Identical requests for the same URL that are in flight at the same moment are coalesced: only the first is sent, and the others wait for and share its response. Requests to other hosts are coalesced but not rate limited.
+    """  # noqa: E501
+
+    def __init__(
+        self,
+        dailyLimit: int = DEFAULT_DAILY_LIMIT,
+        burst: float = 10,
+        reserve: int = 0,
+        maxWait: Optional[float] = None,
+        hosts: Optional[tuple[str, ...]] = QUOTA_HOSTS,
+    ) -> None:
+        """
+        Initializes the class
+
+        :param dailyLimit: The number of transactions the API key may make per day
+        :type dailyLimit: int, optional
+        :param burst: The number of requests that may be made at once after a quiet period
+        :type burst: float, optional
+        :param reserve: The number of the day's transactions that only requests more urgent than BACKGROUND may use
+        :type reserve: int, optional
+        :param maxWait: The number of seconds a request may wait for a token before TimeoutError is raised (if not specified, requests wait as long as it takes)
+        :type maxWait: Optional[float], optional
+        :param hosts: The hosts whose requests count against the limit (if None, every request does)
+        :type hosts: Optional[tuple[str, ...]], optional
+        :raises ValueError: If dailyLimit is not positive or burst is less than 1
+        """  # noqa: E501
+        if dailyLimit <= 0:
+            raise ValueError("dailyLimit must be positive")
+
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+
+        self.dailyLimit: int = dailyLimit
+        self.rate: float = dailyLimit / 86400
+        self.burst: float = burst
+        self.reserve: int = reserve
+        self.maxWait: Optional[float] = maxWait
+        self.hosts: Optional[frozenset[str]] = (
+            None if hosts is None else frozenset(hosts)
+        )
+        self.zone: ZoneInfo = ZoneInfo(TIMEZONE)
+
+        self.condition: Condition = Condition()
+        self.tokens: float = burst
+        self.updated: float = time.monotonic()
+        self.day: date = datetime.now(self.zone).date()
+        self.queue: List[tuple[int, int]] = []
+        self.tickets: Iterator[int] = itertools.count()
+        self.inflight: dict[str, Future] = {}
+        self.inflightAsync: dict[str, asyncio.Future] = {}
+
+        self.used: int = 0
+        self.requests: int = 0
+        self.coalesced: int = 0
+        self.refused: int = 0
+        self.waited: float = 0
+
+    def limited(self, url: str) -> bool:
+        """
+        Check whether a request counts against the daily limit
+
+        :param url: The URL of the request
+        :type url: str
+        :return: True if the host of the URL is rate limited
+        :rtype: bool
+        """
+        return (self.hosts is None) or (urlsplit(url).hostname in self.hosts)
+
+    def _refill(self) -> None:
+        now: float = time.monotonic()
+        self.tokens = min(
+            self.burst,
+            self.tokens + (now - self.updated) * self.rate,
+        )
+        self.updated = now
+
+        today: date = datetime.now(self.zone).date()
+        if today != self.day:
+            self.day = today
+            self.used = 0
+
+    def _cancel(self, ticket: tuple[int, int]) -> None:
+        self.queue.remove(ticket)
+        heapq.heapify(self.queue)
+        self.condition.notify_all()
+
+    def _take(self, ticket: tuple[int, int]) -> float:
+        self._refill()
+
+        remaining: int = self.dailyLimit - self.used
+        if (remaining <= 0) or (
+            (ticket[0] >= BACKGROUND) and (remaining <= self.reserve)
+        ):
+            self._cancel(ticket=ticket)
+            self.refused += 1
+            raise BudgetExhausted(
+                f"{self.used} of {self.dailyLimit} daily transactions used"
+                + ("" if remaining <= 0 else f", {remaining} reserved")
+            )
+
+        if (self.queue[0] == ticket) and (self.tokens >= 1):
+            heapq.heappop(self.queue)
+            self.tokens -= 1
+            self.used += 1
+            self.condition.notify_all()
+            return 0
+
+        # Wait until there is a token for every request ahead in the queue
+        ahead: int = sum(1 for queued in self.queue if queued < ticket)
+        return max((ahead + 1 - self.tokens) / self.rate, 0.001)
+
+    def acquire(self, level: Optional[int] = None) -> float:
+        """
+        Wait for a token, blocking the current thread
+
+        :param level: The priority of the request (if not specified, the priority of the current context is used)
+        :type level: Optional[int], optional
+        :return: The number of seconds waited
+        :rtype: float
+        """  # noqa: E501
+        start: float = time.monotonic()
+
+        with self.condition:
+            ticket: tuple[int, int] = (
+                currentPriority() if level is None else level,
+                next(self.tickets),
+            )
+            heapq.heappush(self.queue, ticket)
+
+            while True:
+                delay: float = self._take(ticket=ticket)
+                waited: float = time.monotonic() - start
+
+                if delay == 0:
+                    self.waited += waited
+                    return waited
+
+                if (self.maxWait is not None) and (waited >= self.maxWait):
+                    self._cancel(ticket=ticket)
+                    raise TimeoutError(
+                        f"no token available after {waited:.3f} seconds",
+                    )
+
+                if self.maxWait is not None:
+                    delay = min(delay, self.maxWait - waited)
+
+                self.condition.wait(timeout=delay)
+
+    async def acquireAsync(self, level: Optional[int] = None) -> float:
+        """
+        Wait for a token without blocking the event loop
+
+        :param level: The priority of the request (if not specified, the priority of the current context is used)
+        :type level: Optional[int], optional
+        :return: The number of seconds waited
+        :rtype: float
+        """  # noqa: E501
+        start: float = time.monotonic()
+
+        with self.condition:
+            ticket: tuple[int, int] = (
+                currentPriority() if level is None else level,
+                next(self.tickets),
+            )
+            heapq.heappush(self.queue, ticket)
+
+        try:
+            while True:
+                with self.condition:
+                    delay: float = self._take(ticket=ticket)
+                    waited: float = time.monotonic() - start
+
+                    if delay == 0:
+                        self.waited += waited
+                        return waited
+
+                    if (self.maxWait is not None) and (waited >= self.maxWait):
+                        self._cancel(ticket=ticket)
+                        raise TimeoutError(
+                            f"no token available after {waited:.3f} seconds"
+                        )
+
+                    if self.maxWait is not None:
+                        delay = min(delay, self.maxWait - waited)
+
+                await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            with self.condition:
+                if ticket in self.queue:
+                    self._cancel(ticket=ticket)
+            raise
+
+    def submit(
+        self,
+        url: str,
+        send: Callable[[], Any],
+        coalesce: bool = True,
+    ) -> Any:
+        """
+        Send a request once a token is available, sharing the response with identical requests already in flight
+
+        :param url: The URL of the request
+        :type url: str
+        :param send: A function that sends the request and returns its response
+        :type send: Callable[[], Any]
+        :param coalesce: Share the response with identical requests (disable for responses that can only be read once, such as streams)
+        :type coalesce: bool, optional
+        :return: The response
+        :rtype: Any
+        """  # noqa: E501
+        if coalesce is False:
+            if self.limited(url=url):
+                self.acquire()
+            return self._send(send=send)
+
+        with self.condition:
+            pending: Optional[Future] = self.inflight.get(url)
+            if pending is None:
+                future: Future = Future()
+                self.inflight[url] = future
+            else:
+                self.coalesced += 1
+
+        if pending is not None:
+            return pending.result()
+
+        try:
+            if self.limited(url=url):
+                self.acquire()
+            result: Any = self._send(send=send)
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self.condition:
+                del self.inflight[url]
+
+    async def submitAsync(
+        self,
+        url: str,
+        send: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Send a request from a coroutine once a token is available, sharing the response with identical requests already in flight
+
+        :param url: The URL of the request
+        :type url: str
+        :param send: A function that returns a coroutine that sends the request and returns its response
+        :type send: Callable[[], Awaitable[Any]]
+        :return: The response
+        :rtype: Any
+        """  # noqa: E501
+        pending: Optional[asyncio.Future] = self.inflightAsync.get(url)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.inflightAsync[url] = future
+
+        try:
+            if self.limited(url=url):
+                await self.acquireAsync()
+            self.requests += 1
+            result: Any = await send()
+        except BaseException as error:
+            future.set_exception(error)
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self.inflightAsync[url]
+
+    def _send(self, send: Callable[[], Any]) -> Any:
+        with self.condition:
+            self.requests += 1
+
+        return send()
+
+    def usage(self) -> dict[str, Any]:
+        """
+        Report how much of the daily budget has been used
+
+        :return: The daily limit, the transactions used and remaining today, the tokens in the bucket, the requests queued for a token, and counters of requests sent, coalesced, and refused and of seconds spent waiting for a token
+        :rtype: dict[str, Any]
+        """  # noqa: E501
+        with self.condition:
+            self._refill()
+
+            return {
+                "day": self.day.isoformat(),
+                "dailyLimit": self.dailyLimit,
+                "used": self.used,
+                "remaining": max(0, self.dailyLimit - self.used),
+                "tokens": self.tokens,
+                "queued": len(self.queue),
+                "inflight": len(self.inflight) + len(self.inflightAsync),
+                "requests": self.requests,
+                "coalesced": self.coalesced,
+                "refused": self.refused,
+                "waited": self.waited,
+            }
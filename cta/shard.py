@@ -0,0 +1,410 @@
+import ctypes
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from multiprocessing import resource_tracker
+from multiprocessing.context import BaseContext
+from multiprocessing.shared_memory import SharedMemory
+from threading import Event
+from typing import Any, Iterator, List, Optional, Sequence
+
+import pyarrow as pa
+from pandas import DataFrame
+
+from cta import Client, ValidationPolicy, getValidator
+from cta.records import toFrame
+from cta.train import ARRIVALS_SCHEMA, LOCATIONS_SCHEMA, Arrivals, Locations
+
+SOURCES: tuple[str, ...] = ("arrivals", "locations")
+
+_WORKER: dict[str, Any] = {}
+
+
+def shard(targets: Sequence[Any], count: int) -> List[List[Any]]:
+    """
+    Split targets into at most count shards of nearly equal size
+
+    :param targets: The station map IDs or routes to split
+    :type targets: Sequence[Any]
+    :param count: The maximum number of shards
+    :type count: int
+    :return: The non-empty shards
+    :rtype: List[List[Any]]
+    """
+    targets = list(targets)
+    return [targets[index::count] for index in range(min(count, len(targets)))]
+
+
+def _initialize(
+    key: str,
+    normalize: bool,
+    policy: Optional[ValidationPolicy],
+    endpoints: dict[str, str],
+    threads: int,
+) -> None:
+    client: Client = Client(
+        poolConnections=2,
+        poolMaxsize=threads,
+        policy=policy,
+    )
+
+    arrivals: Arrivals = Arrivals(
+        key=key,
+        client=client,
+        normalize=normalize,
+        output="dicts",
+    )
+    locations: Locations = Locations(
+        key=key,
+        client=client,
+        normalize=normalize,
+        output="dicts",
+    )
+
+    if "arrivals" in endpoints:
+        arrivals.endpointBase = endpoints["arrivals"]
+    if "locations" in endpoints:
+        locations.endpointBase = endpoints["locations"]
+
+    getValidator(schema=ARRIVALS_SCHEMA)
+    getValidator(schema=LOCATIONS_SCHEMA)
+
+    _WORKER.update(
+        {
+            "client": client,
+            "arrivals": arrivals,
+            "locations": locations,
+            "normalize": normalize,
+            "threads": threads,
+        }
+    )
+
+
+def _collectArrivals(mapids: List[int]) -> DataFrame:
+    arrivals: Arrivals = _WORKER["arrivals"]
+
+    rows: List[dict] = []
+
+    data: Any
+    for data in arrivals.fetchAll(
+        client=_WORKER["client"],
+        endpoints=[arrivals.buildEndpoint(mapid=mapid) for mapid in mapids],
+        workers=_WORKER["threads"],
+    ):
+        items: List[dict] = arrivals.parse(data=data)
+        queryTime: float = arrivals.queryTime
+        rows.extend({**item, "queryTime": queryTime} for item in items)
+
+    return toFrame(
+        data=rows,
+        schema=ARRIVALS_SCHEMA if _WORKER["normalize"] else None,
+        definition="Eta",
+    )
+
+
+def _collectLocations(routes: List[str]) -> DataFrame:
+    locations: Locations = _WORKER["locations"]
+
+    trains: dict[str, List[dict]] = locations.get(rt=routes)
+
+    rows: List[dict] = [
+        {**item, "route": route, "queryTime": locations.queryTime}
+        for route, items in trains.items()
+        for item in items
+    ]
+
+    return toFrame(
+        data=rows,
+        schema=LOCATIONS_SCHEMA if _WORKER["normalize"] else None,
+        definition="Train",
+    )
+
+
+def _collect(source: str, targets: List[Any]) -> tuple[str, str, int, int]:
+    df: DataFrame = (
+        _collectArrivals(mapids=targets)
+        if source == "arrivals"
+        else _collectLocations(routes=targets)
+    )
+
+    table: pa.Table = pa.Table.from_pandas(df=df, preserve_index=False)
+
+    mock: pa.MockOutputStream = pa.MockOutputStream()
+    with pa.ipc.new_stream(mock, table.schema) as writer:
+        writer.write_table(table)
+    size: int = mock.size()
+
+    memory: SharedMemory = SharedMemory(create=True, size=max(size, 1))
+    resource_tracker.unregister(memory._name, "shared_memory")
+
+    try:
+        buffer: pa.Buffer = pa.py_buffer(memory.buf)
+        sink: pa.FixedSizeBufferWriter = pa.FixedSizeBufferWriter(buffer)
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        sink.close()
+        del writer, sink, buffer
+    finally:
+        memory.close()
+
+    return source, memory.name, size, table.num_rows
+
+
+def _open(name: str, size: int) -> pa.Table:
+    memory: SharedMemory = SharedMemory(name=name)
+    memory.unlink()
+
+    address: int = ctypes.addressof(ctypes.c_char.from_buffer(memory.buf))
+
+    buffer: pa.Buffer = pa.foreign_buffer(address, size, base=memory)
+    return pa.ipc.open_stream(buffer).read_all()
+
+
+def _discard(future: Future) -> None:
+    if future.cancelled() or (future.exception() is not None):
+        return
+
+    try:
+        memory: SharedMemory = SharedMemory(name=future.result()[1])
+    except FileNotFoundError:
+        return
+
+    memory.close()
+    memory.unlink()
+
+
+class ShardedCollector:
+    """
+    Poll every station with Arrivals and every route with Locations from a pool of processes, so that validation and DataFrame construction are spread across cores rather than serialized by the GIL
+
+    Stations and routes are split into one shard per process. Each process keeps its own pooled Client and compiled validators for its lifetime, fetches the stations of a shard concurrently on a few threads, and builds a single DataFrame per shard. The DataFrame is written as an Arrow IPC stream into a shared memory block that the parent maps and reads in place, rather than being pickled through a pipe; the block is freed once nothing in the parent refers to it. The blocks of shards that are never read, because a poll is abandoned or the collector is closed while it is in flight, are freed as their workers finish.
+
+    Every row has a queryTime column holding the UNIX timestamp of the response it came from, and rows of Locations have a route column.
+    """  # noqa: E501
+
+    def __init__(
+        self,
+        key: str,
+        mapids: Sequence[int] = (),
+        routes: Sequence[str] = (),
+        processes: Optional[int] = None,
+        threads: int = 4,
+        normalize: bool = True,
+        policy: Optional[ValidationPolicy] = None,
+        endpoints: Optional[dict[str, str]] = None,
+        context: Optional[BaseContext] = None,
+    ) -> None:
+        """
+        Initializes the class
+
+        :param key: Your unique API key, assigned to you after agreeing to DLA and requesting a key be generated for you
+        :type key: str
+        :param mapids: The station map IDs to poll with Arrivals
+        :type mapids: Sequence[int], optional
+        :param routes: The routes to poll with Locations
+        :type routes: Sequence[str], optional
+        :param processes: The number of worker processes (if not specified, one per CPU)
+        :type processes: Optional[int], optional
+        :param threads: The number of concurrent requests each worker makes
+        :type threads: int, optional
+        :param normalize: Convert the columns of returned DataFrames to the dtypes hinted at by the JSON schema
+        :type normalize: bool, optional
+        :param policy: The policy each worker validates responses with (if not specified, every response is fully validated)
+        :type policy: Optional[ValidationPolicy], optional
+        :param endpoints: Replacement endpointBase URLs, keyed on arrivals or locations
+        :type endpoints: Optional[dict[str, str]], optional
+        :param context: The multiprocessing context to start workers with (if not specified, the platform default is used)
+        :type context: Optional[BaseContext], optional
+        """  # noqa: E501
+        self.key: str = key
+        self.mapids: List[int] = list(mapids)
+        self.routes: List[str] = list(routes)
+        self.processes: int = processes or os.cpu_count() or 1
+        self.threads: int = threads
+        self.normalize: bool = normalize
+        self.policy: Optional[ValidationPolicy] = policy
+        self.endpoints: dict[str, str] = endpoints or {}
+        self.context: Optional[BaseContext] = context
+
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.stopEvent: Event = Event()
+        self.pending: set[Future] = set()
+
+        self.polls: int = 0
+        self.rows: int = 0
+        self.errors: int = 0
+        self.lastError: Optional[BaseException] = None
+
+    def __enter__(self) -> "ShardedCollector":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """
+        Start the worker processes, if they are not already running
+        """
+        if self.executor is not None:
+            return
+
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=self.context,
+            initializer=_initialize,
+            initargs=(
+                self.key,
+                self.normalize,
+                self.policy,
+                self.endpoints,
+                self.threads,
+            ),
+        )
+
+    def close(self) -> None:
+        """
+        Stop the worker processes
+        """
+        self._release()
+
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    def shards(self) -> List[tuple[str, List[Any]]]:
+        """
+        Split the stations and routes into shards
+
+        :return: The source (arrivals or locations) and targets of every shard
+        :rtype: List[tuple[str, List[Any]]]
+        """
+        return [
+            ("arrivals", targets)
+            for targets in shard(targets=self.mapids, count=self.processes)
+        ] + [
+            ("locations", targets)
+            for targets in shard(targets=self.routes, count=self.processes)
+        ]
+
+    def _submit(self) -> List[Future]:
+        self.start()
+        self.polls += 1
+
+        futures: List[Future] = [
+            self.executor.submit(_collect, source, targets)
+            for source, targets in self.shards()
+        ]
+        self.pending.update(futures)
+
+        return futures
+
+    def _completed(
+        self,
+        futures: List[Future],
+    ) -> Iterator[tuple[str, str, int, int]]:
+        try:
+            future: Future
+            for future in as_completed(futures):
+                self.pending.discard(future)
+
+                error: Optional[BaseException] = future.exception()
+                if error is not None:
+                    self.errors += 1
+                    self.lastError = error
+                    continue
+
+                result: tuple[str, str, int, int] = future.result()
+                self.rows += result[3]
+                yield result
+        finally:
+            self._release(futures=futures)
+
+    def _release(self, futures: Optional[List[Future]] = None) -> None:
+        unread: set[Future] = set(self.pending)
+        if futures is not None:
+            unread &= set(futures)
+
+        self.pending -= unread
+
+        future: Future
+        for future in unread:
+            if future.cancel() is False:
+                future.add_done_callback(_discard)
+
+    def iterPoll(self) -> Iterator[tuple[str, DataFrame]]:
+        """
+        Poll every shard once, yielding each shard's DataFrame as soon as its worker finishes
+
+        Shards that fail are counted in errors and skipped.
+
+        :return: An iterator of (source, DataFrame) tuples, where source is arrivals or locations
+        :rtype: Iterator[tuple[str, DataFrame]]
+        """  # noqa: E501
+        source: str
+        name: str
+        size: int
+        for source, name, size, _ in self._completed(futures=self._submit()):
+            yield source, _open(name=name, size=size).to_pandas()
+
+    def poll(self) -> dict[str, DataFrame]:
+        """
+        Poll every shard once and merge the shards of each source
+
+        The shards of a source are concatenated as Arrow tables before they are converted, so categorical columns keep a single, unified set of categories.
+
+        :return: A DataFrame per source with at least one successful shard, keyed on arrivals or locations
+        :rtype: dict[str, DataFrame]
+        """  # noqa: E501
+        tables: dict[str, List[pa.Table]] = {}
+
+        source: str
+        name: str
+        size: int
+        for source, name, size, _ in self._completed(futures=self._submit()):
+            tables.setdefault(source, []).append(_open(name=name, size=size))
+
+        return {
+            source: pa.concat_tables(
+                tables[source],
+                promote_options="default",
+            ).to_pandas()
+            for source in SOURCES
+            if source in tables
+        }
+
+    def stream(
+        self,
+        interval: float,
+        iterations: Optional[int] = None,
+    ) -> Iterator[tuple[str, DataFrame]]:
+        """
+        Poll at a fixed interval until stopped, yielding the merged stream of every shard's DataFrame
+
+        :param interval: The number of seconds between the start of each poll
+        :type interval: float
+        :param iterations: The number of polls to make before returning (if not specified, poll until stop() is called)
+        :type iterations: Optional[int], optional
+        :return: An iterator of (source, DataFrame) tuples, where source is arrivals or locations
+        :rtype: Iterator[tuple[str, DataFrame]]
+        """  # noqa: E501
+        self.stopEvent.clear()
+
+        count: int = 0
+        deadline: float = time.monotonic()
+
+        while self.stopEvent.is_set() is False:
+            yield from self.iterPoll()
+
+            count += 1
+            if (iterations is not None) and (count >= iterations):
+                break
+
+            deadline += interval
+            self.stopEvent.wait(timeout=max(0, deadline - time.monotonic()))
+
+    def stop(self) -> None:
+        """
+        Stop a running stream after its current poll
+        """
+        self.stopEvent.set()
@@ -0,0 +1,190 @@
+from typing import Optional, Sequence
+
+import numpy as np
+from pandas import DataFrame, to_numeric
+
+LINE_FLAGS: tuple[str, ...] = (
+    "red",
+    "blue",
+    "g",
+    "brn",
+    "p",
+    "pexp",
+    "y",
+    "pnk",
+    "o",
+)
+
+EARTH_RADIUS: float = 6371008.8
+
+BLOCK_SIZE: int = 1024
+
+
+def lineMask(lines: Sequence[str]) -> int:
+    """
+    Pack a set of line flags into a bitmask
+
+    :param lines: The names of the line flag columns of the Stops dataset (e.g. red, blue, brn)
+    :type lines: Sequence[str]
+    :return: A bitmask with one bit set per line
+    :rtype: int
+    """  # noqa: E501
+    mask: int = 0
+
+    line: str
+    for line in lines:
+        mask |= 1 << LINE_FLAGS.index(line)
+
+    return mask
+
+
+class StopsIndex:
+    """
+    A spatial index over the CTA L stops for nearest-stop and bounding-box queries
+
+    Coordinates are stored as contiguous float64 arrays sorted by latitude, and the line flags of each stop are packed into a uint16 bitmask. Bounding-box queries binary search the sorted latitudes and only test the longitudes of stops in range. Nearest-stop queries are answered for many points at once by computing great-circle distances to every stop in vectorized blocks, which, for the few hundred stops in the dataset, is faster than traversing a tree.
+    """  # noqa: E501
+
+    def __init__(self, df: DataFrame) -> None:
+        """
+        Initializes the class
+
+        :param df: The DataFrame returned by cta.stops.Stops.get
+        :type df: DataFrame
+        """
+        lat: np.ndarray = np.fromiter(
+            (float(location["latitude"]) for location in df["location"]),
+            dtype=np.float64,
+            count=len(df),
+        )
+        lon: np.ndarray = np.fromiter(
+            (float(location["longitude"]) for location in df["location"]),
+            dtype=np.float64,
+            count=len(df),
+        )
+
+        lines: np.ndarray = np.zeros(len(df), dtype=np.uint16)
+
+        bit: int
+        line: str
+        for bit, line in enumerate(LINE_FLAGS):
+            if line in df.columns:
+                lines |= df[line].to_numpy(dtype=bool).astype(np.uint16) << bit
+
+        order: np.ndarray = np.argsort(lat, kind="stable")
+
+        self.df: DataFrame = df.iloc[order].reset_index(drop=True)
+        self.lat: np.ndarray = np.ascontiguousarray(lat[order])
+        self.lon: np.ndarray = np.ascontiguousarray(lon[order])
+        self.lines: np.ndarray = np.ascontiguousarray(lines[order])
+        self.mapId: np.ndarray = to_numeric(self.df["map_id"]).to_numpy(
+            dtype=np.int32,
+        )
+        self.stopId: np.ndarray = to_numeric(self.df["stop_id"]).to_numpy(
+            dtype=np.int32
+        )
+
+        self._latRad: np.ndarray = np.radians(self.lat)
+        self._lonRad: np.ndarray = np.radians(self.lon)
+        self._cosLat: np.ndarray = np.cos(self._latRad)
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def _candidates(self, lines: Optional[Sequence[str]]) -> np.ndarray:
+        if lines is None:
+            return np.ones(len(self), dtype=bool)
+
+        return (self.lines & lineMask(lines=lines)) != 0
+
+    def nearest(
+        self,
+        lat: float | Sequence[float] | np.ndarray,
+        lon: float | Sequence[float] | np.ndarray,
+        k: int = 1,
+        lines: Optional[Sequence[str]] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k nearest stops to one or more points
+
+        :param lat: The latitude of each point
+        :type lat: float | Sequence[float] | np.ndarray
+        :param lon: The longitude of each point
+        :type lon: float | Sequence[float] | np.ndarray
+        :param k: The number of stops to find per point
+        :type k: int, optional
+        :param lines: Only consider stops served by at least one of these lines (if not specified, every stop is considered)
+        :type lines: Optional[Sequence[str]], optional
+        :return: A (points, k) array of row positions into StopsIndex.df (-1 where fewer than k stops matched), and a (points, k) array of distances in meters, both sorted nearest first
+        :rtype: tuple[np.ndarray, np.ndarray]
+        """  # noqa: E501
+        qLat: np.ndarray = np.radians(np.atleast_1d(lat).astype(np.float64))
+        qLon: np.ndarray = np.radians(np.atleast_1d(lon).astype(np.float64))
+
+        candidates: np.ndarray = self._candidates(lines=lines)
+        k = min(k, len(self))
+
+        indices: np.ndarray = np.full((len(qLat), k), -1, dtype=np.int64)
+        distances: np.ndarray = np.full((len(qLat), k), np.inf)
+
+        if k == 0:
+            return indices, distances
+
+        start: int
+        for start in range(0, len(qLat), BLOCK_SIZE):
+            block: slice = slice(start, start + BLOCK_SIZE)
+
+            bLat: np.ndarray = qLat[block, None]
+            bLon: np.ndarray = qLon[block, None]
+
+            dLat: np.ndarray = np.sin((self._latRad - bLat) / 2) ** 2
+            dLon: np.ndarray = np.sin((self._lonRad - bLon) / 2) ** 2
+            a: np.ndarray = dLat + np.cos(bLat) * self._cosLat * dLon
+            d: np.ndarray = 2 * EARTH_RADIUS * np.arcsin(np.sqrt(a))
+            d[:, ~candidates] = np.inf
+
+            nearest: np.ndarray = np.argpartition(d, kth=k - 1, axis=1)[:, :k]
+            nearestD: np.ndarray = np.take_along_axis(d, nearest, axis=1)
+
+            order: np.ndarray = np.argsort(nearestD, axis=1)
+            nearest = np.take_along_axis(nearest, order, axis=1)
+            nearestD = np.take_along_axis(nearestD, order, axis=1)
+
+            nearest[np.isinf(nearestD)] = -1
+
+            indices[block] = nearest
+            distances[block] = nearestD
+
+        return indices, distances
+
+    def within(
+        self,
+        bbox: tuple[float, float, float, float],
+        lines: Optional[Sequence[str]] = None,
+    ) -> np.ndarray:
+        """
+        Find every stop inside a bounding box
+
+        :param bbox: The bounding box as (minimum latitude, minimum longitude, maximum latitude, maximum longitude)
+        :type bbox: tuple[float, float, float, float]
+        :param lines: Only return stops served by at least one of these lines (if not specified, every stop is returned)
+        :type lines: Optional[Sequence[str]], optional
+        :return: The row positions into StopsIndex.df of the matching stops
+        :rtype: np.ndarray
+        """  # noqa: E501
+        minLat: float
+        minLon: float
+        maxLat: float
+        maxLon: float
+        minLat, minLon, maxLat, maxLon = bbox
+
+        low: int = int(np.searchsorted(self.lat, minLat, side="left"))
+        high: int = int(np.searchsorted(self.lat, maxLat, side="right"))
+
+        lonSlice: np.ndarray = self.lon[low:high]
+        mask: np.ndarray = (lonSlice >= minLon) & (lonSlice <= maxLon)
+
+        if lines is not None:
+            mask &= (self.lines[low:high] & lineMask(lines=lines)) != 0
+
+        return np.flatnonzero(mask) + low
@@ -1,8 +1,16 @@
-import requests
-from pandas import DataFrame
-from requests import Response
+import math
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Iterator, List, Optional, Sequence
+from urllib.parse import urlencode
 
-from cta import API, API_PROTOCOL, validateData
+from cta import API, API_PROTOCOL, Client, get, getPolicy, validateData
+from cta.cache import CacheEntry, DiskCache
+from cta.records import LStop, toFrame
+from cta.stream import batched, iterItems
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+    from requests import Response
 
 STOPS_SCHEMA: dict = {
     "$schema": "http://json-schema.org/draft-06/schema#",
@@ -65,23 +73,370 @@ STOPS_SCHEMA: dict = {
     },
 }
 
+LSTOP_SCHEMA: dict = {
+    "$schema": STOPS_SCHEMA["$schema"],
+    "$ref": "#/definitions/LStop",
+    "definitions": STOPS_SCHEMA["definitions"],
+}
+
+VALIDATOR_HEADERS: dict[str, str] = {
+    "ETag": "If-None-Match",
+    "Last-Modified": "If-Modified-Since",
+}
+
+_SELECTED_SCHEMAS: dict[tuple[str, ...], tuple[dict, dict]] = {}
+_SELECTED_SCHEMAS_LOCK: Lock = Lock()
+
+
+def selectedSchemas(select: Optional[Sequence[str]]) -> tuple[dict, dict]:
+    """
+    Get the JSON schemas of a response and of a single stop when only some of the columns of the dataset are selected
+
+    Only the selected columns are required. The result is cached per selection, so the compiled validators and typed records of each selection are reused.
+
+    :param select: The selected columns (if not specified, every column is selected)
+    :type select: Optional[Sequence[str]]
+    :return: The schemas of a response and of a single stop
+    :rtype: tuple[dict, dict]
+    """  # noqa: E501
+    if select is None:
+        return STOPS_SCHEMA, LSTOP_SCHEMA
+
+    key: tuple[str, ...] = tuple(sorted(select))
+
+    with _SELECTED_SCHEMAS_LOCK:
+        schemas: tuple[dict, dict] | None = _SELECTED_SCHEMAS.get(key)
+        if schemas is not None:
+            return schemas
+
+        lstop: dict = STOPS_SCHEMA["definitions"]["LStop"]
+        required: List[str]
+        required = [name for name in lstop["required"] if name in key]
+        definitions: dict = {
+            **STOPS_SCHEMA["definitions"],
+            "LStop": {**lstop, "required": required},
+        }
+
+        schemas = (
+            {**STOPS_SCHEMA, "definitions": definitions},
+            {**LSTOP_SCHEMA, "definitions": definitions},
+        )
+        _SELECTED_SCHEMAS[key] = schemas
+        return schemas
+
 
 class Stops(API, API_PROTOCOL):
     """
     Get the list of CTA L stops
-    """
 
-    def __init__(self) -> None:
+    The last body received for each query is kept with its ETag and Last-Modified headers, and later queries are sent as conditional requests. When the dataset has not changed, the server answers 304 Not Modified without a body and the stored body is served instead; if it is the same object that was last parsed, the previous result is reused rather than parsed again.
+    """  # noqa: E501
+
+    def __init__(
+        self,
+        client: Optional[Client] = None,
+        normalize: bool = False,
+        diskCache: Optional[DiskCache] = None,
+        output: str = "frame",
+        conditional: bool = True,
+    ) -> None:
+        """
+        Initializes the class
+
+        :param client: The Client to submit requests with (if not specified, the process-wide Client is used)
+        :type client: Optional[Client], optional
+        :param normalize: Convert the columns of returned DataFrames to the dtypes hinted at by the JSON schema
+        :type normalize: bool, optional
+        :param diskCache: The on-disk cache to load the list of stops from (if not specified, the list is downloaded on every query)
+        :type diskCache: Optional[DiskCache], optional
+        :param output: Return responses as a frame (pandas.DataFrame), records (cta.records objects, without importing pandas), dicts (the JSON objects as received), typed (typed records validated as they are converted), or batch (a cta.records.RecordBatch of typed columns)
+        :type output: str, optional
+        :param conditional: Revalidate the last body received with its ETag and Last-Modified headers rather than downloading it again
+        :type conditional: bool, optional
+        """  # noqa: E501
+        self.client: Optional[Client] = client
+        self.normalize: bool = normalize
+        self.output: str = output
+        self.diskCache: Optional[DiskCache] = diskCache
+        self.conditional: bool = conditional
+        self.queryTime: float = -1
+        self.stale: bool = False
         self.endpointBase: str = (
             "https://data.cityofchicago.org/resource/8pix-ypme.json"  # noqa: E501
         )
 
-    def get(self) -> DataFrame:
-        resp: Response = requests.get(url=self.endpointBase, timeout=60)
+        self.select: Optional[tuple[str, ...]] = None
+        self.bodies: dict[str, tuple[Any, dict[str, str]]] = {}
+        self.parsed: Optional[tuple[Any, tuple, CacheEntry]] = None
+        self.notModified: int = 0
+
+    def get(
+        self,
+        select: Optional[Sequence[str]] = None,
+        where: Optional[str] = None,
+    ) -> "DataFrame":
+        """
+        Query the API endpoint
+
+        :param select: The columns to download (e.g. ["stop_id", "map_id", "ada"]), sent as the $select parameter of the query (if not specified, every column is downloaded)
+        :type select: Optional[Sequence[str]], optional
+        :param where: A SoQL filter of the stops to download (e.g. "red = true"), sent as the $where parameter of the query
+        :type where: Optional[str], optional
+        :return: The JSON response as a pandas.DataFrame object
+        :rtype: DataFrame
+        """  # noqa: E501
+        endpoint: str = self.buildEndpoint(select=select, where=where)
+        self.select = None if select is None else tuple(select)
+
+        if (self.diskCache is not None) and self.diskCache.fresh(key=endpoint):
+            data: Any = self.storedBody(endpoint=endpoint)
+            if data is not None:
+                self.stale = False
+                return self.parse(data=data)
+
+        return self.query(endpoint=endpoint)
+
+    def buildEndpoint(
+        self,
+        select: Optional[Sequence[str]] = None,
+        where: Optional[str] = None,
+    ) -> str:
+        """
+        Build the URL of a query against the API endpoint
+
+        :param select: The columns to download
+        :type select: Optional[Sequence[str]], optional
+        :param where: A SoQL filter of the stops to download
+        :type where: Optional[str], optional
+        :return: The URL to submit the HTTP GET request to
+        :rtype: str
+        """
+        params: dict[str, str] = {}
+
+        if select is not None:
+            params["$select"] = ",".join(select)
+
+        if where is not None:
+            params["$where"] = where
+
+        if len(params) == 0:
+            return self.endpointBase
+
+        return self.endpointBase + "?" + urlencode(params)
+
+    def storedBody(self, endpoint: str) -> Any:
+        """
+        Get the last body received for a query, from memory or else from the disk cache
+
+        :param endpoint: The URL of the query
+        :type endpoint: str
+        :return: The JSON response, or None if none is stored
+        :rtype: Any
+        """  # noqa: E501
+        stored: tuple[Any, dict[str, str]] | None = self.bodies.get(endpoint)
+        if stored is not None:
+            return stored[0]
+
+        if self.diskCache is None:
+            return None
+
+        data: Any = self.diskCache.load(key=endpoint, stale=True)
+        if data is not None:
+            self.bodies[endpoint] = (
+                data,
+                self.diskCache.validators(key=endpoint),
+            )
+
+        return data
+
+    def request(self, client: Client, endpoint: str) -> "Response":
+        """
+        Submit the HTTP GET request of a query, as a conditional request if a body has already been received for it
+
+        :param client: The Client to submit the request with
+        :type client: Client
+        :param endpoint: The URL to submit the HTTP GET request to
+        :type endpoint: str
+        :return: A requests.Response object
+        :rtype: Response
+        """  # noqa: E501
+        headers: dict[str, str] = {}
+
+        stored: Any = self.storedBody(endpoint=endpoint)
+        if self.conditional and (stored is not None):
+            validators: dict[str, str] = self.bodies[endpoint][1]
+            headers = {
+                VALIDATOR_HEADERS[name]: value
+                for name, value in validators.items()
+                if name in VALIDATOR_HEADERS
+            }
+
+        return client.get(url=endpoint, headers=headers or None)
+
+    def decode(self, resp: "Response", endpoint: str) -> Any:
+        """
+        Decode the JSON body of the response to a query, serving the stored body if the server answered 304 Not Modified
+
+        :param resp: The response returned by request
+        :type resp: Response
+        :param endpoint: The URL the request was submitted to
+        :type endpoint: str
+        :return: The decoded JSON data
+        :rtype: Any
+        """  # noqa: E501
+        if resp.status_code == 304:
+            self.notModified += 1
+
+            if self.diskCache is not None:
+                self.diskCache.touch(key=endpoint)
+
+            return self.bodies[endpoint][0]
+
+        data: Any = resp.json()
+        validators: dict[str, str] = {
+            name: resp.headers[name]
+            for name in VALIDATOR_HEADERS
+            if name in resp.headers
+        }
+
+        self.bodies[endpoint] = (data, validators)
+
+        if self.diskCache is not None:
+            self.diskCache.store(
+                key=endpoint,
+                data=data,
+                validators=validators,
+            )
+
+        return data
+
+    def parse(self, data: dict) -> "DataFrame":
+        """
+        Validate the JSON response of the API endpoint and convert it to a DataFrame
+
+        If data is the same object that was last parsed, with the same columns selected and the same output, a copy of the previous result is returned instead.
+
+        :param data: The JSON response of the API endpoint
+        :type data: dict
+        :return: The JSON response as a pandas.DataFrame object
+        :rtype: DataFrame
+        """  # noqa: E501
+        key: tuple = (self.select, self.normalize, self.output)
+
+        if (
+            (self.parsed is not None)
+            and (self.parsed[0] is data)
+            and (self.parsed[1] == key)
+        ):
+            return self.parsed[2].result()
+
+        schema: dict = selectedSchemas(select=self.select)[0]
+
+        valid: bool = validateData(
+            data=data,
+            schema=schema,
+            policy=getPolicy(client=self.client),
+        )
+
+        value: Any = self.convert(
+            data=data if valid else [],
+            record=LStop,
+            schema=schema,
+            definition="LStop",
+        )
+
+        entry: CacheEntry = CacheEntry(
+            expires=math.inf,
+            tmst=None,
+            queryTime=self.queryTime,
+            value=value,
+        )
+        self.parsed = (data, key, entry)
+
+        return entry.result()
+
+    def buildFrame(self, records: List[dict]) -> "DataFrame":
+        """
+        Convert a list of stops to a DataFrame
+
+        :param records: The stops
+        :type records: List[dict]
+        :return: The stops as a pandas.DataFrame object
+        :rtype: DataFrame
+        """
+        return toFrame(
+            data=records,
+            schema=STOPS_SCHEMA if self.normalize else None,
+            definition="LStop",
+        )
+
+    def iterRecords(
+        self,
+        select: Optional[Sequence[str]] = None,
+        where: Optional[str] = None,
+    ) -> Iterator[dict]:
+        """
+        Query the API endpoint and incrementally parse the response, yielding each stop as soon as it has been received and validated
+
+        Only one stop is held in memory at a time. Each stop is validated on its own against the JSON schema, and stops that fail validation under a non-strict policy are skipped.
+
+        :param select: The columns to download (if not specified, every column is downloaded)
+        :type select: Optional[Sequence[str]], optional
+        :param where: A SoQL filter of the stops to download
+        :type where: Optional[str], optional
+        :return: An iterator of stops
+        :rtype: Iterator[dict]
+        """  # noqa: E501
+        schema: dict = selectedSchemas(select=select)[1]
+
+        resp: "Response" = get(
+            url=self.buildEndpoint(select=select, where=where),
+            client=self.client,
+            stream=True,
+        )
+        resp.raw.decode_content = True
+
+        with resp:
+            record: dict
+            for _, record in iterItems(file=resp.raw, prefix="item"):
+                valid: bool = validateData(
+                    data=record,
+                    schema=schema,
+                    policy=getPolicy(client=self.client),
+                )
+                if valid is False:
+                    continue
+
+                yield record
+
+    def stream(
+        self,
+        batchSize: int = 1000,
+        select: Optional[Sequence[str]] = None,
+        where: Optional[str] = None,
+    ) -> Iterator["DataFrame"]:
+        """
+        Query the API endpoint and incrementally parse the response, yielding DataFrames of at most batchSize stops
 
-        data: dict = resp.json()
-        if validateData(data=data, schema=STOPS_SCHEMA) is False:
-            return DataFrame()
+        :param batchSize: The maximum number of stops per DataFrame
+        :type batchSize: int, optional
+        :param select: The columns to download (if not specified, every column is downloaded)
+        :type select: Optional[Sequence[str]], optional
+        :param where: A SoQL filter of the stops to download
+        :type where: Optional[str], optional
+        :return: An iterator of pandas.DataFrame objects, or of lists of records or dicts depending on output
+        :rtype: Iterator[DataFrame]
+        """  # noqa: E501
+        schema: dict = selectedSchemas(select=select)[0]
 
-        df: DataFrame = DataFrame.from_records(data=resp.json())
-        return df
+        batch: List[dict]
+        for batch in batched(
+            iterable=self.iterRecords(select=select, where=where),
+            size=batchSize,
+        ):
+            yield self.convert(
+                data=batch,
+                record=LStop,
+                schema=schema,
+                definition="LStop",
+            )
@@ -0,0 +1,77 @@
+from itertools import islice
+from typing import Any, BinaryIO, Collection, Iterable, Iterator, List
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover
+    ijson = None
+
+
+def batched(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """
+    Group the items of an iterable into lists of at most size items
+
+    :param iterable: The items to group
+    :type iterable: Iterable[Any]
+    :param size: The maximum number of items per group
+    :type size: int
+    :return: An iterator of groups of items
+    :rtype: Iterator[List[Any]]
+    """
+    iterator: Iterator[Any] = iter(iterable)
+
+    while True:
+        batch: List[Any] = list(islice(iterator, size))
+        if len(batch) == 0:
+            return
+
+        yield batch
+
+
+def iterItems(
+    file: BinaryIO,
+    prefix: str,
+    scalars: Collection[str] = (),
+) -> Iterator[tuple[str, Any]]:
+    """
+    Incrementally parse a JSON document and yield each item found at a prefix as soon as it is complete
+
+    Prefixes follow ijson's dotted notation, where array members are named item (e.g. ctatt.route.item). Only one item is held in memory at a time, no matter how large the document is.
+
+    :param file: A binary file-like object containing the JSON document, such as requests.Response.raw
+    :type file: BinaryIO
+    :param prefix: The prefix of the items to yield
+    :type prefix: str
+    :param scalars: The prefixes of scalar values to yield as they are parsed
+    :type scalars: Collection[str], optional
+    :return: An iterator of (prefix, value) tuples
+    :rtype: Iterator[tuple[str, Any]]
+    """  # noqa: E501
+    if ijson is None:
+        raise ImportError(
+            "ijson is required to stream responses, install cta[stream]",
+        )
+
+    builder: ijson.ObjectBuilder | None = None
+
+    path: str
+    event: str
+    value: Any
+    for path, event, value in ijson.parse(file, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+
+            if (path == prefix) and (event in ("end_map", "end_array")):
+                yield prefix, builder.value
+                builder = None
+
+            continue
+
+        if path == prefix:
+            if event in ("start_map", "start_array"):
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+            else:
+                yield prefix, value
+        elif (path in scalars) and (event not in ("map_key",)):
+            yield path, value
@@ -1,9 +1,26 @@
-from typing import List, Optional
-
-from pandas import DataFrame, Timestamp
-from requests import Response
-
-from cta import API, API_PROTOCOL, get, validateData
+from typing import TYPE_CHECKING, Iterator, List, Optional
+
+from cta import (
+    API,
+    API_PROTOCOL,
+    Client,
+    get,
+    getClient,
+    getPolicy,
+    instrument,
+    responseTime,
+    validateData,
+)
+from cta.instrument import CallRecord
+from cta.records import Eta, Train, toFrame
+from cta.stream import iterItems
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+    from requests import Response
+
+    from cta.fleet import FleetBuffer
+    from cta.lookup import StopsLookup
 
 ARRIVALS_SCHEMA: dict = {
     "$schema": "http://json-schema.org/draft-06/schema#",
@@ -261,21 +278,47 @@ LOCATIONS_SCHEMA: dict = {
     },
 }
 
+ROUTE_SCHEMA: dict = {
+    "$schema": LOCATIONS_SCHEMA["$schema"],
+    "$ref": "#/definitions/Route",
+    "definitions": LOCATIONS_SCHEMA["definitions"],
+}
+
 
 class Arrivals(API, API_PROTOCOL):
     """
     For a given route, get the list of all train arrivals to each station
     """
 
-    def __init__(self, key: str) -> None:
+    def __init__(
+        self,
+        key: str,
+        client: Optional[Client] = None,
+        normalize: bool = False,
+        output: str = "frame",
+        lookup: Optional["StopsLookup"] = None,
+    ) -> None:
         """
         Initializes the class
 
         :param key: Your unique API key, assigned to you after agreeing to DLA and requesting a key be generated for you
         :type key: str
+        :param client: The Client to submit requests with (if not specified, the process-wide Client is used)
+        :type client: Optional[Client], optional
+        :param normalize: Convert the columns of returned DataFrames to the dtypes hinted at by the JSON schema
+        :type normalize: bool, optional
+        :param output: Return responses as a frame (pandas.DataFrame), records (cta.records objects, without importing pandas), dicts (the JSON objects as received), typed (typed records validated as they are converted), or batch (a cta.records.RecordBatch of typed columns)
+        :type output: str, optional
+        :param lookup: A stops lookup table to check mapid and stpid against before a request is made (if not specified, ids are sent as given)
+        :type lookup: Optional[StopsLookup], optional
         """  # noqa: E501
+        self.client: Optional[Client] = client
+        self.normalize: bool = normalize
+        self.output: str = output
+        self.lookup: Optional["StopsLookup"] = lookup
         self.key = key
         self.queryTime: float = -1
+        self.stale: bool = False
         self.endpointBase: str = f"http://lapi.transitchicago.com/api/1.0/ttarrivals.aspx?outputType=JSON&key={self.key}"  # noqa: E501
 
     def get(
@@ -284,7 +327,7 @@ class Arrivals(API, API_PROTOCOL):
         stpid: int | None = None,
         max: Optional[int] = None,
         rt: Optional[str] = None,
-    ) -> DataFrame:
+    ) -> "DataFrame":
         """
         Query the API endpoint
 
@@ -302,13 +345,47 @@ class Arrivals(API, API_PROTOCOL):
         if (mapid is None) and (stpid is None):
             return False
 
+        endpoint: str = self.buildEndpoint(
+            mapid=mapid,
+            stpid=stpid,
+            max=max,
+            rt=rt,
+        )
+
+        return self.query(endpoint=endpoint)
+
+    def buildEndpoint(
+        self,
+        mapid: int | None = None,
+        stpid: int | None = None,
+        max: Optional[int] = None,
+        rt: Optional[str] = None,
+    ) -> str:
+        """
+        Build the URL of a query against the API endpoint
+
+        :param mapid: A single five-digit station code
+        :type mapid: int | None, optional
+        :param stpid: A single five-digit stop code
+        :type stpid: int | None, optional
+        :param max: The maximum number of results to return
+        :type max: Optional[int], optional
+        :param rt: A single route to filter results by
+        :type rt: Optional[str], optional
+        :return: The URL to submit the HTTP GET request to
+        :rtype: str
+        :raises ValueError: If a lookup table is set and mapid or stpid is not in it
+        """  # noqa: E501
+        if self.lookup is not None:
+            self.lookup.validate(mapid=mapid, stpid=stpid)
+
         endpoint: str = self.endpointBase
 
         if (mapid != "") and (mapid is not None):
-            endpoint = endpoint + "&mapid=" + mapid
+            endpoint = endpoint + "&mapid=" + str(mapid)
 
         if (stpid != "") and (stpid is not None):
-            endpoint = endpoint + "&stpid=" + stpid
+            endpoint = endpoint + "&stpid=" + str(stpid)
 
         if max is not None:
             if max > 0:
@@ -317,18 +394,38 @@ class Arrivals(API, API_PROTOCOL):
         if (rt != "") and (rt is not None):
             endpoint = endpoint + "&rt=" + rt
 
-        resp: Response = get(url=endpoint)
-
-        data: dict = resp.json()
-        if validateData(data=data, schema=ARRIVALS_SCHEMA) is False:
-            return DataFrame()
+        return endpoint
 
-        self.queryTime = Timestamp(
-            ts_input=data["ctatt"]["tmst"],
-            tz="America/Chicago",
-        ).timestamp()
+    def parse(self, data: dict) -> "DataFrame":
+        """
+        Validate the JSON response of the API endpoint and convert it to a DataFrame
 
-        return DataFrame.from_records(data=data["ctatt"]["eta"])
+        :param data: The JSON response of the API endpoint
+        :type data: dict
+        :return: The JSON response as a pandas.DataFrame object
+        :rtype: DataFrame
+        """  # noqa: E501
+        valid: bool = validateData(
+            data=data,
+            schema=ARRIVALS_SCHEMA,
+            policy=getPolicy(client=self.client),
+        )
+        if valid is False:
+            return self.convert(
+                data=[],
+                record=Eta,
+                schema=ARRIVALS_SCHEMA,
+                definition="Eta",
+            )
+
+        self.queryTime = responseTime(tmst=data["ctatt"]["tmst"])
+
+        return self.convert(
+            data=data["ctatt"]["eta"],
+            record=Eta,
+            schema=ARRIVALS_SCHEMA,
+            definition="Eta",
+        )
 
 
 class FollowThisTrain(API, API_PROTOCOL):
@@ -336,18 +433,34 @@ class FollowThisTrain(API, API_PROTOCOL):
     This produces a list of arrival predictions for a given train at all subsequent stations for which that train is estimated to arrive, up to 60 minutes in the future or to the end of its trip
     """  # noqa: E501
 
-    def __init__(self, key: str) -> None:
+    def __init__(
+        self,
+        key: str,
+        client: Optional[Client] = None,
+        normalize: bool = False,
+        output: str = "frame",
+    ) -> None:
         """
         Initializes the class
 
         :param key: Your unique API key, assigned to you after agreeing to DLA and requesting a key be generated for you
         :type key: str
+        :param client: The Client to submit requests with (if not specified, the process-wide Client is used)
+        :type client: Optional[Client], optional
+        :param normalize: Convert the columns of returned DataFrames to the dtypes hinted at by the JSON schema
+        :type normalize: bool, optional
+        :param output: Return responses as a frame (pandas.DataFrame), records (cta.records objects, without importing pandas), dicts (the JSON objects as received), typed (typed records validated as they are converted), or batch (a cta.records.RecordBatch of typed columns)
+        :type output: str, optional
         """  # noqa: E501
+        self.client: Optional[Client] = client
+        self.normalize: bool = normalize
+        self.output: str = output
         self.key: str = key
         self.queryTime: float = -1
+        self.stale: bool = False
         self.endpointBase: str = f"https://lapi.transitchicago.com/api/1.0/ttfollow.aspx?&outputType=JSON&key={self.key}"  # noqa: E501
 
-    def get(self, runnumber: int) -> DataFrame:
+    def get(self, runnumber: int) -> "DataFrame":
         """
         Query the API endpoint
 
@@ -356,22 +469,51 @@ class FollowThisTrain(API, API_PROTOCOL):
         :return: The JSON response as a pandas.DataFrame object
         :rtype: DataFrame
         """  # noqa: E501
-        endpoint = self.endpointBase
+        endpoint: str = self.buildEndpoint(runnumber=runnumber)
 
-        endpoint = endpoint + "&runnumber=" + str(runnumber)
+        return self.query(endpoint=endpoint)
 
-        resp: Response = get(url=endpoint)
+    def buildEndpoint(self, runnumber: int) -> str:
+        """
+        Build the URL of a query against the API endpoint
 
-        data: dict = resp.json()
-        if validateData(data=data, schema=FOLLOWTHISTRAIN_SCHEMA) is False:
-            return DataFrame()
+        :param runnumber: A single run number of a train
+        :type runnumber: int
+        :return: The URL to submit the HTTP GET request to
+        :rtype: str
+        """
+        return self.endpointBase + "&runnumber=" + str(runnumber)
 
-        self.queryTime = Timestamp(
-            ts_input=data["ctatt"]["tmst"],
-            tz="America/Chicago",
-        ).timestamp()
+    def parse(self, data: dict) -> "DataFrame":
+        """
+        Validate the JSON response of the API endpoint and convert it to a DataFrame
 
-        return DataFrame.from_records(data=data["ctatt"]["eta"])
+        :param data: The JSON response of the API endpoint
+        :type data: dict
+        :return: The JSON response as a pandas.DataFrame object
+        :rtype: DataFrame
+        """  # noqa: E501
+        valid: bool = validateData(
+            data=data,
+            schema=FOLLOWTHISTRAIN_SCHEMA,
+            policy=getPolicy(client=self.client),
+        )
+        if valid is False:
+            return self.convert(
+                data=[],
+                record=Eta,
+                schema=FOLLOWTHISTRAIN_SCHEMA,
+                definition="Eta",
+            )
+
+        self.queryTime = responseTime(tmst=data["ctatt"]["tmst"])
+
+        return self.convert(
+            data=data["ctatt"]["eta"],
+            record=Eta,
+            schema=FOLLOWTHISTRAIN_SCHEMA,
+            definition="Eta",
+        )
 
 
 class Locations(API, API_PROTOCOL):
@@ -381,49 +523,282 @@ class Locations(API, API_PROTOCOL):
     Each separate entry describes a single train and provides coordinate, geospatial heading, certain train attributes and next stop information
     """  # noqa: E501
 
-    def __init__(self, key: str) -> None:
+    def __init__(
+        self,
+        key: str,
+        client: Optional[Client] = None,
+        normalize: bool = False,
+        output: str = "frame",
+    ) -> None:
         """
         Initializes the class
 
         :param key: Your unique API key, assigned to you after agreeing to DLA and requesting a key be generated for you
         :type key: str
+        :param client: The Client to submit requests with (if not specified, the process-wide Client is used)
+        :type client: Optional[Client], optional
+        :param normalize: Convert the columns of returned DataFrames to the dtypes hinted at by the JSON schema
+        :type normalize: bool, optional
+        :param output: Return responses as a frame (pandas.DataFrame), records (cta.records objects, without importing pandas), dicts (the JSON objects as received), typed (typed records validated as they are converted), or batch (a cta.records.RecordBatch of typed columns)
+        :type output: str, optional
         """  # noqa: E501
+        self.client: Optional[Client] = client
+        self.normalize: bool = normalize
+        self.output: str = output
         self.key: str = key
         self.queryTime: float = -1
+        self.stale: bool = False
         self.endpointBase: str = f"https://lapi.transitchicago.com/api/1.0/ttpositions.aspx?outputType=JSON&key={self.key}"  # noqa: E501
 
-    def get(self, rt: List[str]) -> List[DataFrame]:
+    def get(self, rt: List[str]) -> dict[str, "DataFrame"]:
         """
         Query the API endpoint
 
         :param rt: Allows you to specify one or more routes for which you’d like train location information.
         :type rt: List[str]
-        :return: The JSON response as a list of pandas.DataFrame
-        :rtype: List[DataFrame]
+        :return: The JSON response as a pandas.DataFrame per route, keyed on route
+        :rtype: dict[str, DataFrame]
         """  # noqa: E501
-        dfs: dict[str, DataFrame] = {}
+        endpoint: str = self.buildEndpoint(rt=rt)
 
-        endpoint: str = self.endpointBase
+        return self.query(endpoint=endpoint)
 
-        endpoint = endpoint + "&rt=" + ",".join(rt)
+    def buildEndpoint(self, rt: List[str]) -> str:
+        """
+        Build the URL of a query against the API endpoint
 
-        resp: Response = get(url=endpoint)
+        :param rt: One or more routes to get train location information for
+        :type rt: List[str]
+        :return: The URL to submit the HTTP GET request to
+        :rtype: str
+        """
+        return self.endpointBase + "&rt=" + ",".join(rt)
 
-        data: dict = resp.json()
-        if validateData(data=data, schema=LOCATIONS_SCHEMA) is False:
+    def parse(self, data: dict) -> dict[str, "DataFrame"]:
+        """
+        Validate the JSON response of the API endpoint and convert each route to a DataFrame
+
+        :param data: The JSON response of the API endpoint
+        :type data: dict
+        :return: The JSON response as a pandas.DataFrame per route, keyed on route
+        :rtype: dict[str, DataFrame]
+        """  # noqa: E501
+        dfs: dict[str, "DataFrame"] = {}
+
+        valid: bool = validateData(
+            data=data,
+            schema=LOCATIONS_SCHEMA,
+            policy=getPolicy(client=self.client),
+        )
+        if valid is False:
             return {}
 
-        self.queryTime = Timestamp(
-            ts_input=data["ctatt"]["tmst"],
-            tz="America/Chicago",
-        ).timestamp()
+        self.queryTime = responseTime(tmst=data["ctatt"]["tmst"])
 
         routes: List[dict] = data["ctatt"]["route"]
 
         route: dict
         for route in routes:
             line: str = route["@name"]
-            df: DataFrame = DataFrame.from_records(data=route["train"])
-            dfs[line] = df
+            dfs[line] = self.convert(
+                data=route["train"],
+                record=Train,
+                schema=LOCATIONS_SCHEMA,
+                definition="Train",
+            )
 
         return dfs
+
+    def buildFrame(self, records: List[dict]) -> "DataFrame":
+        """
+        Convert the trains of a single route to a DataFrame
+
+        :param records: The trains of a route
+        :type records: List[dict]
+        :return: The trains as a pandas.DataFrame object
+        :rtype: DataFrame
+        """
+        return toFrame(
+            data=records,
+            schema=LOCATIONS_SCHEMA if self.normalize else None,
+            definition="Train",
+        )
+
+    def getFleet(
+        self,
+        rt: List[str],
+        split: bool = False,
+        workers: Optional[int] = None,
+        buffer: Optional["FleetBuffer"] = None,
+    ) -> "DataFrame":
+        """
+        Query the API endpoint for every train of one or more routes as a single DataFrame with a categorical route column
+
+        By default every route is requested at once. With split, each route is requested on its own and the requests are submitted in parallel over the pooled connections of the Client, which is faster when one combined response is slow to be generated. Responses are not served from the client's ResponseCache.
+
+        :param rt: One or more routes to get train location information for
+        :type rt: List[str]
+        :param split: Submit one request per route in parallel rather than one request for every route
+        :type split: bool, optional
+        :param workers: The maximum number of parallel requests when split (if not specified, one per route)
+        :type workers: Optional[int], optional
+        :param buffer: Fill and return a view of these preallocated buffers rather than allocating a new DataFrame (the view is overwritten by the next poll into the same buffer)
+        :type buffer: Optional[FleetBuffer], optional
+        :return: Every train as a pandas.DataFrame object
+        :rtype: DataFrame
+        """  # noqa: E501
+        client: Client = getClient() if self.client is None else self.client
+
+        endpoints: List[str] = (
+            [self.buildEndpoint(rt=[route]) for route in rt]
+            if split
+            else [self.buildEndpoint(rt=rt)]
+        )
+
+        record: Optional[CallRecord] = instrument.begin(
+            name=type(self).__name__,
+            url=self.buildEndpoint(rt=rt),
+        )
+
+        if record is None:
+            return self.parseFleet(
+                data=self.fetchAll(
+                    client=client,
+                    endpoints=endpoints,
+                    workers=workers,
+                ),
+                buffer=buffer,
+            )
+
+        try:
+            df: DataFrame = self.parseFleet(
+                data=self.fetchAll(
+                    client=client,
+                    endpoints=endpoints,
+                    workers=workers,
+                ),
+                buffer=buffer,
+            )
+        except BaseException as error:
+            instrument.end(record=record, error=error)
+            raise
+
+        instrument.end(record=record, value=df)
+        return df
+
+    def parseFleet(
+        self,
+        data: List[dict],
+        buffer: Optional["FleetBuffer"] = None,
+    ) -> "DataFrame":
+        """
+        Validate one or more JSON responses of the API endpoint and convert every train to a single DataFrame
+
+        :param data: The JSON responses of the API endpoint
+        :type data: List[dict]
+        :param buffer: Fill and return a view of these preallocated buffers rather than allocating a new DataFrame
+        :type buffer: Optional[FleetBuffer], optional
+        :return: Every train as a pandas.DataFrame object
+        :rtype: DataFrame
+        """  # noqa: E501
+        routes: List[dict] = []
+
+        response: dict
+        for response in data:
+            valid: bool = validateData(
+                data=response,
+                schema=LOCATIONS_SCHEMA,
+                policy=getPolicy(client=self.client),
+            )
+            if valid is False:
+                continue
+
+            self.queryTime = responseTime(tmst=response["ctatt"]["tmst"])
+
+            routes.extend(response["ctatt"]["route"])
+
+        if buffer is not None:
+            return buffer.fill(routes=routes)
+
+        return self.buildFleetFrame(routes=routes)
+
+    def buildFleetFrame(self, routes: List[dict]) -> "DataFrame":
+        """
+        Convert the trains of every route to one DataFrame with a categorical route column
+
+        All trains are converted in a single pass rather than one DataFrame per route.
+
+        :param routes: The routes of one or more responses
+        :type routes: List[dict]
+        :return: Every train as a pandas.DataFrame object
+        :rtype: DataFrame
+        """  # noqa: E501
+        import numpy as np
+        from pandas import Categorical
+
+        from cta.fleet import codesDtype
+
+        names: dict[str, int] = {}
+        codes: List[int] = [
+            names.setdefault(route["@name"], len(names)) for route in routes
+        ]
+
+        df: DataFrame = self.buildFrame(
+            records=[train for route in routes for train in route["train"]]
+        )
+        df.insert(
+            loc=0,
+            column="route",
+            value=Categorical.from_codes(
+                codes=np.repeat(
+                    codes,
+                    [len(route["train"]) for route in routes],
+                ).astype(codesDtype(categories=len(names))),
+                categories=list(names),
+            ),
+        )
+
+        return df
+
+    def stream(self, rt: List[str]) -> Iterator[tuple[str, "DataFrame"]]:
+        """
+        Query the API endpoint and incrementally parse the response, yielding each route as soon as it has been received and validated
+
+        Only one route is held in memory at a time. Each route is validated on its own against the JSON schema, and routes that fail validation under a non-strict policy are skipped.
+
+        :param rt: One or more routes to get train location information for
+        :type rt: List[str]
+        :return: An iterator of (route, pandas.DataFrame) tuples, or of (route, records or dicts) tuples depending on output
+        :rtype: Iterator[tuple[str, DataFrame]]
+        """  # noqa: E501
+        endpoint: str = self.buildEndpoint(rt=rt)
+
+        resp: "Response" = get(url=endpoint, client=self.client, stream=True)
+        resp.raw.decode_content = True
+
+        with resp:
+            prefix: str
+            value: dict | str
+            for prefix, value in iterItems(
+                file=resp.raw,
+                prefix="ctatt.route.item",
+                scalars=("ctatt.tmst",),
+            ):
+                if prefix == "ctatt.tmst":
+                    self.queryTime = responseTime(tmst=value)
+                    continue
+
+                valid: bool = validateData(
+                    data=value,
+                    schema=ROUTE_SCHEMA,
+                    policy=getPolicy(client=self.client),
+                )
+                if valid is False:
+                    continue
+
+                yield value["@name"], self.convert(
+                    data=value["train"],
+                    record=Train,
+                    schema=LOCATIONS_SCHEMA,
+                    definition="Train",
+                )
@@ -0,0 +1,480 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+from threading import Event
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+from pandas import DataFrame, to_numeric
+
+from cta import Client, getClient, getPolicy, responseTime, validateData
+from cta.fleet import FleetBuffer
+from cta.schedule import BACKGROUND, priority
+from cta.train import FOLLOWTHISTRAIN_SCHEMA, FollowThisTrain, Locations
+
+POSITION_COLUMNS: tuple[str, ...] = (
+    "queryTime",
+    "lat",
+    "lon",
+    "heading",
+    "nextStaId",
+)
+ETA_COLUMNS: tuple[str, ...] = ("queryTime", "staId", "arrT", "isDly")
+
+
+class TripTracker:
+    """
+    Reconstruct the trip of every active run from Locations polls, refreshing FollowThisTrain only for runs whose next station changed
+
+    The state of each run number (rn) lives in a slot of preallocated arrays. Each poll appends the position of every run to a per-run ring buffer of the last history positions in a single vectorized pass, and only runs that are new or whose nextStaId changed are queried with FollowThisTrain, in parallel. The returned ETAs are appended to a per-run ring buffer of the last etaHistory predictions without building a DataFrame. Runs that have not been seen for expire seconds are retired and their slots reused, so request volume and CPU scale with the amount of change in the network rather than with the size of the fleet.
+    """  # noqa: E501
+
+    def __init__(
+        self,
+        locations: Locations,
+        follow: FollowThisTrain,
+        routes: Sequence[str],
+        history: int = 64,
+        etaHistory: int = 256,
+        capacity: int = 512,
+        expire: float = 300,
+        workers: int = 8,
+    ) -> None:
+        """
+        Initializes the class
+
+        :param locations: The Locations instance to poll routes with
+        :type locations: Locations
+        :param follow: The FollowThisTrain instance to refresh runs with
+        :type follow: FollowThisTrain
+        :param routes: The routes to track
+        :type routes: Sequence[str]
+        :param history: The number of positions to keep per run
+        :type history: int, optional
+        :param etaHistory: The number of arrival predictions to keep per run
+        :type etaHistory: int, optional
+        :param capacity: The number of runs to preallocate room for
+        :type capacity: int, optional
+        :param expire: The number of seconds after which a run that has not been seen is retired
+        :type expire: float, optional
+        :param workers: The maximum number of parallel FollowThisTrain requests
+        :type workers: int, optional
+        """  # noqa: E501
+        self.locations: Locations = locations
+        self.follow: FollowThisTrain = follow
+        self.routes: List[str] = list(routes)
+        self.history: int = history
+        self.etaHistory: int = etaHistory
+        self.expire: float = expire
+        self.workers: int = workers
+
+        self.buffer: FleetBuffer = FleetBuffer(capacity=capacity)
+        self.slots: dict[int, int] = {}
+        self.free: List[int] = []
+        self.capacity: int = 0
+        self.size: int = 0
+
+        self.rn: np.ndarray = np.empty(0, dtype=np.int32)
+        self.route: np.ndarray = np.empty(0, dtype=object)
+        self.nextStaId: np.ndarray = np.empty(0, dtype=np.int32)
+        self.lastSeen: np.ndarray = np.empty(0, dtype=np.float64)
+        self.lastFollowed: np.ndarray = np.empty(0, dtype=np.float64)
+        self.active: np.ndarray = np.empty(0, dtype=bool)
+
+        self.positions: dict[str, np.ndarray] = {}
+        self.positionCount: np.ndarray = np.empty(0, dtype=np.int64)
+        self.etas: dict[str, np.ndarray] = {}
+        self.etaCount: np.ndarray = np.empty(0, dtype=np.int64)
+
+        self.stopEvent: Event = Event()
+
+        self.polls: int = 0
+        self.refreshes: int = 0
+        self.unchanged: int = 0
+        self.errors: int = 0
+
+        self._grow(capacity=capacity)
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def _grow(self, capacity: int) -> None:
+        def resize(array: np.ndarray, fill: Any) -> np.ndarray:
+            grown: np.ndarray = np.full(
+                (capacity,) + array.shape[1:],
+                fill,
+                dtype=array.dtype,
+            )
+            grown[: len(array)] = array
+            return grown
+
+        self.rn = resize(self.rn, -1)
+        self.route = resize(self.route, None)
+        self.nextStaId = resize(self.nextStaId, -1)
+        self.lastSeen = resize(self.lastSeen, np.nan)
+        self.lastFollowed = resize(self.lastFollowed, np.nan)
+        self.active = resize(self.active, False)
+        self.positionCount = resize(self.positionCount, 0)
+        self.etaCount = resize(self.etaCount, 0)
+
+        self.positions = {
+            column: resize(
+                self.positions.get(
+                    column,
+                    np.empty((0, self.history), dtype=dtype),
+                ),
+                fill,
+            )
+            for column, dtype, fill in (
+                ("queryTime", np.float64, np.nan),
+                ("lat", np.float64, np.nan),
+                ("lon", np.float64, np.nan),
+                ("heading", np.int16, -1),
+                ("nextStaId", np.int32, -1),
+            )
+        }
+        self.etas = {
+            column: resize(
+                self.etas.get(
+                    column,
+                    np.empty((0, self.etaHistory), dtype=dtype),
+                ),
+                fill,
+            )
+            for column, dtype, fill in (
+                ("queryTime", np.float64, np.nan),
+                ("staId", np.int32, -1),
+                ("arrT", "datetime64[s]", np.datetime64("NaT")),
+                ("isDly", np.bool_, False),
+            )
+        }
+
+        self.capacity = capacity
+
+    def _slot(self, rn: int) -> int:
+        slot: int | None = self.slots.get(rn)
+        if slot is not None:
+            return slot
+
+        if len(self.free) > 0:
+            slot = self.free.pop()
+        else:
+            if self.size == self.capacity:
+                self._grow(capacity=2 * self.capacity)
+            slot = self.size
+            self.size += 1
+
+        self.slots[rn] = slot
+        self.rn[slot] = rn
+        self.nextStaId[slot] = -1
+        self.lastFollowed[slot] = np.nan
+        self.positionCount[slot] = 0
+        self.etaCount[slot] = 0
+
+        return slot
+
+    def _retire(self, queryTime: float) -> None:
+        stale: np.ndarray = np.flatnonzero(
+            (self.rn[: self.size] >= 0)
+            & (self.lastSeen[: self.size] < queryTime - self.expire)
+        )
+
+        slot: int
+        for slot in stale.tolist():
+            del self.slots[int(self.rn[slot])]
+            self.rn[slot] = -1
+            self.active[slot] = False
+            self.free.append(slot)
+
+    def update(self, df: DataFrame, queryTime: float) -> np.ndarray:
+        """
+        Record a single poll of the fleet and find the runs whose next station changed
+
+        :param df: Every train as returned by Locations.getFleet
+        :type df: DataFrame
+        :param queryTime: The queryTime recorded by Locations for the poll
+        :type queryTime: float
+        :return: The run numbers that are new or whose nextStaId changed
+        :rtype: np.ndarray
+        """  # noqa: E501
+        self.polls += 1
+
+        rns: np.ndarray = to_numeric(df["rn"]).to_numpy(dtype=np.int32)
+        slots: np.ndarray = np.fromiter(
+            (self._slot(rn=rn) for rn in rns.tolist()),
+            dtype=np.int64,
+            count=len(rns),
+        )
+
+        nextStaId: np.ndarray = to_numeric(df["nextStaId"]).to_numpy(
+            dtype=np.int32,
+        )
+        changed: np.ndarray = self.nextStaId[slots] != nextStaId
+
+        self.nextStaId[slots] = nextStaId
+        self.route[slots] = df["route"].to_numpy(dtype=object)
+        self.lastSeen[slots] = queryTime
+        self.active[: self.size] = False
+        self.active[slots] = True
+
+        columns: dict[str, np.ndarray] = {
+            "queryTime": np.full(len(slots), queryTime),
+            "lat": to_numeric(df["lat"]).to_numpy(dtype=np.float64),
+            "lon": to_numeric(df["lon"]).to_numpy(dtype=np.float64),
+            "heading": to_numeric(df["heading"]).to_numpy(dtype=np.int16),
+            "nextStaId": nextStaId,
+        }
+
+        positions: np.ndarray = self.positionCount[slots] % self.history
+
+        column: str
+        for column in POSITION_COLUMNS:
+            self.positions[column][slots, positions] = columns[column]
+
+        self.positionCount[slots] += 1
+
+        self._retire(queryTime=queryTime)
+
+        self.unchanged += int(len(changed) - changed.sum())
+        return rns[changed]
+
+    def refresh(self, rns: Sequence[int]) -> None:
+        """
+        Query FollowThisTrain for a set of runs in parallel and record their arrival predictions
+
+        Runs that are unknown to the API are counted in errors and skipped. Runs whose requests fail, or whose responses cannot be decoded or fail validation under a non-strict policy, are counted in errors and have their nextStaId reset, so the next poll refreshes them again.
+
+        :param rns: The run numbers to refresh
+        :type rns: Sequence[int]
+        """  # noqa: E501
+        if len(rns) == 0:
+            return
+
+        client: Client = (
+            getClient() if self.follow.client is None else self.follow.client
+        )
+
+        endpoints: List[str] = [
+            self.follow.buildEndpoint(runnumber=int(rn)) for rn in rns
+        ]
+
+        maxWorkers: int = min(self.workers, len(endpoints))
+        with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+            futures: List[Future] = [
+                executor.submit(copy_context().run, self._fetch, client, url)
+                for url in endpoints
+            ]
+            responses: List[Optional[dict]]
+            responses = [future.result() for future in futures]
+
+        rn: int
+        data: Optional[dict]
+        for rn, data in zip(rns, responses):
+            if data is None:
+                self._retry(rn=int(rn))
+                continue
+
+            if data.get("ctatt", {}).get("errCd") != "0":
+                self.errors += 1
+                continue
+
+            valid: bool = validateData(
+                data=data,
+                schema=FOLLOWTHISTRAIN_SCHEMA,
+                policy=getPolicy(client=self.follow.client),
+            )
+            if valid is False:
+                self._retry(rn=int(rn))
+                continue
+
+            self.record(rn=int(rn), data=data)
+
+        self.refreshes += len(responses)
+
+    def _fetch(self, client: Client, endpoint: str) -> Optional[dict]:
+        try:
+            return self.follow.fetch(client=client, endpoint=endpoint)
+        except (OSError, ValueError):
+            return None
+
+    def _retry(self, rn: int) -> None:
+        self.errors += 1
+
+        slot: int | None = self.slots.get(rn)
+        if slot is not None:
+            self.nextStaId[slot] = -1
+
+    def record(self, rn: int, data: dict) -> None:
+        """
+        Append the arrival predictions of a single FollowThisTrain response to the history of a run
+
+        :param rn: The run number of the train
+        :type rn: int
+        :param data: The JSON response of the FollowThisTrain endpoint
+        :type data: dict
+        """  # noqa: E501
+        slot: int | None = self.slots.get(rn)
+        if slot is None:
+            return
+
+        etas: List[dict] = data["ctatt"]["eta"][slice(-self.etaHistory, None)]
+        n: int = len(etas)
+        if n == 0:
+            return
+
+        queryTime: float = responseTime(tmst=data["ctatt"]["tmst"])
+
+        count: int = self.etaCount[slot]
+        positions: np.ndarray = (count + np.arange(n)) % self.etaHistory
+
+        self.etas["queryTime"][slot, positions] = queryTime
+        self.etas["staId"][slot, positions] = [eta["staId"] for eta in etas]
+        self.etas["arrT"][slot, positions] = [eta["arrT"] for eta in etas]
+        delayed: List[bool] = [eta["isDly"] == "1" for eta in etas]
+        self.etas["isDly"][slot, positions] = delayed
+
+        self.etaCount[slot] += n
+        self.lastFollowed[slot] = queryTime
+
+    def poll(self) -> np.ndarray:
+        """
+        Poll every tracked route once and refresh the runs whose next station changed
+
+        :return: The run numbers that were refreshed
+        :rtype: np.ndarray
+        """  # noqa: E501
+        df: DataFrame = self.locations.getFleet(
+            rt=self.routes,
+            buffer=self.buffer,
+        )
+        changed: np.ndarray = self.update(
+            df=df,
+            queryTime=self.locations.queryTime,
+        )
+
+        if len(changed) > 0:
+            self.refresh(rns=changed.tolist())
+
+        return changed
+
+    def run(
+        self,
+        interval: float,
+        iterations: Optional[int] = None,
+    ) -> None:
+        """
+        Poll at a fixed interval until stopped
+
+        Requests are made at BACKGROUND priority, so a Client's Scheduler sends interactive queries ahead of them. Polls whose Locations requests fail are counted in errors and tried again at the next interval.
+
+        :param interval: The number of seconds between the start of each poll
+        :type interval: float
+        :param iterations: The number of polls to make before returning (if not specified, poll until stop() is called)
+        :type iterations: Optional[int], optional
+        """  # noqa: E501
+        self.stopEvent.clear()
+
+        count: int = 0
+        deadline: float = time.monotonic()
+
+        while self.stopEvent.is_set() is False:
+            with priority(level=BACKGROUND):
+                try:
+                    self.poll()
+                except (OSError, ValueError):
+                    self.errors += 1
+
+            count += 1
+            if (iterations is not None) and (count >= iterations):
+                break
+
+            deadline += interval
+            self.stopEvent.wait(timeout=max(0, deadline - time.monotonic()))
+
+    def stop(self) -> None:
+        """
+        Stop a running poll loop after its current poll
+        """
+        self.stopEvent.set()
+
+    def _ring(
+        self,
+        columns: dict[str, np.ndarray],
+        count: int,
+        depth: int,
+        slot: int,
+    ) -> DataFrame:
+        n: int = min(count, depth)
+        order: np.ndarray = (np.arange(count - n, count)) % depth
+
+        return DataFrame(
+            data={column: columns[column][slot, order] for column in columns},
+        )
+
+    def trips(self) -> DataFrame:
+        """
+        Get the current state of every tracked run
+
+        :return: The run number, route, next station, last position, and the times the run was last seen and last refreshed, as a pandas.DataFrame
+        :rtype: DataFrame
+        """  # noqa: E501
+        slots: np.ndarray = np.fromiter(
+            self.slots.values(),
+            dtype=np.int64,
+            count=len(self.slots),
+        )
+        last: np.ndarray = (self.positionCount[slots] - 1) % self.history
+
+        return DataFrame(
+            data={
+                "rn": self.rn[slots],
+                "route": self.route[slots],
+                "active": self.active[slots],
+                "nextStaId": self.positions["nextStaId"][slots, last],
+                "lat": self.positions["lat"][slots, last],
+                "lon": self.positions["lon"][slots, last],
+                "heading": self.positions["heading"][slots, last],
+                "lastSeen": self.lastSeen[slots],
+                "lastFollowed": self.lastFollowed[slots],
+            }
+        )
+
+    def getPositions(self, rn: int) -> DataFrame:
+        """
+        Get the recorded positions of a run, oldest first
+
+        :param rn: The run number of the train
+        :type rn: int
+        :return: The queryTime, coordinates, heading, and next station of each poll the run was seen in, as a pandas.DataFrame
+        :rtype: DataFrame
+        """  # noqa: E501
+        slot: int | None = self.slots.get(rn)
+        if slot is None:
+            return DataFrame(columns=list(POSITION_COLUMNS))
+
+        return self._ring(
+            columns=self.positions,
+            count=int(self.positionCount[slot]),
+            depth=self.history,
+            slot=slot,
+        )
+
+    def getEtas(self, rn: int) -> DataFrame:
+        """
+        Get the recorded arrival predictions of a run, oldest first
+
+        :param rn: The run number of the train
+        :type rn: int
+        :return: The queryTime of the FollowThisTrain response, station, predicted arrival time (naive America/Chicago wall-clock time), and delay flag of each prediction, as a pandas.DataFrame
+        :rtype: DataFrame
+        """  # noqa: E501
+        slot: int | None = self.slots.get(rn)
+        if slot is None:
+            return DataFrame(columns=list(ETA_COLUMNS))
+
+        return self._ring(
+            columns=self.etas,
+            count=int(self.etaCount[slot]),
+            depth=self.etaHistory,
+            slot=slot,
+        )
@@ -0,0 +1,551 @@
+import time
+from collections import deque
+from typing import Any, Iterable, List, Optional, Sequence
+
+import numpy as np
+from pandas import (
+    Categorical,
+    CategoricalDtype,
+    DataFrame,
+    Index,
+    Series,
+    concat,
+)
+from pandas.api.types import is_string_dtype
+
+from cta.fleet import BUFFER_DTYPES, codesDtype
+from cta.normalize import normalizeSeries
+from cta.records import columnTypes, toFrame
+from cta.train import ARRIVALS_SCHEMA, LOCATIONS_SCHEMA
+
+# Dtypes that NumPy parses from the strings of a JSON response directly,
+# without going through pandas
+PARSED_DTYPES: tuple[str, ...] = ("bool", "int8", "int32", "datetime")
+
+
+class WindowStore:
+    """
+    A fixed-capacity ring buffer of the rows of the last polls of an endpoint, stored in preallocated typed columns
+
+    Columns are typed from the schema of the endpoint like FleetBuffer's, plus a float64 queryTime column of the UNIX timestamp of the poll each row came from. Categorical columns are stored as integer codes into categories that persist for the life of the store; nullable integers are stored as float64 with NaN for missing values, and datetime columns hold naive America/Chicago wall-clock times. Columns without a type (flags) are not stored.
+
+    Every column is allocated twice over and each row is written to both halves, so the rows in the store are always one contiguous slice of each column: arrays and frame return views of it without copying. The views are overwritten once capacity more rows have been appended, so copy them to keep them.
+
+    Appending a poll writes its rows over the oldest ones, and rows older than window seconds before the latest poll are evicted, both without moving any data. The rows of every run, station, and route are chained into indexes as they are appended, so lookup only visits the rows it returns.
+    """  # noqa: E501
+
+    SCHEMA: dict = {}
+    DEFINITION: str = ""
+    EXTRA_COLUMNS: dict[str, str] = {}
+    INDEXES: dict[str, str] = {}
+
+    def __init__(
+        self,
+        capacity: int = 100000,
+        window: Optional[float] = None,
+    ) -> None:
+        """
+        Initializes the class
+
+        :param capacity: The maximum number of rows to keep
+        :type capacity: int, optional
+        :param window: The number of seconds of polls to keep before the latest poll (if not specified, rows are only evicted once capacity is reached)
+        :type window: Optional[float], optional
+        """  # noqa: E501
+        self.capacity: int = capacity
+        self.window: Optional[float] = window
+
+        types: dict[str, str] = columnTypes(
+            schema=self.SCHEMA,
+            definition=self.DEFINITION,
+        )
+
+        self.dtypes: dict[str, str] = {
+            **self.EXTRA_COLUMNS,
+            **{
+                column: "float64" if dtype == "Int32" else dtype
+                for column, dtype in types.items()
+            },
+            "queryTime": "float64",
+        }
+
+        self.categories: dict[str, dict[Any, int]] = {}
+
+        column: str
+        dtype: str
+        for column, dtype in self.dtypes.items():
+            if dtype == "category":
+                self.categories[column] = {}
+
+        self.columns: dict[str, np.ndarray] = {
+            column: np.empty(2 * capacity, dtype=BUFFER_DTYPES[dtype])
+            for column, dtype in self.dtypes.items()
+        }
+
+        self.previous: dict[str, np.ndarray] = {
+            name: np.empty(capacity, dtype=np.int64) for name in self.INDEXES
+        }
+        self.last: dict[str, dict[int, int]]
+        self.last = {name: {} for name in self.INDEXES}
+
+        self.polls: deque[tuple[float, int]] = deque()
+        self.start: int = 0
+        self.end: int = 0
+        self.queryTime: float = -1
+        self.evicted: int = 0
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def rows(self, data: Any) -> DataFrame:
+        """
+        Convert a response to a DataFrame with a row per stored row
+
+        :param data: A response of the endpoint
+        :type data: Any
+        :return: The rows, with their columns as received or typed
+        :rtype: DataFrame
+        """
+        if isinstance(data, DataFrame):
+            return data
+
+        return toFrame(data=data)
+
+    def append(self, data: Any, queryTime: Optional[float] = None) -> int:
+        """
+        Append the rows of a poll, overwriting the oldest rows once the store is full
+
+        :param data: A response of the endpoint, as returned by the API class in any output, or its JSON
+        :type data: Any
+        :param queryTime: The UNIX timestamp of the poll, such as the queryTime of the API class that made it (if not specified, the current time)
+        :type queryTime: Optional[float], optional
+        :return: The number of rows appended
+        :rtype: int
+        :raises ValueError: If queryTime is earlier than that of the previous poll
+        """  # noqa: E501
+        if queryTime is None:
+            queryTime = time.time()
+
+        if queryTime < self.queryTime:
+            raise ValueError(
+                f"queryTime {queryTime} is earlier than the latest poll {self.queryTime}"  # noqa: E501
+            )
+
+        df: DataFrame = self.rows(data=data)
+
+        n: int = len(df)
+        if n == 0:
+            self.queryTime = queryTime
+            self.evict()
+            return 0
+
+        skip: int = max(0, n - self.capacity)
+        k: int = n - skip
+
+        counters: np.ndarray = np.arange(self.end, self.end + k)
+        positions: np.ndarray = counters % self.capacity
+
+        column: str
+        dtype: str
+        for column, dtype in self.dtypes.items():
+            values: np.ndarray = (
+                np.full(n, queryTime)
+                if column == "queryTime"
+                else self._convert(
+                    column=column,
+                    dtype=dtype,
+                    series=df[column],
+                )
+            )[slice(skip, None)]
+
+            array: np.ndarray = self.columns[column]
+            array[positions] = values
+            array[positions + self.capacity] = values
+
+        name: str
+        for name, column in self.INDEXES.items():
+            self._chain(
+                name=name,
+                keys=self.columns[column][positions],
+                counters=counters,
+            )
+
+        self.polls.append((queryTime, self.end))
+        self.end += k
+        self.queryTime = queryTime
+        self.evict()
+
+        return k
+
+    def poll(self, api: Any, **kwargs: Any) -> Any:
+        """
+        Get a response from an API class and append it with the API class's queryTime
+
+        :param api: An Arrivals or Locations instance, matching the store
+        :type api: API
+        :param kwargs: The arguments of the API class's get method
+        :type kwargs: Any
+        :return: The response
+        :rtype: Any
+        """  # noqa: E501
+        data: Any = api.get(**kwargs)
+        self.append(data=data, queryTime=api.queryTime)
+        return data
+
+    def _convert(self, column: str, dtype: str, series: Series) -> np.ndarray:
+        if dtype == "category":
+            local: Categorical = Categorical(series)
+            categories: dict[Any, int] = self.categories[column]
+            codes: np.ndarray = np.array(
+                [
+                    categories.setdefault(value, len(categories))
+                    for value in local.categories
+                ]
+                + [-1],
+                dtype=np.int64,
+            )
+
+            wanted: type = codesDtype(categories=len(categories))
+            if np.dtype(wanted).itemsize > self.columns[column].itemsize:
+                self.columns[column] = self.columns[column].astype(wanted)
+
+            return codes[local.codes]
+
+        if is_string_dtype(series.dtype) and (dtype in PARSED_DTYPES):
+            raw: np.ndarray = series.to_numpy(dtype=object)
+            try:
+                if dtype == "bool":
+                    return raw == "1"
+                return raw.astype(BUFFER_DTYPES[dtype])
+            except (TypeError, ValueError):
+                pass
+
+        if dtype == "datetime":
+            typed: Series = normalizeSeries(series=series, dtype=dtype)
+            return typed.dt.tz_localize(None).to_numpy(dtype="datetime64[s]")
+
+        return normalizeSeries(series=series, dtype=dtype).to_numpy(
+            dtype=BUFFER_DTYPES[dtype]
+        )
+
+    def _chain(
+        self,
+        name: str,
+        keys: np.ndarray,
+        counters: np.ndarray,
+    ) -> None:
+        if len(keys) == 0:
+            return
+
+        order: np.ndarray = np.argsort(keys, kind="stable")
+        ordered: np.ndarray = keys[order]
+        firsts: np.ndarray = np.ones(len(order), dtype=bool)
+        firsts[1:] = ordered[1:] != ordered[:-1]
+
+        previous: np.ndarray = np.empty(len(order), dtype=np.int64)
+        previous[1:] = counters[order[:-1]]
+
+        last: dict[int, int] = self.last[name]
+        starts: np.ndarray = np.flatnonzero(firsts)
+        lasts: np.ndarray = np.append(starts[1:], len(order)) - 1
+
+        first: int
+        final: int
+        for first, final in zip(np.flatnonzero(firsts), lasts):
+            key: int = int(ordered[first])
+            previous[first] = last.get(key, -1)
+            last[key] = int(counters[order[final]])
+
+        self.previous[name][counters[order] % self.capacity] = previous
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """
+        Evict the rows that have been overwritten or are older than the window
+
+        :param now: The UNIX timestamp the window ends at (if not specified, the queryTime of the latest poll)
+        :type now: Optional[float], optional
+        :return: The number of rows evicted
+        :rtype: int
+        """  # noqa: E501
+        start: int = max(self.start, self.end - self.capacity)
+
+        if self.window is not None:
+            latest: float = self.queryTime if now is None else now
+            cutoff: float = latest - self.window
+            while (len(self.polls) > 0) and (self.polls[0][0] < cutoff):
+                self.polls.popleft()
+            start = max(
+                start,
+                self.polls[0][1] if len(self.polls) > 0 else self.end,
+            )
+
+        while (len(self.polls) > 1) and (self.polls[1][1] <= start):
+            self.polls.popleft()
+
+        evicted: int = start - self.start
+        self.start = start
+        self.evicted += evicted
+
+        return evicted
+
+    def bounds(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> slice:
+        """
+        Get the slice of the columns that holds the rows of the polls in a time range
+
+        :param since: The earliest queryTime to include (if not specified, every row is included)
+        :type since: Optional[float], optional
+        :param until: The latest queryTime to include (if not specified, every row is included)
+        :type until: Optional[float], optional
+        :return: The slice of every array in columns
+        :rtype: slice
+        """  # noqa: E501
+        first: int = self.start % self.capacity
+        stop: int = first + len(self)
+
+        if (since is None) and (until is None):
+            return slice(first, stop)
+
+        times: np.ndarray = self.columns["queryTime"][slice(first, stop)]
+        low: int = 0
+        if since is not None:
+            low = int(np.searchsorted(times, since, side="left"))
+
+        high: int = len(times)
+        if until is not None:
+            high = int(np.searchsorted(times, until, side="right"))
+
+        return slice(first + low, first + max(low, high))
+
+    def arrays(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> dict[str, np.ndarray]:
+        """
+        Get the rows of the polls in a time range as NumPy views of the columns
+
+        Categorical columns are returned as their integer codes; decode them with the lists in categoryNames.
+
+        :param since: The earliest queryTime to include (if not specified, every row is included)
+        :type since: Optional[float], optional
+        :param until: The latest queryTime to include (if not specified, every row is included)
+        :type until: Optional[float], optional
+        :param columns: The columns to return (if not specified, every column)
+        :type columns: Optional[Sequence[str]], optional
+        :return: A view of each column, keyed on column name
+        :rtype: dict[str, np.ndarray]
+        """  # noqa: E501
+        window: slice = self.bounds(since=since, until=until)
+
+        return {
+            column: self.columns[column][window]
+            for column in (self.dtypes if columns is None else columns)
+        }
+
+    def frame(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> DataFrame:
+        """
+        Get the rows of the polls in a time range as a DataFrame viewing the columns
+
+        :param since: The earliest queryTime to include (if not specified, every row is included)
+        :type since: Optional[float], optional
+        :param until: The latest queryTime to include (if not specified, every row is included)
+        :type until: Optional[float], optional
+        :param columns: The columns to return (if not specified, every column)
+        :type columns: Optional[Sequence[str]], optional
+        :return: The rows, oldest first
+        :rtype: DataFrame
+        """  # noqa: E501
+        return self._frame(
+            arrays=self.arrays(since=since, until=until, columns=columns)
+        )
+
+    def lookup(
+        self,
+        by: str,
+        key: Any,
+        since: Optional[float] = None,
+    ) -> DataFrame:
+        """
+        Get every stored row of a run, station, or route from its index
+
+        :param by: The name of the index, a key of INDEXES
+        :type by: str
+        :param key: The run number, station id, or route name to look up
+        :type key: Any
+        :param since: The earliest queryTime to include (if not specified, every row is included)
+        :type since: Optional[float], optional
+        :return: The rows, oldest first (copied from the columns)
+        :rtype: DataFrame
+        """  # noqa: E501
+        positions: np.ndarray = self.positions(by=by, key=key, since=since)
+        columns: dict[str, np.ndarray] = self.columns
+
+        return self._frame(
+            arrays={column: columns[column][positions] for column in columns},
+        )
+
+    def positions(
+        self,
+        by: str,
+        key: Any,
+        since: Optional[float] = None,
+    ) -> np.ndarray:
+        """
+        Walk an index to find the rows of a run, station, or route
+
+        :param by: The name of the index, a key of INDEXES
+        :type by: str
+        :param key: The run number, station id, or route name to look up
+        :type key: Any
+        :param since: The earliest queryTime to include (if not specified, every row is included)
+        :type since: Optional[float], optional
+        :return: The positions of the rows in the arrays of columns, oldest first
+        :rtype: np.ndarray
+        """  # noqa: E501
+        column: str = self.INDEXES[by]
+
+        if column in self.categories:
+            key = self.categories[column].get(key, -1)
+
+        start: int = self.start
+        if since is not None:
+            start += self.bounds(since=since).start - self.bounds().start
+
+        previous: np.ndarray = self.previous[by]
+        counters: List[int] = []
+
+        counter: int = self.last[by].get(int(key), -1)
+        while counter >= start:
+            counters.append(counter)
+            counter = int(previous[counter % self.capacity])
+
+        return np.array(counters[::-1], dtype=np.int64) % self.capacity
+
+    @property
+    def categoryNames(self) -> dict[str, List[Any]]:
+        """
+        The categories of every categorical column, in code order
+
+        :return: The categories, keyed on column name
+        :rtype: dict[str, List[Any]]
+        """
+        categories: dict[str, dict[Any, int]] = self.categories
+        return {column: list(categories[column]) for column in categories}
+
+    def _frame(self, arrays: dict[str, np.ndarray]) -> DataFrame:
+        data: dict[str, Any] = {}
+
+        column: str
+        array: np.ndarray
+        for column, array in arrays.items():
+            if column in self.categories:
+                data[column] = Categorical.from_codes(
+                    codes=array,
+                    dtype=CategoricalDtype(
+                        categories=Index(list(self.categories[column]))
+                    ),
+                    validate=False,
+                )
+            else:
+                data[column] = array
+
+        return DataFrame(data=data, copy=False)
+
+    def clear(self) -> None:
+        """
+        Evict every row and forget the indexes, keeping the categories
+        """
+        self.evicted += len(self)
+        self.start = self.end
+        self.polls.clear()
+
+        last: dict[int, int]
+        for last in self.last.values():
+            last.clear()
+
+
+class ArrivalsWindow(WindowStore):
+    """
+    A WindowStore of the predictions of Arrivals polls, indexed by run (rn), station (staId), and route (rt)
+    """  # noqa: E501
+
+    SCHEMA: dict = ARRIVALS_SCHEMA
+    DEFINITION: str = "Eta"
+    INDEXES: dict[str, str] = {"rn": "rn", "staId": "staId", "route": "rt"}
+
+    def rows(self, data: Any) -> DataFrame:
+        """
+        Convert an Arrivals response to a DataFrame with a row per prediction
+
+        :param data: A DataFrame, RecordBatch, records, or JSON objects returned by Arrivals, or its JSON response
+        :type data: Any
+        :return: The predictions
+        :rtype: DataFrame
+        """  # noqa: E501
+        if isinstance(data, DataFrame):
+            return data
+
+        if isinstance(data, dict):
+            data = data["ctatt"]["eta"]
+
+        return toFrame(data=data)
+
+
+class LocationsWindow(WindowStore):
+    """
+    A WindowStore of the trains of Locations polls, indexed by run (rn), next station (nextStaId), and route
+    """  # noqa: E501
+
+    SCHEMA: dict = LOCATIONS_SCHEMA
+    DEFINITION: str = "Train"
+    EXTRA_COLUMNS: dict[str, str] = {"route": "category"}
+    INDEXES: dict[str, str] = {
+        "rn": "rn",
+        "staId": "nextStaId",
+        "route": "route",
+    }
+
+    def rows(self, data: Any) -> DataFrame:
+        """
+        Convert a Locations response to a DataFrame with a row per train and a route column
+
+        :param data: The per-route DataFrames, records, or JSON objects returned by Locations.get, the DataFrame returned by Locations.getFleet, or the JSON response
+        :type data: Any
+        :return: The trains
+        :rtype: DataFrame
+        """  # noqa: E501
+        if isinstance(data, DataFrame):
+            return data
+
+        if isinstance(data, dict) and ("ctatt" in data):
+            data = data["ctatt"]["route"]
+
+        routes: Iterable[tuple[str, Any]] = (
+            data.items()
+            if isinstance(data, dict)
+            else ((route["@name"], route["train"]) for route in data)
+        )
+
+        dfs: List[DataFrame] = []
+
+        route: str
+        trains: Any
+        for route, trains in routes:
+            df: DataFrame = super().rows(data=trains)
+            if len(df) > 0:
+                dfs.append(df.assign(route=route))
+
+        if len(dfs) == 0:
+            return DataFrame()
+
+        return concat(dfs, ignore_index=True)